@@ -48,7 +48,7 @@ class AzCli(CLI):
             register_ids_argument, register_global_subscription_argument)
         from azure.cli.core.cloud import get_active_cloud
         from azure.cli.core.commands.transform import register_global_transforms
-        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX, VERSIONS
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX, ARGUMENT_INDEX, VERSIONS
         from azure.cli.core.util import handle_version_update
         from azure.cli.core.commands.query_examples import register_global_query_examples_argument
 
@@ -59,6 +59,7 @@ class AzCli(CLI):
         self.data['command_extension_name'] = None
         self.data['completer_active'] = ARGCOMPLETE_ENV_NAME in os.environ
         self.data['query_active'] = False
+        self.data['command_group_filter'] = None
 
         azure_folder = self.config.config_dir
         ensure_dir(azure_folder)
@@ -66,6 +67,7 @@ class AzCli(CLI):
         CONFIG.load(os.path.join(azure_folder, 'az.json'))
         SESSION.load(os.path.join(azure_folder, 'az.sess'), max_age=3600)
         INDEX.load(os.path.join(azure_folder, 'commandIndex.json'))
+        ARGUMENT_INDEX.load(os.path.join(azure_folder, 'argumentIndex.json'))
         VERSIONS.load(os.path.join(azure_folder, 'versionCheck.json'))
         handle_version_update()
 
@@ -79,6 +81,9 @@ class AzCli(CLI):
         register_cache_arguments(self)
 
         self.progress_controller = None
+        # Sessions shared by the clients, see client_factory._get_shared_http_session. The copies of the CLI made for
+        # --ids jobs share them too.
+        self.http_sessions = {}
 
     def refresh_request_id(self):
         """Assign a new random GUID as x-ms-client-request-id
@@ -390,11 +395,18 @@ class MainCommandsLoader(CLICommandsLoader):
             index_result = command_index.get(args)
             if index_result:
                 index_modules, index_extensions = index_result
-                # Always load modules and extensions, because some of them (like those in
-                # ALWAYS_LOADED_EXTENSIONS) don't expose a command, but hooks into handlers in CLI core
-                _update_command_table_from_modules(args, index_modules)
-                # The index won't contain suppressed extensions
-                _update_command_table_from_extensions([], index_extensions)
+                # Only build the commands under the invoked command group. Completion needs the whole table of
+                # the loaded modules, as the command being typed is incomplete.
+                if not self.cli_ctx.data['completer_active']:
+                    self.cli_ctx.data['command_group_filter'] = command_index.get_command_group(args)
+                try:
+                    # Always load modules and extensions, because some of them (like those in
+                    # ALWAYS_LOADED_EXTENSIONS) don't expose a command, but hooks into handlers in CLI core
+                    _update_command_table_from_modules(args, index_modules)
+                    # The index won't contain suppressed extensions
+                    _update_command_table_from_extensions([], index_extensions)
+                finally:
+                    self.cli_ctx.data['command_group_filter'] = None
 
                 logger.debug("Loaded %d groups, %d commands.", len(self.command_group_table), len(self.command_table))
                 from azure.cli.core.util import roughly_parse_command
@@ -428,6 +440,8 @@ class MainCommandsLoader(CLICommandsLoader):
 
         # No module found from the index. Load all command modules and extensions
         logger.debug("Loading all modules and extensions")
+        self.command_group_table.clear()
+        self.command_table.clear()
         _update_command_table_from_modules(args)
 
         ext_suppressions = _get_extension_suppressions(self.loaders)
@@ -446,6 +460,10 @@ class MainCommandsLoader(CLICommandsLoader):
             resource_group_name_type, get_location_type, deployment_name_type, vnet_name_type, subnet_name_type)
         from knack.arguments import ignore_type
 
+        argument_index = ArgumentIndex(self.cli_ctx)
+        argument_index.validate()
+        index_revision = argument_index.revision
+
         # omit specific command to load everything
         if command is None:
             command_loaders = set()
@@ -481,10 +499,15 @@ class MainCommandsLoader(CLICommandsLoader):
                 self.extra_argument_registry.update(loader.extra_argument_registry)
                 loader._update_command_definitions()  # pylint: disable=protected-access
 
+        # Arguments of newly reflected commands are added to the index in memory. Persist them all at once.
+        if argument_index.revision != index_revision:
+            argument_index.save()
+
 
 class CommandIndex:
 
     _COMMAND_INDEX = 'commandIndex'
+    _COMMAND_GROUP_INDEX = 'commandGroupIndex'
     _COMMAND_INDEX_VERSION = 'version'
     _COMMAND_INDEX_CLOUD_PROFILE = 'cloudProfile'
 
@@ -528,6 +551,15 @@ class CommandIndex:
         index_modules_extensions = index.get(top_command)
 
         if index_modules_extensions:
+            # Narrow down the modules to those contributing to the invoked command group, like
+            # "network vnet": ["azure.cli.command_modules.network"] for `network vnet create -h`
+            _, group_modules_extensions = self._get_command_group_entry(args)
+            if group_modules_extensions:
+                index_modules_extensions = [m for m in index_modules_extensions if m in group_modules_extensions]
+                if not index_modules_extensions:
+                    logger.debug("Command group index doesn't match the command index for '%s'.", top_command)
+                    return None
+
             # This list contains both built-in modules and extensions
             index_builtin_modules = []
             index_extensions = []
@@ -547,6 +579,29 @@ class CommandIndex:
 
         return None
 
+    def get_command_group(self, args):
+        """Get the deepest indexed command group of a command.
+
+        :param args: command arguments, like ['network', 'vnet', 'create', '-h']
+        :return: the command group name, like 'network vnet', or None if the command group is not indexed.
+        """
+        command_group, _ = self._get_command_group_entry(args)
+        return command_group
+
+    def _get_command_group_entry(self, args):
+        from azure.cli.core.util import roughly_parse_command
+        group_index = self.INDEX[self._COMMAND_GROUP_INDEX]
+        if not group_index or not args:
+            return None, None
+        nouns = roughly_parse_command(args).split()
+        # Positional arguments can follow the command, so look for the longest matching prefix,
+        # like `network vnet` in `network vnet create`
+        for i in range(len(nouns), 0, -1):
+            command_group = ' '.join(nouns[:i])
+            if command_group in group_index:
+                return command_group, group_index[command_group]
+        return None, None
+
     def update(self, command_table):
         """Update the command index according to the given command table.
 
@@ -557,6 +612,7 @@ class CommandIndex:
         self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = self.cloud_profile
         from collections import defaultdict
         index = defaultdict(list)
+        group_index = defaultdict(list)
 
         # self.cli_ctx.invocation.commands_loader.command_table doesn't exist in DummyCli due to the lack of invocation
         for command_name, command in command_table.items():
@@ -566,8 +622,15 @@ class CommandIndex:
             module_name = command.loader.__module__
             if module_name not in index[top_command]:
                 index[top_command].append(module_name)
+            # Register the module for every command group containing the command: <network>, <network vnet>
+            group_nouns = command_name.split()[:-1]
+            for i in range(1, len(group_nouns) + 1):
+                command_group = ' '.join(group_nouns[:i])
+                if module_name not in group_index[command_group]:
+                    group_index[command_group].append(module_name)
         elapsed_time = timeit.default_timer() - start_time
         self.INDEX[self._COMMAND_INDEX] = index
+        self.INDEX[self._COMMAND_GROUP_INDEX] = group_index
         logger.debug("Updated command index in %.3f seconds.", elapsed_time)
 
     def invalidate(self):
@@ -584,7 +647,115 @@ class CommandIndex:
         self.INDEX[self._COMMAND_INDEX_VERSION] = ""
         self.INDEX[self._COMMAND_INDEX_CLOUD_PROFILE] = ""
         self.INDEX[self._COMMAND_INDEX] = {}
+        self.INDEX[self._COMMAND_GROUP_INDEX] = {}
         logger.debug("Command index has been invalidated.")
+        # Installed extensions may override commands or their operations, so the argument index becomes stale too
+        ArgumentIndex().invalidate()
+
+
+class ArgumentIndex:
+
+    _ARGUMENT_INDEX = 'argumentIndex'
+    _ARGUMENT_INDEX_VERSION = 'version'
+    _ARGUMENT_INDEX_CLOUD_PROFILE = 'cloudProfile'
+    # Counts the changes of the index in memory, so it's only saved when there are changes
+    _revision = 0
+
+    def __init__(self, cli_ctx=None):
+        """Class to manage the index of arguments extracted from operation signatures.
+
+        Extracting arguments via reflection requires importing the operation, which usually imports an SDK.
+        The index allows populating the parser without doing so.
+
+        :param cli_ctx: Only needed when `validate`, `get` or `set` is called.
+        """
+        from azure.cli.core._session import ARGUMENT_INDEX
+        self.INDEX = ARGUMENT_INDEX
+        if cli_ctx:
+            self.version = __version__
+            self.cloud_profile = cli_ctx.cloud.profile
+
+    def __len__(self):
+        return len(self.INDEX[self._ARGUMENT_INDEX])
+
+    @property
+    def revision(self):
+        return ArgumentIndex._revision
+
+    def _is_valid(self):
+        index_version = self.INDEX[self._ARGUMENT_INDEX_VERSION]
+        cloud_profile = self.INDEX[self._ARGUMENT_INDEX_CLOUD_PROFILE]
+        return bool(index_version and index_version == self.version and
+                    cloud_profile and cloud_profile == self.cloud_profile)
+
+    def validate(self):
+        """Reset the argument index if its version or cloud profile doesn't match those of the current command."""
+        if not self._is_valid():
+            logger.debug("Argument index version or cloud profile is invalid or doesn't match the current command.")
+            self.INDEX.data[self._ARGUMENT_INDEX_VERSION] = self.version
+            self.INDEX.data[self._ARGUMENT_INDEX_CLOUD_PROFILE] = self.cloud_profile
+            self.INDEX[self._ARGUMENT_INDEX] = {}
+
+    def get(self, command_name, operation, doc_string_source=None):
+        """Get the arguments of a command from the index.
+
+        :param command_name: The command name, like 'network vnet create'
+        :param operation: The operation the command maps to. Entries indexed for a different operation are ignored.
+        :param doc_string_source: The source of the help of the arguments, if not the operation. Entries indexed for
+            a different source are ignored.
+        :return: a list of (name, CLICommandArgument) tuples, or None if the command is not indexed.
+        """
+        from copy import deepcopy
+        from knack.arguments import CLICommandArgument
+        if not self._is_valid():
+            return None
+        entry = self.INDEX[self._ARGUMENT_INDEX].get(command_name)
+        if not entry or entry['operation'] != operation or entry.get('docStringSource') != doc_string_source:
+            return None
+        return [(name, CLICommandArgument(**settings)) for name, settings in deepcopy(entry['arguments'])]
+
+    def set(self, command_name, operation, arguments, doc_string_source=None):
+        """Add the arguments of a command to the index in memory. Call `save` to persist the index.
+
+        Arguments whose settings can't be serialized, like a default value of an enum type, are not indexed.
+
+        :param command_name: The command name, like 'network vnet create'
+        :param operation: The operation the command maps to, like
+            'azure.mgmt.network.operations#VirtualNetworksOperations.get'
+        :param arguments: a list of (name, CLICommandArgument) tuples extracted from the operation signature
+        :param doc_string_source: The source of the help of the arguments, if not the operation
+        """
+        import json
+        if not self._is_valid():
+            return
+        try:
+            # Round trip to detach the entries from the settings, which will be updated by the argument registry
+            entries = json.loads(json.dumps([(name, argument.type.settings) for name, argument in arguments]))
+        except (TypeError, ValueError):
+            logger.debug("Arguments of '%s' can't be serialized and won't be indexed.", command_name)
+            return
+        entry = {'operation': operation, 'arguments': entries}
+        if doc_string_source:
+            entry['docStringSource'] = doc_string_source
+        if self.INDEX[self._ARGUMENT_INDEX].get(command_name) != entry:
+            self.INDEX[self._ARGUMENT_INDEX][command_name] = entry
+            ArgumentIndex._revision += 1
+
+    def save(self):
+        start_time = timeit.default_timer()
+        self.INDEX.save_with_retry()
+        elapsed_time = timeit.default_timer() - start_time
+        logger.debug("Updated argument index in %.3f seconds.", elapsed_time)
+
+    def invalidate(self):
+        """Invalidate the argument index.
+
+        This function is called along with `CommandIndex.invalidate` when installing, updating or removing extensions.
+        """
+        self.INDEX[self._ARGUMENT_INDEX_VERSION] = ""
+        self.INDEX[self._ARGUMENT_INDEX_CLOUD_PROFILE] = ""
+        self.INDEX[self._ARGUMENT_INDEX] = {}
+        logger.debug("Argument index has been invalidated.")
 
 
 class ModExtensionSuppress:  # pylint: disable=too-few-public-methods
@@ -762,6 +933,11 @@ class AzCommandsLoader(CLICommandsLoader):  # pylint: disable=too-many-instance-
 
         name = ' '.join(name.split())
 
+        # Skip building commands outside of the invoked command group, see CommandIndex.get_command_group
+        command_group_filter = self.cli_ctx.data.get('command_group_filter')
+        if command_group_filter and not name.startswith(command_group_filter + ' '):
+            return
+
         client_factory = kwargs.get('client_factory', None)
 
         def default_command_handler(command_args):
@@ -784,9 +960,21 @@ class AzCommandsLoader(CLICommandsLoader):  # pylint: disable=too-many-instance-
             return op(**command_args)
 
         def default_arguments_loader():
-            op = handler or self.get_op_handler(operation, operation_group=kwargs.get('operation_group'))
-            self._apply_doc_string(op, kwargs)
-            cmd_args = list(extract_args_from_signature(op, excluded_params=self.excluded_command_handler_args))
+            # Only operations given by name are indexed. A handler may be built dynamically.
+            argument_index = None
+            if operation and self.cli_ctx.config.getboolean('core', 'use_command_index', fallback=True):
+                argument_index = ArgumentIndex(self.cli_ctx)
+            # The help of the arguments is extracted from the doc string source, so the index is keyed on it too
+            doc_string_source = kwargs.get('doc_string_source', None)
+            if not isinstance(doc_string_source, str):
+                doc_string_source = None
+            cmd_args = argument_index.get(name, operation, doc_string_source) if argument_index is not None else None
+            if cmd_args is None:
+                op = handler or self.get_op_handler(operation, operation_group=kwargs.get('operation_group'))
+                self._apply_doc_string(op, kwargs)
+                cmd_args = list(extract_args_from_signature(op, excluded_params=self.excluded_command_handler_args))
+                if argument_index is not None:
+                    argument_index.set(name, operation, cmd_args, doc_string_source)
             return cmd_args
 
         def default_description_loader():
@@ -841,6 +1029,7 @@ def get_default_cli():
     from azure.cli.core._config import GLOBAL_CONFIG_DIR, ENV_VAR_PREFIX
     from azure.cli.core._help import AzCliHelp
     from azure.cli.core._output import AzOutputProducer
+    from azure.cli.core._query import AzCliQuery
 
     return AzCli(cli_name='az',
                  config_dir=GLOBAL_CONFIG_DIR,
@@ -850,4 +1039,5 @@ def get_default_cli():
                  parser_cls=AzCliCommandParser,
                  logging_cls=AzCliLogging,
                  output_cls=AzOutputProducer,
+                 query_cls=AzCliQuery,
                  help_cls=AzCliHelp)
@@ -3,14 +3,72 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import errno
+import json
+import types
+
 import knack.output
+from knack.events import EVENT_PARSER_GLOBAL_CREATE
+from knack.util import CommandResultItem
+
+# Output formats paged results are streamed to, item by item, rather than collected first
+STREAMED_OUTPUT_FORMATS = ['jsonl']
+# Output formats paged results are streamed to if the `core.stream_output` config is on
+OPT_IN_STREAMED_OUTPUT_FORMATS = ['tsv']
+
+
+def format_jsonl(obj):
+    result = obj.result
+    result_list = result if isinstance(result, list) else [result]
+    encoder_cls = knack.output._ComplexEncoder  # pylint: disable=protected-access
+    return ''.join(json.dumps(item, ensure_ascii=False, sort_keys=True, cls=encoder_cls) + '\n' for item in result_list)
 
 
 class AzOutputProducer(knack.output.OutputProducer):
 
+    _FORMAT_DICT = dict(knack.output.OutputProducer._FORMAT_DICT, jsonl=format_jsonl)  # pylint: disable=protected-access
+
+    @staticmethod
+    def on_global_arguments(cli_ctx, **kwargs):
+        arg_group = kwargs.get('arg_group')
+        arg_group.add_argument('--output', '-o', dest=AzOutputProducer.ARG_DEST,
+                               choices=list(AzOutputProducer._FORMAT_DICT),
+                               default=cli_ctx.config.get('core', 'output', fallback='json'),
+                               help='Output format',
+                               type=str.lower)
+
+    def __init__(self, cli_ctx=None):
+        super(AzOutputProducer, self).__init__(cli_ctx=cli_ctx)
+        self.cli_ctx.unregister_event(EVENT_PARSER_GLOBAL_CREATE, knack.output.OutputProducer.on_global_arguments)
+        self.cli_ctx.register_event(EVENT_PARSER_GLOBAL_CREATE, AzOutputProducer.on_global_arguments)
+
     def check_valid_format_type(self, format_type):
         return format_type in self._FORMAT_DICT
 
+    def get_formatter(self, format_type):
+        if format_type not in knack.output.OutputProducer._FORMAT_DICT:  # pylint: disable=protected-access
+            return AzOutputProducer._FORMAT_DICT[format_type]
+        return super(AzOutputProducer, self).get_formatter(format_type)
+
+    def out(self, obj, formatter=None, out_file=None):
+        if not isinstance(obj.result, types.GeneratorType):
+            super(AzOutputProducer, self).out(obj, formatter=formatter, out_file=out_file)
+            return
+
+        # A streamed result is formatted and written item by item, as its pages are fetched
+        for item in obj.result:
+            chunk = CommandResultItem([item], table_transformer=obj.table_transformer,
+                                      is_query_active=obj.is_query_active)
+            try:
+                print(formatter(chunk), file=out_file, end='')
+            except IOError as ex:
+                if ex.errno == errno.EPIPE:
+                    # The reader is gone, like `head` is after the lines it needs, so stop fetching pages
+                    return
+                raise
+            except UnicodeEncodeError:
+                super(AzOutputProducer, self).out(chunk, formatter=formatter, out_file=out_file)
+
 
 def get_output_format(cli_ctx):
     return cli_ctx.invocation.data.get("output", None)
@@ -19,3 +77,11 @@ def get_output_format(cli_ctx):
 def set_output_format(cli_ctx, desired_format):
     if cli_ctx.output.check_valid_format_type(desired_format):
         cli_ctx.invocation.data["output"] = desired_format
+
+
+def is_streamed_output(cli_ctx, format_type):
+    """Whether paged results are streamed to the given output format."""
+    if format_type in STREAMED_OUTPUT_FORMATS:
+        return True
+    return format_type in OPT_IN_STREAMED_OUTPUT_FORMATS and \
+        cli_ctx.config.getboolean('core', 'stream_output', fallback=False)
@@ -12,6 +12,7 @@ import os
 import os.path
 import re
 import string
+from contextlib import contextmanager
 from copy import deepcopy
 from enum import Enum
 
@@ -76,6 +77,12 @@ _SYSTEM_ASSIGNED_IDENTITY = 'systemAssignedIdentity'
 _USER_ASSIGNED_IDENTITY = 'userAssignedIdentity'
 _ASSIGNED_IDENTITY_INFO = 'assignedIdentityInfo'
 
+# ADAL refreshes an access token this long before it expires
+_TOKEN_REFRESH_BUFFER_MINUTES = 5
+
+# The attempts to swap in a new token file, as on Windows it can't be replaced while another process has it open
+_TOKEN_FILE_REPLACE_ATTEMPTS = 3
+
 _AZ_LOGIN_MESSAGE = "Please run 'az login' to setup account."
 
 
@@ -125,6 +132,39 @@ def _delete_file(file_path):
             raise
 
 
+def _write_tokens_to_file(file_path, entries):
+    """Write a new file and swap it in, so other processes never read a partially written one. Must be called with
+    the token file locked."""
+    import time
+    if os.path.islink(file_path):
+        # write the file the link points to, rather than replacing the link
+        file_path = os.path.realpath(file_path)
+    content = json.dumps(entries)
+    temp_file_path = '{}.{}.tmp'.format(file_path, os.getpid())
+    with os.fdopen(os.open(temp_file_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+') as cred_file:
+        cred_file.write(content)
+    for attempt in range(_TOKEN_FILE_REPLACE_ATTEMPTS):
+        try:
+            os.replace(temp_file_path, file_path)
+            return
+        except PermissionError as ex:
+            logger.debug("Failed to replace the token file. %s", ex)
+            if attempt + 1 < _TOKEN_FILE_REPLACE_ATTEMPTS:
+                time.sleep(0.1 * (attempt + 1))
+    # The file is still in use, so it's written in place. That's safe from other az processes, which only write it
+    # with the token file locked.
+    _delete_file(temp_file_path)
+    with os.fdopen(os.open(file_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600), 'w+') as cred_file:
+        cred_file.write(content)
+
+
+def _get_token_entry_key(entry):
+    if entry.get(_SERVICE_PRINCIPAL_ID):
+        return entry[_SERVICE_PRINCIPAL_ID], entry.get(_SERVICE_PRINCIPAL_TENANT)
+    return (entry.get('_authority'), entry.get('resource'), entry.get('_clientId'),
+            entry.get(_TOKEN_ENTRY_USER_ID))
+
+
 def get_credential_types(cli_ctx):
 
     class CredentialType(Enum):  # pylint: disable=too-few-public-methods
@@ -980,6 +1020,7 @@ class CredsCache:
     '''
 
     def __init__(self, cli_ctx, auth_ctx_factory=None, async_persist=True):
+        import threading
         # AZURE_ACCESS_TOKEN_FILE is used by Cloud Console and not meant to be user configured
         self._token_file = (os.environ.get('AZURE_ACCESS_TOKEN_FILE', None) or
                             os.path.join(get_config_dir(), 'accessTokens.json'))
@@ -989,6 +1030,10 @@ class CredsCache:
         self._should_flush_to_disk = False
         self._async_persist = async_persist
         self._ctx = cli_ctx
+        # The entries of the token file as this process last read or wrote them, keyed by _get_token_entry_key
+        self._persisted_entries = {}
+        self._lock = threading.RLock()
+        self._lock_file = None
         if async_persist:
             import atexit
             atexit.register(self.flush_to_disk)
@@ -1001,20 +1046,79 @@ class CredsCache:
 
     def flush_to_disk(self):
         if self._should_flush_to_disk:
-            with os.fdopen(os.open(self._token_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600),
-                           'w+') as cred_file:
-                items = self.adal_token_cache.read_items()
-                all_creds = [entry for _, entry in items]
-
-                # trim away useless fields (needed for cred sharing with xplat)
-                for i in all_creds:
-                    for key in TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE:
-                        i.pop(key, None)
+            with self._lock_token_file():
+                self._merge_to_disk()
+
+    @contextmanager
+    def _lock_token_file(self):
+        """Serialize the updates of the token file between threads and az processes. Reentrant."""
+        import portalocker
+        with self._lock:
+            if self._lock_file:
+                yield
+                return
+            # The lock file is left behind: if it were removed, another process could lock a new one while a
+            # waiting process gets the lock of the removed one
+            self._lock_file = open(self._token_file + '.lock', 'a')
+            try:
+                portalocker.lock(self._lock_file, portalocker.LOCK_EX)
+                yield
+            finally:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def _get_entries_to_persist(self):
+        entries = []
+        for _, entry in self.adal_token_cache.read_items():
+            # trim away useless fields (needed for cred sharing with xplat)
+            entries.append({k: v for k, v in entry.items() if k not in TOKEN_FIELDS_EXCLUDED_FROM_PERSISTENCE})
+        entries.extend(self._service_principal_creds)
+        return collections.OrderedDict((_get_token_entry_key(e), e) for e in entries)
+
+    def _merge_to_disk(self):
+        """Write the entries this process added, updated or removed to the token file, keeping the entries other
+        processes wrote since it was read. Must be called with the token file locked."""
+        entries = self._get_entries_to_persist()
+        try:
+            on_disk = _load_tokens_from_file(self._token_file)
+        except CLIError as ex:
+            logger.debug("Overwriting the token file. %s", ex)
+            on_disk = []
+        merged = collections.OrderedDict((_get_token_entry_key(e), e) for e in on_disk)
+        for key in self._persisted_entries:
+            if key not in entries:
+                merged.pop(key, None)
+        for key, entry in entries.items():
+            if self._persisted_entries.get(key) != entry:
+                merged[key] = entry
+        _write_tokens_to_file(self._token_file, list(merged.values()))
+        self._persisted_entries = deepcopy(entries)
+        self._should_flush_to_disk = False
 
-                all_creds.extend(self._service_principal_creds)
-                cred_file.write(json.dumps(all_creds))
+    def _is_token_fresh(self, username, resource):
+        from datetime import datetime, timedelta
+        from dateutil import parser
+        for entry in self.adal_token_cache.find({_TOKEN_ENTRY_USER_ID: username, '_clientId': _CLIENT_ID}):
+            if entry.get('resource') != resource or not entry.get('expiresOn'):
+                continue
+            expires_on = parser.parse(entry['expiresOn'])
+            if expires_on > datetime.now(expires_on.tzinfo) + timedelta(minutes=_TOKEN_REFRESH_BUFFER_MINUTES):
+                return True
+        return False
 
     def retrieve_token_for_user(self, username, tenant, resource):
+        if self._is_token_fresh(username, resource):
+            return self._retrieve_token_for_user(username, tenant, resource)
+
+        # The token is going to be refreshed. Do it one process at a time and re-read the token file first, so
+        # processes waiting for the lock use the token refreshed by the first one rather than refreshing it again.
+        with self._lock_token_file():
+            self._reload_adal_token_cache()
+            result = self._retrieve_token_for_user(username, tenant, resource)
+            self.flush_to_disk()
+        return result
+
+    def _retrieve_token_for_user(self, username, tenant, resource):
         context = self._auth_ctx_factory(self._ctx, tenant, cache=self.adal_token_cache)
         token_entry = context.acquire_token(resource, username, _CLIENT_ID)
         if not token_entry:
@@ -1076,12 +1180,28 @@ class CredsCache:
     def load_adal_token_cache(self):
         if self._adal_token_cache_attr is None:
             import adal
-            all_entries = _load_tokens_from_file(self._token_file)
-            self._load_service_principal_creds(all_entries)
-            real_token = [x for x in all_entries if x not in self._service_principal_creds]
-            self._adal_token_cache_attr = adal.TokenCache(json.dumps(real_token))
+            self._adal_token_cache_attr = adal.TokenCache()
+            self._load_from_token_file()
         return self._adal_token_cache_attr
 
+    def _reload_adal_token_cache(self):
+        """Pick up the changes other processes made to the token file. Must be called with the token file locked."""
+        if self._should_flush_to_disk:
+            self._merge_to_disk()
+        if self._adal_token_cache_attr is None:
+            self.load_adal_token_cache()
+        else:
+            self._load_from_token_file()
+
+    def _load_from_token_file(self):
+        all_entries = _load_tokens_from_file(self._token_file)
+        self._service_principal_creds = []
+        self._load_service_principal_creds(all_entries)
+        real_token = [x for x in all_entries if x not in self._service_principal_creds]
+        self._adal_token_cache_attr.deserialize(json.dumps(real_token))
+        self._adal_token_cache_attr.has_state_changed = False
+        self._persisted_entries = deepcopy(self._get_entries_to_persist())
+
     def save_service_principal_cred(self, sp_entry):
         self.load_adal_token_cache()
         matched = [x for x in self._service_principal_creds
@@ -1129,7 +1249,8 @@ class CredsCache:
 
     def remove_all_cached_creds(self):
         # we can clear file contents, but deleting it is simpler
-        _delete_file(self._token_file)
+        with self._lock_token_file():
+            _delete_file(self._token_file)
 
 
 class ServicePrincipalAuth:
@@ -0,0 +1,97 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import collections
+import types
+
+import knack.query
+from knack.events import EVENT_INVOKER_POST_PARSE_ARGS, EVENT_INVOKER_FILTER_RESULT
+
+from azure.cli.core._output import is_streamed_output
+
+
+class AzCliQuery(knack.query.CLIQuery):
+
+    @staticmethod
+    def handle_query_parameter(cli_ctx, **kwargs):
+        args = kwargs['args']
+        query_expression = args._jmespath_query  # pylint: disable=protected-access
+        del args._jmespath_query
+        if query_expression:
+            def filter_output(cli_ctx, **kwargs):
+                result = search_result(query_expression, kwargs['event_data']['result'])
+                if isinstance(result, types.GeneratorType) and \
+                        not is_streamed_output(cli_ctx, cli_ctx.invocation.data['output']):
+                    result = list(result)
+                kwargs['event_data']['result'] = result
+                cli_ctx.unregister_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.register_event(EVENT_INVOKER_FILTER_RESULT, filter_output)
+            cli_ctx.invocation.data['query_active'] = True
+            cli_ctx.invocation.data['query_expression'] = query_expression
+
+    def __init__(self, cli_ctx=None):
+        super(AzCliQuery, self).__init__(cli_ctx=cli_ctx)
+        self.cli_ctx.unregister_event(EVENT_INVOKER_POST_PARSE_ARGS, knack.query.CLIQuery.handle_query_parameter)
+        self.cli_ctx.register_event(EVENT_INVOKER_POST_PARSE_ARGS, AzCliQuery.handle_query_parameter)
+
+
+def is_item_query(query_expression):
+    """Whether a compiled JMESPath query projects or filters a list item by item, like `[].name`."""
+    from jmespath import Options
+    return _get_item_search(query_expression.parsed, Options()) is not None
+
+
+def search_result(query_expression, result):
+    """Apply a compiled JMESPath query to the result of a command.
+
+    A streamed result (a generator of items) stays streamed if the query projects or filters the items one by one,
+    like `[].name` or `[?location=='westus']`. Otherwise the items are collected for the query.
+    """
+    from jmespath import Options
+    options = Options(collections.OrderedDict)
+    if isinstance(result, types.GeneratorType):
+        search_item = _get_item_search(query_expression.parsed, options)
+        if search_item:
+            return (value for item in result for value in search_item(item))
+        result = list(result)
+    return query_expression.search(result, options)
+
+
+def _get_item_search(parsed, options):
+    """Get a function returning the values a list projection gives for one item of the list, or None if the query
+    is not a list projection."""
+    from jmespath.visitor import TreeInterpreter
+    if parsed['type'] == 'projection':
+        (left, right), condition = parsed['children'], None
+    elif parsed['type'] == 'filter_projection':
+        left, right, condition = parsed['children']
+    else:
+        return None
+
+    if left['type'] == 'flatten' and left['children'][0]['type'] == 'identity':
+        flatten = True
+    elif left['type'] == 'identity':
+        flatten = False
+    else:
+        return None
+
+    interpreter = TreeInterpreter(options)
+
+    def _search_item(item):
+        values = []
+        for element in (item if flatten and isinstance(item, list) else [item]):
+            if condition is not None and _is_false(interpreter.visit(condition, element)):
+                continue
+            value = interpreter.visit(right, element)
+            if value is not None:
+                values.append(value)
+        return values
+
+    return _search_item
+
+
+def _is_false(value):
+    # JMESPath's notion of false
+    return value is None or value is False or value in ('', [], {})
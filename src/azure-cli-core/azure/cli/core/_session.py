@@ -6,6 +6,7 @@
 import json
 import logging
 import os
+import threading
 import time
 
 try:
@@ -108,6 +109,9 @@ SESSION = Session()
 # INDEX contains {top-level command: [command_modules and extensions]} mapping index
 INDEX = Session()
 
+# ARGUMENT_INDEX contains {command: [arguments extracted from the operation signature]} mapping index
+ARGUMENT_INDEX = Session()
+
 # VERSIONS provides local versions and pypi versions.
 # DO NOT USE it to get the current version of azure-cli,
 # it could be lagged behind and can be used to check whether
@@ -116,3 +120,39 @@ VERSIONS = Session()
 
 # EXT_CMD_TREE provides command to extension name mapping
 EXT_CMD_TREE = Session()
+
+
+# Setting this environment variable disables the caches of command results in the config dir, like the test SDK does
+# so that the commands of a test make the same requests whatever was cached by earlier commands
+ENV_DISABLE_CACHES = 'AZURE_CLI_DISABLE_CACHES'
+
+_cache_sessions = {}
+_cache_sessions_lock = threading.Lock()
+
+
+def get_cache_path(*parts):
+    """Get the path of a cache file or directory in the config dir.
+
+    :return: The path, or None if the caches are disabled
+    """
+    if os.environ.get(ENV_DISABLE_CACHES, '').lower() in ('1', 'true', 'yes', 'on'):
+        return None
+    from azure.cli.core._environment import get_config_dir
+    return os.path.join(get_config_dir(), *parts)
+
+
+def get_cache_session(name):
+    """Get the session of a cache file in the config dir, loaded once for the process.
+
+    :return: The session, or None if the caches are disabled
+    """
+    filename = get_cache_path(name)
+    if filename is None:
+        return None
+    with _cache_sessions_lock:
+        session = _cache_sessions.get(filename)
+        if session is None:
+            session = Session()
+            session.load(filename)
+            _cache_sessions[filename] = session
+    return session
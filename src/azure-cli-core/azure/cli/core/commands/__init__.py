@@ -15,6 +15,7 @@ import os
 import re
 import sys
 import time
+import timeit
 import copy
 from importlib import import_module
 import six
@@ -28,6 +29,8 @@ from azure.cli.core.commands.parameters import (
 from azure.cli.core.extension import get_extension
 from azure.cli.core.util import get_command_type_kwarg, read_file_content, get_arg_list, poller_classes
 from azure.cli.core.local_context import LocalContextAction
+from azure.cli.core._output import is_streamed_output
+from azure.cli.core._query import is_item_query
 import azure.cli.core.telemetry as telemetry
 
 
@@ -307,9 +310,13 @@ class AzCliCommand(CLICommand):
                     overrides.settings['default_value_source'] = 'Local Context'
 
     def load_arguments(self):
-        super(AzCliCommand, self).load_arguments()
+        # Don't call CLICommand.load_arguments, which would run the arguments loader a second time
         if self.arguments_loader:
             cmd_args = self.arguments_loader()
+            if self.confirmation:
+                cmd_args.append(('yes',
+                                 CLICommandArgument(dest='yes', options_list=['--yes', '-y'],
+                                                    action='store_true', help='Do not prompt for confirmation.')))
             if self.supports_no_wait or self.no_wait_param:
                 if self.supports_no_wait:
                     no_wait_param_dest = 'no_wait'
@@ -490,6 +497,69 @@ def get_property(items, name):
     return result
 
 
+class _AdaptiveConcurrencyLimiter(object):
+    """Limit the number of --ids jobs running at the same time, according to the ARM request quota left.
+
+    ARM reports the requests left in the current throttling window with `x-ms-ratelimit-remaining-*` response
+    headers. The limit is halved when few requests are left or the requests are throttled, and raised again one job at
+    a time while enough are left.
+    """
+
+    _RATELIMIT_HEADER_PREFIX = 'x-ms-ratelimit-remaining-'
+    _REMAINING_LOW = 50
+    _REMAINING_HIGH = 200
+
+    def __init__(self, max_concurrency):
+        import threading
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self._running = 0
+        self._condition = threading.Condition()
+
+    def __deepcopy__(self, memo):
+        # Shared by all the copies of the CLI context made for the jobs
+        return self
+
+    def __enter__(self):
+        with self._condition:
+            while self._running >= self.limit:
+                self._condition.wait()
+            self._running += 1
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        with self._condition:
+            self._running -= 1
+            self._condition.notify_all()
+
+    @staticmethod
+    def _get_remaining_requests(headers):
+        remaining = []
+        for name, value in headers.items():
+            if not name.lower().startswith(_AdaptiveConcurrencyLimiter._RATELIMIT_HEADER_PREFIX):
+                continue
+            # x-ms-ratelimit-remaining-resource holds policies like 'Microsoft.Compute/HighCostGet3Min;107'
+            for policy in str(value).split(','):
+                try:
+                    remaining.append(int(policy.rsplit(';', 1)[-1]))
+                except ValueError:
+                    pass
+        return min(remaining) if remaining else None
+
+    def observe(self, status_code, headers):
+        remaining = self._get_remaining_requests(headers)
+        with self._condition:
+            limit = self.limit
+            if status_code == 429 or (remaining is not None and remaining < self._REMAINING_LOW):
+                self.limit = max(1, self.limit // 2)
+            elif remaining is not None and remaining > self._REMAINING_HIGH:
+                self.limit = min(self.max_concurrency, self.limit + 1)
+            if self.limit != limit:
+                logger.debug("Concurrency of --ids changed from %d to %d. Requests left: %s, status code: %s",
+                             limit, self.limit, remaining, status_code)
+                self._condition.notify_all()
+
+
 # pylint: disable=too-few-public-methods
 class AzCliCommandInvoker(CommandInvoker):
 
@@ -643,7 +713,22 @@ class AzCliCommandInvoker(CommandInvoker):
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
-        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
+        # The items of a paged result of a single job are converted one at a time as the pages are fetched, rather
+        # than collected first, if they are streamed to the output format, like jsonl, or --query projects them one
+        # by one, like `[].name` does
+        query_expression = self.data.get('query_expression', None)
+        self.data['stream_result'] = len(jobs) == 1 and (
+            is_streamed_output(self.cli_ctx, self.data['output']) or
+            (query_expression is not None and is_item_query(query_expression)))
+        ids_handler = cmd.command_kwargs.get('ids_handler', None)
+        disable_concurrent_ids = self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False)
+        exit_code = 0
+        if ids_handler and len(ids) > 1 and not disable_concurrent_ids:
+            # The command handles all the ids at once, like `wait` polling all the resources in one loop. Its result
+            # summarizes the ids, and the command still fails if any of them did
+            results, exceptions = ids_handler([self._filter_params(expanded_arg) for expanded_arg, _ in jobs], ids)
+            exit_code = 1 if exceptions else 0
+        elif disable_concurrent_ids or len(ids) < 2:
             results, exceptions = self._run_jobs_serially(jobs, ids)
         else:
             results, exceptions = self._run_jobs_concurrently(jobs, ids)
@@ -674,7 +759,8 @@ class AzCliCommandInvoker(CommandInvoker):
         return CommandResultItem(
             event_data['result'],
             table_transformer=self.commands_loader.command_table[parsed_args.command].table_transformer,
-            is_query_active=self.data['query_active'])
+            is_query_active=self.data['query_active'],
+            exit_code=exit_code)
 
     @staticmethod
     def _extract_parameter_names(args):
@@ -682,8 +768,9 @@ class AzCliCommandInvoker(CommandInvoker):
         return [(p.split('=', 1)[0] if p.startswith('--') else p[:2]) for p in args if
                 (p.startswith('-') and not p.startswith('---') and len(p) > 1)]
 
-    def _run_job(self, expanded_arg, cmd_copy):
+    def _run_job(self, expanded_arg, cmd_copy, id_arg=None):
         params = self._filter_params(expanded_arg)
+        start_time = timeit.default_timer()
         try:
             result = cmd_copy(params)
             if cmd_copy.supports_no_wait and getattr(expanded_arg, 'no_wait', False):
@@ -698,6 +785,8 @@ class AzCliCommandInvoker(CommandInvoker):
             if _is_poller(result):
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
             elif _is_paged(result):
+                if self.data.get('stream_result'):
+                    return self._stream_paged_result(result, cmd_copy)
                 result = list(result)
 
             result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
@@ -709,28 +798,55 @@ class AzCliCommandInvoker(CommandInvoker):
                 cmd_copy.exception_handler(ex)
                 return CommandResultItem(None, exit_code=1, error=ex)
             six.reraise(*sys.exc_info())
+        finally:
+            if id_arg:
+                logger.debug("Job for '%s' finished in %.3f seconds.", id_arg, timeit.default_timer() - start_time)
+
+    @staticmethod
+    def _stream_paged_result(result, cmd_copy):
+        # Items are converted and transformed one at a time as the pages are fetched
+        try:
+            for item in result:
+                event_data = {'result': todict(item, AzCliCommandInvoker.remove_additional_prop_layer)}
+                cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+                yield event_data['result']
+        except Exception as ex:  # pylint: disable=broad-except
+            if cmd_copy.exception_handler:
+                cmd_copy.exception_handler(ex)
+            raise
 
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
         for job, id_arg in zip(jobs, ids):
             expanded_arg, cmd_copy = job
             try:
-                results.append(self._run_job(expanded_arg, cmd_copy))
+                results.append(self._run_job(expanded_arg, cmd_copy, id_arg))
             except(Exception, SystemExit) as ex:  # pylint: disable=broad-except
                 exceptions.append((ex, id_arg))
         return results, exceptions
 
+    def _run_limited_job(self, limiter, expanded_arg, cmd_copy, id_arg):
+        with limiter:
+            return self._run_job(expanded_arg, cmd_copy, id_arg)
+
     def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
+        max_workers = self.cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=10)
+        if max_workers < 1:
+            raise CLIError("Configuration 'core.max_concurrent_ids' should be a positive integer.")
+        limiter = _AdaptiveConcurrencyLimiter(max_workers)
         tasks, results, exceptions = [], [], []
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (expanded_arg, cmd_copy), id_arg in zip(jobs, ids):
+                # Clients created by the job report the response headers to the limiter
+                cmd_copy.cli_ctx.data['response_observer'] = limiter.observe
+                tasks.append(executor.submit(self._run_limited_job, limiter, expanded_arg, cmd_copy, id_arg))
+            # Results are kept in the order of the ids
+            for task, id_arg in zip(tasks, ids):
                 try:
                     results.append(task.result())
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+                    exceptions.append((ex, id_arg))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -860,6 +976,11 @@ class AzCliCommandInvoker(CommandInvoker):
             pass
 
 
+# in seconds, the activity log of a deployment is queried from this interval in verbose mode, up to the maximum one
+_PROGRESS_REPORT_INTERVAL = 10
+_MAX_PROGRESS_REPORT_INTERVAL = 60
+
+
 class LongRunningOperation:  # pylint: disable=too-few-public-methods
     def __init__(self, cli_ctx, start_msg='', finish_msg='', poller_done_interval_ms=1000.0):
 
@@ -869,9 +990,23 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
         self.poller_done_interval_ms = poller_done_interval_ms
         self.deploy_dict = {}
         self.last_progress_report = datetime.datetime.now()
+        self.progress_report_interval = datetime.timedelta(seconds=_PROGRESS_REPORT_INTERVAL)
+
+    def _delay(self, poller=None):
+        """Wait until the poller is done, for up to the interval at which the progress is updated.
 
-    def _delay(self):
-        time.sleep(self.poller_done_interval_ms / 1000.0)
+        The SDK pollers poll the operation in their own thread, honoring its Retry-After header, so their thread is
+        joined rather than checked every interval.
+        """
+        timeout = self.poller_done_interval_ms / 1000.0
+        if not isinstance(poller, poller_classes()):
+            time.sleep(timeout)
+            return
+        try:
+            poller.wait(timeout)
+        except Exception:  # pylint: disable=broad-except
+            # the poller is done, the error is raised by result()
+            pass
 
     def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
         """ gets the progress for template deployments """
@@ -958,14 +1093,17 @@ class LongRunningOperation:  # pylint: disable=too-few-public-methods
                 pass
 
             current_time = datetime.datetime.now()
-            if is_verbose and current_time - self.last_progress_report >= datetime.timedelta(seconds=10):
+            if is_verbose and current_time - self.last_progress_report >= self.progress_report_interval:
                 self.last_progress_report = current_time
+                # the activity log is queried less and less often, as it counts against the ARM read quota
+                self.progress_report_interval = min(self.progress_report_interval * 2,
+                                                    datetime.timedelta(seconds=_MAX_PROGRESS_REPORT_INTERVAL))
                 try:
                     self._generate_template_progress(correlation_id)
                 except Exception as ex:  # pylint: disable=broad-except
                     logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
             try:
-                self._delay()
+                self._delay(poller)
             except KeyboardInterrupt:
                 self.cli_ctx.get_progress_controller().stop()
                 logger.error('Long-running operation wait cancelled.  %s', correlation_message)
@@ -1103,6 +1241,9 @@ def _load_azure_exception_class():
 def _is_paged(obj):
     # Since loading msrest is expensive, we avoid it until we have to
     import collections
+    import types
+    if isinstance(obj, types.GeneratorType):
+        return True
     if isinstance(obj, collections.Iterable) \
             and not isinstance(obj, list) \
             and not isinstance(obj, dict):
@@ -642,10 +642,11 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
                     provisioning_state = additional_properties.get('provisioningState')
         return provisioning_state
 
-    def handler(args):
+    def get_wait_check(args):
+        """ Get the function checking the wait condition of a resource once, and the timeout and interval to check it
+        with. The function returns whether the condition is met and raises if the resource will never meet it. """
         from azure.cli.core.commands.client_factory import resolve_client_arg_name
         from msrest.exceptions import ClientException
-        import time
 
         context_copy = copy.copy(context)
         getter_args = dict(extract_args_from_signature(context.get_op_handler(
@@ -675,35 +676,43 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
             raise CLIError(
                 "incorrect usage: --created | --updated | --deleted | --exists | --custom JMESPATH")
 
-        progress_indicator = context_copy.cli_ctx.get_progress_controller()
+        def check():
+            try:
+                instance = getter(**args)
+            except ClientException as ex:
+                if getattr(ex, 'status_code', None) == 404:
+                    if wait_for_deleted:
+                        return True
+                    if any([wait_for_created, wait_for_exists, custom_condition]):
+                        return False
+                raise
+            if wait_for_exists:
+                return True
+            provisioning_state = get_provisioning_state(instance)
+            # until we have any needs to wait for 'Failed', let us bail out on this
+            if provisioning_state:
+                provisioning_state = provisioning_state.lower()
+            if provisioning_state == 'failed':
+                raise CLIError('The operation failed')
+            return bool(((wait_for_created or wait_for_updated) and provisioning_state == 'succeeded') or
+                        custom_condition and bool(verify_property(instance, custom_condition)))
+
+        return check, timeout, interval
+
+    def handler(args):
+        import time
+
+        cli_ctx = args['cmd'].cli_ctx
+        check, timeout, interval = get_wait_check(args)
+
+        progress_indicator = cli_ctx.get_progress_controller()
         progress_indicator.begin()
         for _ in range(0, timeout, interval):
             try:
                 progress_indicator.add(message='Waiting')
-                instance = getter(**args)
-                if wait_for_exists:
-                    progress_indicator.end()
-                    return None
-                provisioning_state = get_provisioning_state(instance)
-                # until we have any needs to wait for 'Failed', let us bail out on this
-                if provisioning_state:
-                    provisioning_state = provisioning_state.lower()
-                if provisioning_state == 'failed':
-                    progress_indicator.stop()
-                    raise CLIError('The operation failed')
-                if ((wait_for_created or wait_for_updated) and provisioning_state == 'succeeded') or \
-                        custom_condition and bool(verify_property(instance, custom_condition)):
+                if check():
                     progress_indicator.end()
                     return None
-            except ClientException as ex:
-                progress_indicator.stop()
-                if getattr(ex, 'status_code', None) == 404:
-                    if wait_for_deleted:
-                        return None
-                    if not any([wait_for_created, wait_for_exists, custom_condition]):
-                        raise
-                else:
-                    raise
             except Exception:  # pylint: disable=broad-except
                 progress_indicator.stop()
                 raise
@@ -713,7 +722,70 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
         progress_indicator.end()
         return CLIError('Wait operation timed-out after {} seconds'.format(timeout))
 
-    context._cli_command(name, handler=handler, argument_loader=generic_wait_arguments_loader, **kwargs)  # pylint: disable=protected-access
+    def ids_handler(args_list, ids):
+        """ Wait on all the resources given with --ids in one loop. Every round checks the resources still pending
+        concurrently, then sleeps once for all of them. The interval is doubled while ARM throttles the requests.
+
+        :return: A result summarizing the ids that succeeded, failed and timed out, and the (exception, id) of the
+            resources that failed or timed out, which make the command fail.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from azure.cli.core.commands import _AdaptiveConcurrencyLimiter
+        import time
+
+        cli_ctx = args_list[0]['cmd'].cli_ctx
+        max_workers = cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=10)
+        if max_workers < 1:
+            raise CLIError("Configuration 'core.max_concurrent_ids' should be a positive integer.")
+        limiter = _AdaptiveConcurrencyLimiter(max_workers)
+
+        pending = OrderedDict()
+        timeout, interval = None, None
+        for args, id_arg in zip(args_list, ids):
+            # Clients created for the check report the response headers to the limiter
+            args['cmd'].cli_ctx.data['response_observer'] = limiter.observe
+            pending[id_arg], timeout, interval = get_wait_check(args)
+
+        def run_check(check):
+            with limiter:
+                return check()
+
+        summary, exceptions = OrderedDict([('succeeded', []), ('failed', []), ('timedOut', [])]), []
+        progress_indicator = cli_ctx.get_progress_controller()
+        progress_indicator.begin()
+        waited, current_interval = 0, interval
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending and waited < timeout:
+                progress_indicator.add(message='Waiting for {} of {} resources'.format(len(pending), len(ids)))
+                tasks = [(id_arg, executor.submit(run_check, check)) for id_arg, check in pending.items()]
+                for id_arg, task in tasks:
+                    try:
+                        done = task.result()
+                    except Exception as ex:  # pylint: disable=broad-except
+                        exceptions.append((ex, id_arg))
+                        summary['failed'].append(id_arg)
+                        done = True
+                    else:
+                        if done:
+                            summary['succeeded'].append(id_arg)
+                    if done:
+                        del pending[id_arg]
+                if not pending:
+                    break
+                # The limiter is lowered when the requests are throttled or few requests are left
+                current_interval = current_interval * 2 if limiter.limit < max_workers else interval
+                current_interval = max(1, min(current_interval, timeout - waited))
+                time.sleep(current_interval)
+                waited += current_interval
+        progress_indicator.end()
+
+        for id_arg in pending:
+            exceptions.append((CLIError('Wait operation timed-out after {} seconds'.format(timeout)), id_arg))
+            summary['timedOut'].append(id_arg)
+        return [summary], exceptions
+
+    context._cli_command(name, handler=handler, argument_loader=generic_wait_arguments_loader,  # pylint: disable=protected-access
+                         ids_handler=ids_handler, **kwargs)
 
 
 def _cli_show_command(context, name, getter_op, custom_command=False, **kwargs):
@@ -3,6 +3,8 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import threading
+
 import azure.cli.core._debug as _debug
 from azure.cli.core.extension import EXTENSIONS_MOD_PREFIX
 from azure.cli.core.profiles._shared import get_client_class, SDKProfile
@@ -14,6 +16,9 @@ from knack.util import CLIError
 
 logger = get_logger(__name__)
 
+_DEFAULT_HTTP_POOL_SIZE = 10
+_http_sessions_lock = threading.Lock()
+
 
 def resolve_client_arg_name(operation, kwargs):
     if not isinstance(operation, str):
@@ -101,6 +106,17 @@ def configure_common_settings(cli_ctx, client):
                                   ' '.join(cli_ctx.data['safe_params']))
     client.config.generate_client_request_id = 'x-ms-client-request-id' not in cli_ctx.data['headers']
 
+    # Reuse the connections of the other clients instead of opening a session per client
+    if hasattr(cli_ctx, 'http_sessions') and hasattr(client.config, 'session_configuration_callback'):
+        _use_shared_http_session(cli_ctx, client.config)
+        client.config.keep_alive = True
+
+    response_observer = cli_ctx.data.get('response_observer')
+    if response_observer:
+        def _observe_response(response, *args, **kwargs):  # pylint: disable=unused-argument
+            response_observer(response.status_code, response.headers)
+        client.config.hooks.append(_observe_response)
+
 
 def configure_common_settings_track2(cli_ctx):
     client_kwargs = {}
@@ -127,9 +143,80 @@ def configure_common_settings_track2(cli_ctx):
     if 'x-ms-client-request-id' in cli_ctx.data['headers']:
         client_kwargs['request_id'] = cli_ctx.data['headers']['x-ms-client-request-id']
 
+    response_observer = cli_ctx.data.get('response_observer')
+    if response_observer:
+        def _observe_response(response):
+            response_observer(response.http_response.status_code, response.http_response.headers)
+        client_kwargs['raw_response_hook'] = _observe_response
+
+    if hasattr(cli_ctx, 'http_sessions'):
+        client_kwargs['transport'] = _get_shared_transport_track2(cli_ctx)
+
     return client_kwargs
 
 
+def _get_shared_http_session(cli_ctx, kind, create_session):
+    """Get the requests session shared by the clients of the CLI, so that connections are kept alive between them.
+
+    The sessions of msrest and azure-core based clients are initialized differently, with retries done by requests
+    or by the pipeline, so they are shared separately. The pool holds a connection for each concurrent --ids job.
+    """
+    with _http_sessions_lock:
+        session = cli_ctx.http_sessions.get(kind)
+        if session is None:
+            session = create_session()
+            pool_size = max(_DEFAULT_HTTP_POOL_SIZE,
+                            cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=_DEFAULT_HTTP_POOL_SIZE))
+            for prefix, adapter in list(session.adapters.items()):
+                session.mount(prefix, type(adapter)(pool_maxsize=pool_size, max_retries=adapter.max_retries))
+            cli_ctx.http_sessions[kind] = session
+    return session
+
+
+def _use_shared_http_session(cli_ctx, config):
+    """Send the requests of a msrest based client with the shared session.
+
+    msrest keeps a session per thread, so rather than replacing it, the shared session is passed with each request
+    through the session configuration callback. The credentials sign the session of the thread, so its headers and
+    auth are passed along with the request instead of being set on the shared session.
+    """
+    from msrest.universal_http.requests import RequestsHTTPSender
+
+    def _create_session():
+        session = RequestsHTTPSender(config).session
+        session.max_redirects = int(config.redirect_policy())
+        session.trust_env = bool(config.proxies.use_env_settings)
+        return session
+
+    shared_session = _get_shared_http_session(cli_ctx, 'msrest', _create_session)
+    configure_session = config.session_configuration_callback
+
+    def _configure_session(session, config, kwargs, **requests_kwargs):
+        requests_kwargs = configure_session(session, config, kwargs, **requests_kwargs) or requests_kwargs
+        if 'session' not in requests_kwargs:
+            headers = dict(session.headers)
+            headers.update(requests_kwargs.get('headers') or {})
+            requests_kwargs['headers'] = headers
+            if session.auth is not None:
+                requests_kwargs.setdefault('auth', session.auth)
+            requests_kwargs['session'] = shared_session
+        return requests_kwargs
+
+    config.session_configuration_callback = _configure_session
+
+
+def _get_shared_transport_track2(cli_ctx):
+    from azure.core.pipeline.transport import RequestsTransport
+
+    def _create_session():
+        transport = RequestsTransport()
+        transport.open()
+        return transport.session
+
+    session = _get_shared_http_session(cli_ctx, 'azure-core', _create_session)
+    return RequestsTransport(session=session, session_owner=False, **_debug.change_ssl_cert_verification_track2())
+
+
 def _get_mgmt_service_client(cli_ctx,
                              client_type,
                              subscription_bound=True,
@@ -0,0 +1,314 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Daemon mode for Azure CLI
+
+A resident process keeps an initialized AzCli, with the command modules, SDKs and credentials already loaded, and
+serves commands forwarded by the `az` entry point over a Unix socket. It is turned on with `az config` option
+`core.use_daemon` (or the AZURE_CORE_USE_DAEMON environment variable). The first `az` call then starts the daemon
+in the background and later calls are forwarded to it.
+
+Protocol: each message is a line of JSON. The client sends a request
+    {"argv": [...], "env": {...}, "cwd": "...", "stdout_isatty": bool, "stderr_isatty": bool}
+and the daemon answers with a stream of messages
+    {"stdout": "..."}, {"stderr": "..."}    output of the command
+    {"stdin": "read", "size": -1}           request for input, answered by the client with {"stdin": "..."}
+    {"stdin": "readline"}
+    {"exit": 0}                             the command finished with the exit code
+    {"retry_locally": true}                 the daemon can't serve the command, the client runs it in process
+
+Commands are served one at a time, as the standard streams, environment variables and working directory of the
+process are swapped for those of the client during a command.
+"""
+
+import copy
+import io
+import json
+import os
+import socket
+import sys
+import threading
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DAEMON_SOCKET_FILE_NAME = 'daemon.sock'
+DEFAULT_DAEMON_IDLE_TIMEOUT = 30  # minutes
+
+# Commands changing the installed code can't be served by a daemon which has already imported it
+_DAEMON_RESTART_COMMANDS = ['extension', 'upgrade']
+
+
+def get_daemon_socket_path(config_dir=None):
+    from azure.cli.core._config import GLOBAL_CONFIG_DIR
+    return os.path.join(config_dir or GLOBAL_CONFIG_DIR, DAEMON_SOCKET_FILE_NAME)
+
+
+class _DaemonConnection:
+    """Line delimited JSON messages over a connected socket"""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._reader = sock.makefile('r', encoding='utf-8', newline='\n')
+        # Command output may be written from concurrent jobs, like those of --ids
+        self._lock = threading.Lock()
+
+    def send(self, **message):
+        data = (json.dumps(message) + '\n').encode('utf-8')
+        with self._lock:
+            self._sock.sendall(data)
+
+    def receive(self):
+        line = self._reader.readline()
+        if not line:
+            raise EOFError('The client closed the connection.')
+        return json.loads(line)
+
+    def close(self):
+        self._reader.close()
+        self._sock.close()
+
+
+class _DaemonOutputStream(io.TextIOBase):
+
+    def __init__(self, connection, name, isatty):
+        super(_DaemonOutputStream, self).__init__()
+        self._connection = connection
+        self._name = name
+        self._isatty = isatty
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def isatty(self):
+        return self._isatty
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        if s:
+            self._connection.send(**{self._name: s})
+        return len(s)
+
+
+class _DaemonInputStream(io.TextIOBase):
+
+    def __init__(self, connection):
+        super(_DaemonInputStream, self).__init__()
+        self._connection = connection
+
+    @property
+    def encoding(self):
+        return 'utf-8'
+
+    def isatty(self):
+        # Interactive prompts can't be forwarded. Commands ask for --yes or the like instead.
+        return False
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        self._connection.send(stdin='read', size=-1 if size is None else size)
+        return self._connection.receive()['stdin']
+
+    def readline(self, size=-1):
+        self._connection.send(stdin='readline')
+        return self._connection.receive()['stdin']
+
+
+class AzDaemon:
+
+    def __init__(self, cli_ctx, socket_path=None, idle_timeout=None):
+        """Serve commands forwarded by `az` with an initialized CLI.
+
+        :param cli_ctx: The CLI to invoke commands with, as returned by azure.cli.core.get_default_cli
+        :param socket_path: The path of the Unix socket to listen on
+        :param idle_timeout: Minutes without any command after which the daemon exits
+        """
+        self.cli_ctx = cli_ctx
+        self.socket_path = socket_path or get_daemon_socket_path(cli_ctx.config.config_dir)
+        if idle_timeout is None:
+            idle_timeout = cli_ctx.config.getint('core', 'daemon_idle_timeout', fallback=DEFAULT_DAEMON_IDLE_TIMEOUT)
+        self.idle_timeout = idle_timeout * 60
+        # The data every command starts with, like AzCliCommandInvoker.execute copies it for each --ids job
+        self._initial_data = copy.deepcopy(cli_ctx.data)
+        self._installed_state = self._get_installed_state()
+        self._should_stop = False
+
+    @staticmethod
+    def _get_installed_state():
+        """Modification times telling whether the CLI or extensions have been installed, updated or removed."""
+        import azure.cli.core
+        from azure.cli.core.extension import EXTENSIONS_DIR, DEV_EXTENSION_SOURCES
+        state = []
+        for path in [azure.cli.core.__file__, EXTENSIONS_DIR] + DEV_EXTENSION_SOURCES:
+            try:
+                state.append(os.stat(path).st_mtime)
+            except OSError:
+                state.append(None)
+        return state
+
+    def _bind(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if os.path.exists(self.socket_path):
+            try:
+                probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                probe.connect(self.socket_path)
+                probe.close()
+                logger.warning("A daemon is already listening on %s.", self.socket_path)
+                return None
+            except socket.error:
+                # Left over by a daemon which didn't exit gracefully
+                os.remove(self.socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            sock.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        sock.listen(128)
+        return sock
+
+    def serve(self):
+        """Serve commands until the daemon is idle for `idle_timeout` or the installed code changes."""
+        sock = self._bind()
+        if not sock:
+            return
+        logger.info("Daemon listening on %s.", self.socket_path)
+        sock.settimeout(self.idle_timeout or None)
+        try:
+            while not self._should_stop:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    logger.info("Daemon has been idle for %d minutes.", self.idle_timeout // 60)
+                    break
+                conn.settimeout(None)
+                connection = _DaemonConnection(conn)
+                try:
+                    self._serve_request(connection)
+                except (EOFError, socket.error, ValueError) as ex:
+                    logger.debug("Failed to serve the request: %s", ex)
+                finally:
+                    connection.close()
+        finally:
+            sock.close()
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+        logger.info("Daemon stopped.")
+
+    def _serve_request(self, connection):
+        request = connection.receive()
+        if self._get_installed_state() != self._installed_state:
+            logger.info("Installed code changed since the daemon started. Stopping.")
+            self._should_stop = True
+            connection.send(retry_locally=True)
+            return
+
+        argv = request['argv']
+        if argv and argv[0] in _DAEMON_RESTART_COMMANDS:
+            self._should_stop = True
+            connection.send(retry_locally=True)
+            return
+
+        stdout = _DaemonOutputStream(connection, 'stdout', request.get('stdout_isatty', False))
+        stderr = _DaemonOutputStream(connection, 'stderr', request.get('stderr_isatty', False))
+        stdin = _DaemonInputStream(connection)
+        exit_code = self._invoke(argv, request['env'], request['cwd'], stdin, stdout, stderr)
+        connection.send(exit=exit_code)
+
+    def _invoke(self, argv, env, cwd, stdin, stdout, stderr):  # pylint: disable=too-many-arguments
+        import atexit
+        import logging
+        from knack.log import CLI_LOGGER_NAME
+
+        # Collect what a standalone `az` process would run on exit, like persisting refreshed tokens
+        exit_funcs = []
+
+        def _register_exit_func(func, *args, **kwargs):
+            exit_funcs.append((func, args, kwargs))
+            return func
+
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        saved_streams = sys.stdin, sys.stdout, sys.stderr
+        saved_register = atexit.register
+        try:
+            atexit.register = _register_exit_func
+            os.environ.clear()
+            os.environ.update(env)
+            os.chdir(cwd)
+            sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+            # Handlers are bound to the streams and the verbosity of the previous command. Without any,
+            # CLILogging.configure sets them up again.
+            for logger_name in [None, CLI_LOGGER_NAME]:
+                for handler in logging.getLogger(logger_name).handlers[:]:
+                    logging.getLogger(logger_name).removeHandler(handler)
+                    handler.close()
+            self._prepare_cli_ctx()
+            try:
+                exit_code = self.cli_ctx.invoke(argv, out_file=stdout)
+            except SystemExit as ex:
+                exit_code = ex.code if ex.code is not None else 1
+            except KeyboardInterrupt:
+                exit_code = 1
+            for func, args, kwargs in reversed(exit_funcs):
+                try:
+                    func(*args, **kwargs)
+                except Exception as ex:  # pylint: disable=broad-except
+                    logger.debug("Exit function %s failed: %s", func, ex)
+            return exit_code if isinstance(exit_code, int) else 1
+        finally:
+            atexit.register = saved_register
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.chdir(saved_cwd)
+            os.environ.clear()
+            os.environ.update(saved_env)
+
+    def _prepare_cli_ctx(self):
+        """Make the CLI look like a freshly initialized one in the client's environment."""
+        from knack.config import CLIConfig
+        from azure.cli.core._config import ENV_VAR_PREFIX
+        from azure.cli.core._session import ACCOUNT, CONFIG, SESSION, INDEX, ARGUMENT_INDEX, VERSIONS
+        from azure.cli.core.cloud import get_active_cloud
+        from azure.cli.core.local_context import AzCLILocalContext
+
+        cli_ctx = self.cli_ctx
+        # Configuration depends on environment variables and the working directory
+        cli_ctx.config = CLIConfig(config_dir=cli_ctx.config.config_dir,
+                                   config_env_var_prefix=ENV_VAR_PREFIX)
+        cli_ctx.enable_color = not cli_ctx.config.getboolean('core', 'no_color', fallback=False)
+        cli_ctx.only_show_errors = cli_ctx.config.getboolean('core', 'only_show_errors', fallback=False)
+        # Other `az` processes may have changed the files since the last command
+        for session in [ACCOUNT, CONFIG, SESSION, INDEX, ARGUMENT_INDEX, VERSIONS]:
+            session.load(session.filename)
+        cli_ctx.cloud = get_active_cloud(cli_ctx)
+        cli_ctx.local_context = AzCLILocalContext(cli_ctx)
+        cli_ctx.data = copy.deepcopy(self._initial_data)
+        cli_ctx.result = None
+
+
+def main():
+    from azure.cli.core import get_default_cli
+
+    if not hasattr(socket, 'AF_UNIX'):
+        sys.exit("Daemon mode is not supported on this platform.")
+    az_cli = get_default_cli()
+    # Import the command modules and build the command table once, so that commands don't pay for it
+    az_cli.invocation = az_cli.invocation_cls(cli_ctx=az_cli, parser_cls=az_cli.parser_cls,
+                                              commands_loader_cls=az_cli.commands_loader_cls,
+                                              help_cls=az_cli.help_cls)
+    az_cli.invocation.commands_loader.load_command_table(None)
+    AzDaemon(az_cli).serve()
+
+
+if __name__ == '__main__':
+    main()
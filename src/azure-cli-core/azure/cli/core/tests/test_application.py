@@ -18,6 +18,16 @@ from azure.cli.core.mock import DummyCli
 from knack.util import CLIError
 
 
+_TEST_RESOURCE_STATES = {}
+
+
+def _get_test_resource(resource_name):
+    state = next(_TEST_RESOURCE_STATES[resource_name])
+    if isinstance(state, Exception):
+        raise state
+    return mock.MagicMock(provisioning_state=state)
+
+
 class TestApplication(unittest.TestCase):
     def test_client_request_id_is_not_assigned_when_application_is_created(self):
         cli = DummyCli()
@@ -119,6 +129,169 @@ class TestApplication(unittest.TestCase):
 
         os.remove(f.name)
 
+    def test_run_jobs_concurrently_keeps_id_order(self):
+        import time
+        cli = DummyCli()
+        invoker = cli.invocation_cls(cli_ctx=cli, parser_cls=cli.parser_cls,
+                                     commands_loader_cls=cli.commands_loader_cls, help_cls=cli.help_cls)
+        ids = ['id{}'.format(i) for i in range(6)]
+        jobs = [(i, mock.MagicMock(cli_ctx=DummyCli())) for i in range(6)]
+
+        def _run_job(expanded_arg, cmd_copy, id_arg):
+            # later ids finish first
+            time.sleep(0.01 * (6 - expanded_arg))
+            if expanded_arg % 2:
+                raise CLIError('failed {}'.format(id_arg))
+            return expanded_arg
+
+        with mock.patch.object(invoker, '_run_job', side_effect=_run_job), \
+                mock.patch.object(cli.config, 'getint', return_value=3):
+            results, exceptions = invoker._run_jobs_concurrently(jobs, ids)
+        self.assertEqual(results, [0, 2, 4])
+        self.assertEqual([(str(ex), id_arg) for ex, id_arg in exceptions],
+                         [('failed id1', 'id1'), ('failed id3', 'id3'), ('failed id5', 'id5')])
+
+    def test_adaptive_concurrency_limiter(self):
+        import copy
+        from azure.cli.core.commands import _AdaptiveConcurrencyLimiter
+        limiter = _AdaptiveConcurrencyLimiter(8)
+        self.assertIs(copy.deepcopy({'observer': limiter.observe})['observer'].__self__, limiter)
+
+        limiter.observe(200, {'x-ms-ratelimit-remaining-subscription-reads': '11999'})
+        self.assertEqual(limiter.limit, 8)
+        limiter.observe(200, {'x-ms-ratelimit-remaining-subscription-writes': '10'})
+        self.assertEqual(limiter.limit, 4)
+        limiter.observe(200, {'x-ms-ratelimit-remaining-resource': 'Microsoft.Compute/HighCostGet3Min;107,'
+                                                                   'Microsoft.Compute/HighCostGet30Min;20'})
+        self.assertEqual(limiter.limit, 2)
+        limiter.observe(429, {})
+        self.assertEqual(limiter.limit, 1)
+        limiter.observe(429, {})
+        self.assertEqual(limiter.limit, 1)
+        limiter.observe(200, {'Content-Type': 'application/json'})
+        self.assertEqual(limiter.limit, 1)
+        limiter.observe(200, {'x-ms-ratelimit-remaining-subscription-reads': '11000'})
+        self.assertEqual(limiter.limit, 2)
+
+    def test_wait_command_waits_on_all_ids_together(self):
+        from msrest.exceptions import ClientException
+
+        class TestCommandsLoader(AzCommandsLoader):
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                with self.command_group('test', operations_tmpl='{}#{{}}'.format(__name__)) as g:
+                    g.wait_command('wait', getter_name='_get_test_resource')
+                return self.command_table
+
+        cli = DummyCli(commands_loader_cls=TestCommandsLoader)
+        loader = TestCommandsLoader(cli)
+        loader.load_command_table(None)
+        cmd = loader.command_table['test wait']
+        ids_handler = cmd.command_kwargs['ids_handler']
+
+        not_found = ClientException('not found')
+        not_found.status_code = 404
+        _TEST_RESOURCE_STATES.update({
+            'a': iter(['Creating', 'Succeeded']),
+            'b': iter([not_found, 'Creating', 'Succeeded']),
+            'c': iter(['Creating'] * 10),
+            'd': iter(['Failed'])
+        })
+
+        args_list = [{'cmd': cmd, 'resource_name': name, 'timeout': 30, 'interval': 10, 'created': True,
+                      'deleted': False, 'updated': False, 'exists': False, 'custom': None} for name in 'abcd']
+        with mock.patch('time.sleep') as sleep_mock, \
+                mock.patch.object(cli.config, 'getint', return_value=4):
+            results, exceptions = ids_handler(args_list, ['id_a', 'id_b', 'id_c', 'id_d'])
+
+        # the result summarizes the ids, and the failed and timed out resources are returned as exceptions too
+        self.assertEqual(results, [{'succeeded': ['id_a', 'id_b'], 'failed': ['id_d'], 'timedOut': ['id_c']}])
+        self.assertEqual([(str(ex), id_arg) for ex, id_arg in exceptions],
+                         [('The operation failed', 'id_d'), ('Wait operation timed-out after 30 seconds', 'id_c')])
+        # all the resources are checked in each round, with one sleep per round
+        self.assertEqual(sleep_mock.call_args_list, [mock.call(10)] * 3)
+
+    def test_wait_command_with_ids(self):
+        import io
+        import json
+
+        class TestCommandsLoader(AzCommandsLoader):
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                with self.command_group('test', operations_tmpl='{}#{{}}'.format(__name__)) as g:
+                    g.wait_command('wait', getter_name='_get_test_resource')
+                return self.command_table
+
+            def load_arguments(self, command):
+                # like the main loader, the arguments are applied to the reflected ones so --ids is added for them
+                self.command_table[command].load_arguments()
+                super(TestCommandsLoader, self).load_arguments(command)
+                with self.argument_context('test wait') as c:
+                    c.argument('resource_name', id_part='name')
+                self._update_command_definitions()
+
+        def _invoke(states, disable_concurrent_ids):
+            cli = DummyCli(commands_loader_cls=TestCommandsLoader)
+            getboolean = cli.config.getboolean
+
+            def _getboolean(section, option, fallback=None):
+                if (section, option) == ('core', 'disable_concurrent_ids'):
+                    return disable_concurrent_ids
+                return getboolean(section, option, fallback)
+
+            _TEST_RESOURCE_STATES.update((name, iter(s)) for name, s in states.items())
+            ids = ['/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/Microsoft.Test/'
+                   'tests/{}'.format(name) for name in states]
+            out = io.StringIO()
+            with mock.patch('time.sleep') as sleep_mock, \
+                    mock.patch.object(cli.config, 'getboolean', side_effect=_getboolean):
+                exit_code = cli.invoke(['test', 'wait', '--created', '--timeout', '30', '--interval', '10', '--ids'] +
+                                       ids + ['-o', 'json'], out_file=out)
+            return exit_code, json.loads(out.getvalue()), ids, sleep_mock
+
+        # the command handles all the ids together, and fails if any of them failed or timed out
+        exit_code, result, ids, sleep_mock = _invoke(
+            {'a': ['Creating', 'Succeeded'], 'b': ['Creating'] * 10, 'c': ['Failed']}, False)
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(result, {'succeeded': [ids[0]], 'failed': [ids[2]], 'timedOut': [ids[1]]})
+        self.assertEqual(sleep_mock.call_args_list, [mock.call(10)] * 3)
+
+        # core.disable_concurrent_ids runs the command for the ids one after the other
+        exit_code, result, ids, sleep_mock = _invoke({'a': ['Creating', 'Succeeded'], 'b': ['Succeeded']}, True)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(result, [None, None])
+        self.assertEqual(sleep_mock.call_args_list, [mock.call(10)])
+
+    def test_long_running_operation_returns_once_poller_is_done(self):
+        import time
+        from msrest.polling import LROPoller, PollingMethod
+        from azure.cli.core.commands import LongRunningOperation
+
+        class _PollingMethod(PollingMethod):
+            def initialize(self, client, initial_response, deserialization_callback):
+                self._finished = False
+
+            def run(self):
+                time.sleep(0.2)
+                self._finished = True
+
+            def status(self):
+                return 'Succeeded' if self._finished else 'InProgress'
+
+            def finished(self):
+                return self._finished
+
+            def resource(self):
+                return 'result'
+
+        cli = DummyCli()
+        poller = LROPoller(mock.MagicMock(), None, None, _PollingMethod())
+        start = time.time()
+        result = LongRunningOperation(cli, poller_done_interval_ms=10000.0)(poller)
+        self.assertEqual(result, 'result')
+        # the operation isn't checked at a 10 seconds interval
+        self.assertLess(time.time() - start, 5)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,73 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import copy
+import io
+import unittest
+
+import mock
+from requests import Response
+
+from azure.cli.core.commands.client_factory import get_mgmt_service_client, configure_common_settings_track2
+from azure.cli.core.mock import DummyCli
+from azure.cli.core.profiles import ResourceType
+
+
+class TestClientFactory(unittest.TestCase):
+
+    @mock.patch('azure.cli.core._profile.Profile.get_login_credentials', autospec=True)
+    def test_clients_share_http_session(self, get_login_credentials):
+        from concurrent.futures import ThreadPoolExecutor
+        from msrest.authentication import BasicTokenAuthentication
+
+        get_login_credentials.return_value = (BasicTokenAuthentication({'access_token': 'token'}),
+                                              '00000000-0000-0000-0000-000000000000', 'tenant')
+        cli = DummyCli()
+        # copies made for --ids jobs share the sessions too
+        cli_copy = copy.copy(cli)
+        cli_copy.data = copy.deepcopy(cli.data)
+
+        with mock.patch.object(cli.config, 'getint', return_value=20):
+            clients = [get_mgmt_service_client(cli, ResourceType.MGMT_RESOURCE_RESOURCES),
+                       get_mgmt_service_client(cli, ResourceType.MGMT_RESOURCE_RESOURCES),
+                       get_mgmt_service_client(cli_copy, ResourceType.MGMT_RESOURCE_RESOURCES)]
+        session = cli.http_sessions['msrest']
+        self.assertTrue(all(c.config.keep_alive for c in clients))
+        self.assertEqual(session.get_adapter('https://management.azure.com')._pool_maxsize, 20)
+        # retries of msrest are kept
+        self.assertTrue(session.get_adapter('https://management.azure.com').max_retries.total)
+
+        sent = []
+
+        def _request(self, method, url, **kwargs):
+            sent.append((self, kwargs['headers'].get('Authorization')))
+            response = Response()
+            response.status_code = 200
+            response.raw = io.BytesIO(b'{"value": []}')
+            response.headers['Content-Type'] = 'application/json'
+            return response
+
+        with mock.patch('requests.Session.request', autospec=True, side_effect=_request):
+            # msrest keeps a session per thread, so the clients are used from other threads as well
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                for future in [executor.submit(lambda c: list(c.resource_groups.list()), c) for c in clients]:
+                    future.result()
+            list(clients[0].resource_groups.list())
+        self.assertEqual(sent, [(session, 'Bearer token')] * 4)
+        # the credentials are passed with each request rather than set on the shared session
+        self.assertNotIn('Authorization', session.headers)
+
+    def test_track2_clients_share_http_session(self):
+        cli = DummyCli()
+        transports = [configure_common_settings_track2(cli)['transport'] for _ in range(2)]
+        self.assertIsNot(transports[0], transports[1])
+        self.assertIs(transports[0].session, transports[1].session)
+        self.assertIsNot(transports[0].session, cli.http_sessions.get('msrest'))
+        # retries are done by the pipeline
+        self.assertFalse(transports[0].session.get_adapter('https://management.azure.com').max_retries.total)
+
+
+if __name__ == '__main__':
+    unittest.main()
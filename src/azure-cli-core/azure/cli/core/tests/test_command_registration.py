@@ -142,6 +142,57 @@ class TestCommandRegistration(unittest.TestCase):
         self.assertEqual(command_metadata.arguments['resource_group_name'].options_list,
                          ['--resource-group-name'])
 
+    def test_argument_index(self):
+        from azure.cli.core import ArgumentIndex
+
+        class TestCommandsLoader(AzCommandsLoader):
+
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                with self.command_group('test index', operations_tmpl='{}#TestCommandRegistration.{{}}'.format(__name__)) as g:
+                    g.command('sample-vm-get', 'sample_vm_get')
+                return self.command_table
+
+        cli = DummyCli(commands_loader_cls=TestCommandsLoader)
+        command = 'test index sample-vm-get'
+        operation = '{}#TestCommandRegistration.sample_vm_get'.format(__name__)
+        argument_index = ArgumentIndex(cli)
+        argument_index.invalidate()
+        argument_index.validate()
+
+        # Test arguments are added to the index after reflection
+        loader = _prepare_test_commands_loader(TestCommandsLoader, cli, command)
+        reflected_arguments = loader.command_table[command].arguments
+        indexed_arguments = dict(argument_index.get(command, operation))
+        self.assertEqual(list(indexed_arguments), ['resource_group_name', 'vm_name', 'opt_param', 'expand'])
+        self.assertEqual(indexed_arguments['vm_name'].options_list, ['--vm-name'])
+        self.assertEqual(indexed_arguments['opt_param'].type.settings['help'],
+                         'Used to verify reflection correctly identifies optional params.')
+
+        # Test entries indexed for another operation are ignored
+        self.assertIsNone(argument_index.get(command, '{}#TestCommandRegistration.other'.format(__name__)))
+        # or for another doc string source
+        self.assertIsNone(argument_index.get(command, operation, '{}#TestCommandRegistration.other'.format(__name__)))
+
+        # Test the index is changed, so saved, only when an entry changes, even if the number of entries doesn't
+        revision = argument_index.revision
+        indexed_arguments = argument_index.get(command, operation)
+        argument_index.set(command, operation, indexed_arguments)
+        self.assertEqual(argument_index.revision, revision)
+        argument_index.set(command, operation, indexed_arguments[:1])
+        self.assertEqual(argument_index.revision, revision + 1)
+        argument_index.set(command, operation, indexed_arguments)
+
+        # Test the operation is not imported when the arguments are indexed
+        with mock.patch.object(TestCommandsLoader, 'get_op_handler', side_effect=AssertionError):
+            loader = _prepare_test_commands_loader(TestCommandsLoader, cli, command)
+        self.assertEqual(list(loader.command_table[command].arguments), list(reflected_arguments))
+        self.assertTrue(loader.command_table[command].arguments['resource_group_name'].type.settings['required'])
+
+        # Test an invalidated index is not used
+        argument_index.invalidate()
+        self.assertIsNone(argument_index.get(command, operation))
+
     def _mock_import_lib(_):
         mock_obj = mock.MagicMock()
         mock_obj.__path__ = __name__
@@ -389,6 +440,42 @@ class TestCommandRegistration(unittest.TestCase):
         del INDEX[CommandIndex._COMMAND_INDEX_CLOUD_PROFILE]
         del INDEX[CommandIndex._COMMAND_INDEX]
 
+    @mock.patch('importlib.import_module', _mock_import_lib)
+    @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
+    @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
+    @mock.patch('azure.cli.core.extension.get_extension_modname', _mock_get_extension_modname)
+    @mock.patch('azure.cli.core.extension.get_extensions', _mock_get_extensions)
+    def test_command_index_command_group(self):
+        from azure.cli.core._session import INDEX
+        from azure.cli.core import CommandIndex
+
+        cli = DummyCli()
+        loader = cli.commands_loader
+        command_index = CommandIndex(cli)
+        command_index.invalidate()
+
+        # Test command group index is built along with the command index
+        loader.load_command_table(["hello", "mod-only"])
+        self.assertDictEqual(INDEX[CommandIndex._COMMAND_GROUP_INDEX], self.expected_command_index)
+        self.assertEqual(command_index.get_command_group(["hello", "mod-only", "--name", "vm1"]), 'hello')
+        self.assertEqual(command_index.get_command_group(["hello", "-h"]), 'hello')
+        self.assertIsNone(command_index.get_command_group(["unknown", "command"]))
+        self.assertIsNone(command_index.get_command_group([]))
+
+        # Test only the commands of the invoked command group are built
+        cmd_tbl = loader.load_command_table(["extra", "final"])
+        self.assertEqual(list(cmd_tbl), ['extra final'])
+        self.assertIsNone(cli.data['command_group_filter'])
+
+        # Test modules not contributing to the command group are not loaded
+        INDEX[CommandIndex._COMMAND_INDEX] = {'hello': ['azure.cli.command_modules.hello', 'azure.cli.command_modules.extra',
+                                                        'azext_hello2', 'azext_hello1']}
+        self.assertEqual(command_index.get(["hello", "mod-only"]),
+                         (['hello'], ['azext_hello2', 'azext_hello1']))
+
+        command_index.invalidate()
+        self.assertFalse(INDEX[CommandIndex._COMMAND_GROUP_INDEX])
+
     @mock.patch('importlib.import_module', _mock_import_lib)
     @mock.patch('pkgutil.iter_modules', _mock_iter_modules)
     @mock.patch('azure.cli.core.commands._load_command_loader', _mock_load_command_loader)
@@ -0,0 +1,81 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core.daemon import AzDaemon
+from azure.cli.core.mock import DummyCli
+
+
+class _FakeStream(io.StringIO):
+
+    def isatty(self):
+        return False
+
+
+class TestDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.cli = DummyCli()
+        self.daemon = AzDaemon(self.cli, socket_path=os.path.join(tempfile.gettempdir(), 'az_test_daemon.sock'),
+                               idle_timeout=1)
+
+    def test_daemon_invoke_isolation(self):
+        seen = {}
+
+        def _invoke(args, out_file=None):
+            seen['env'] = os.environ.get('AZ_DAEMON_TEST_VAR')
+            seen['cwd'] = os.getcwd()
+            seen['data'] = dict(self.cli.data)
+            self.cli.data['subscription_id'] = 'polluted'
+            print('hello', file=out_file)
+            sys.stderr.write('warning')
+            import atexit
+            atexit.register(seen.setdefault, 'exit_func', 'called')
+            return 3
+
+        cwd = os.getcwd()
+        env = dict(os.environ, AZ_DAEMON_TEST_VAR='value')
+        stdout, stderr = _FakeStream(), _FakeStream()
+        with mock.patch.object(self.cli, 'invoke', side_effect=_invoke):
+            exit_code = self.daemon._invoke(['version'], env, tempfile.gettempdir(), None, stdout, stderr)
+            self.assertEqual(exit_code, 3)
+            self.assertEqual(stdout.getvalue(), 'hello\n')
+            self.assertEqual(stderr.getvalue(), 'warning')
+            self.assertEqual(seen['env'], 'value')
+            self.assertEqual(os.path.realpath(seen['cwd']), os.path.realpath(tempfile.gettempdir()))
+            self.assertEqual(seen['exit_func'], 'called')
+
+            # The process is restored after the command
+            self.assertIsNone(os.environ.get('AZ_DAEMON_TEST_VAR'))
+            self.assertEqual(os.getcwd(), cwd)
+            self.assertIsNot(sys.stdout, stdout)
+
+            # Data changed by a command doesn't leak into the next one
+            self.daemon._invoke(['version'], env, cwd, None, _FakeStream(), _FakeStream())
+            self.assertNotIn('subscription_id', seen['data'])
+
+    def test_daemon_invoke_system_exit(self):
+        with mock.patch.object(self.cli, 'invoke', side_effect=SystemExit(2)):
+            exit_code = self.daemon._invoke(['group', 'lsit'], dict(os.environ), os.getcwd(), None,
+                                            _FakeStream(), _FakeStream())
+        self.assertEqual(exit_code, 2)
+
+    def test_daemon_restart_on_extension_command(self):
+        connection = mock.MagicMock()
+        connection.receive.return_value = {'argv': ['extension', 'add', '-n', 'foo'], 'env': {}, 'cwd': os.getcwd()}
+        self.daemon._serve_request(connection)
+        connection.send.assert_called_once_with(retry_locally=True)
+        self.assertTrue(self.daemon._should_stop)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,29 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import json
 import unittest
+from io import StringIO
+
+import mock
+
+
+def _list_test_items(fetched):
+    for i in range(3):
+        fetched.append(i)
+        yield {'name': 'item{}'.format(i), 'index': i}
+
+
+class _RecordingOutput(StringIO):
+    def __init__(self, fetched):
+        super(_RecordingOutput, self).__init__()
+        self.fetched = fetched
+        self.fetched_at_writes = []
+
+    def write(self, s):
+        if s:
+            self.fetched_at_writes.append(len(self.fetched))
+        return super(_RecordingOutput, self).write(s)
 
 
 class TestCoreCLIOutput(unittest.TestCase):
@@ -12,7 +34,7 @@ class TestCoreCLIOutput(unittest.TestCase):
         from azure.cli.core.mock import DummyCli
 
         output_producer = AzOutputProducer(DummyCli())
-        self.assertEqual(7, len(output_producer._FORMAT_DICT))  # six types: json, jsonc, table, tsv, yaml, yamlc, none
+        self.assertEqual(8, len(output_producer._FORMAT_DICT))  # json, jsonc, jsonl, table, tsv, yaml, yamlc, none
         self.assertIn('yaml', output_producer._FORMAT_DICT)
         self.assertIn('none', output_producer._FORMAT_DICT)
 
@@ -41,6 +63,72 @@ class TestCoreCLIOutput(unittest.TestCase):
         yaml_output = output_producer.get_formatter('yaml')(CommandResultItem(result=OrderedDict(account_dict)))
         self.assertEqual(account_dict, yaml.safe_load(yaml_output))
 
+    def _invoke_list_command(self, args, stream_output=False):
+        from azure.cli.core import AzCommandsLoader
+        from azure.cli.core.commands import AzCliCommand
+        from azure.cli.core.mock import DummyCli
+        from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
+
+        fetched = []
+
+        class TestCommandsLoader(AzCommandsLoader):
+            def load_command_table(self, args):
+                super(TestCommandsLoader, self).load_command_table(args)
+                self.command_table = {'test': AzCliCommand(self, 'test', lambda _: _list_test_items(fetched))}
+                return self.command_table
+
+        cli = DummyCli(commands_loader_cls=TestCommandsLoader)
+        self.transformed_results = []
+        cli.register_event(EVENT_INVOKER_TRANSFORM_RESULT,
+                           lambda _, **kwargs: self.transformed_results.append(kwargs['event_data']['result']))
+        getboolean = cli.config.getboolean
+
+        def _getboolean(section, option, fallback=None):
+            if (section, option) == ('core', 'stream_output'):
+                return stream_output
+            return getboolean(section, option, fallback=fallback)
+
+        out = _RecordingOutput(fetched)
+        with mock.patch.object(cli.config, 'getboolean', side_effect=_getboolean):
+            self.assertEqual(cli.invoke(['test'] + args, out_file=out), 0)
+        return out.getvalue(), out.fetched_at_writes
+
+    def test_jsonl_output_streams_paged_results(self):
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'jsonl'])
+        self.assertEqual(output, '{"index": 0, "name": "item0"}\n{"index": 1, "name": "item1"}\n'
+                                 '{"index": 2, "name": "item2"}\n')
+        # each item is written once it's fetched
+        self.assertEqual(fetched_at_writes, [1, 2, 3])
+
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'jsonl', '--query', '[?index > `0`].name'])
+        self.assertEqual(output, '"item1"\n"item2"\n')
+        self.assertEqual(fetched_at_writes, [2, 3])
+
+        # queries on the whole list get all of the items
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'jsonl', '--query', 'length(@)'])
+        self.assertEqual(output, '3\n')
+        self.assertEqual(fetched_at_writes, [3])
+
+    def test_tsv_output_streams_paged_results_if_configured(self):
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'tsv'])
+        self.assertEqual(output, '0\titem0\n1\titem1\n2\titem2\n')
+        self.assertEqual(fetched_at_writes, [3])
+
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'tsv'], stream_output=True)
+        self.assertEqual(output, '0\titem0\n1\titem1\n2\titem2\n')
+        self.assertEqual(fetched_at_writes, [1, 2, 3])
+
+    def test_item_query_is_applied_while_paging(self):
+        output, fetched_at_writes = self._invoke_list_command(['-o', 'json', '--query', '[].name'])
+        self.assertEqual(json.loads(output), ['item0', 'item1', 'item2'])
+        self.assertEqual(fetched_at_writes, [3])
+        # the items are converted and queried one at a time rather than collected first
+        self.assertEqual([r['name'] for r in self.transformed_results], ['item0', 'item1', 'item2'])
+
+        output, _ = self._invoke_list_command(['-o', 'json', '--query', '[0].name'])
+        self.assertEqual(json.loads(output), 'item0')
+        self.assertEqual(len(self.transformed_results), 1)
+
 
 if __name__ == '__main__':
     unittest.main()
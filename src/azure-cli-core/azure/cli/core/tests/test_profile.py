@@ -6,7 +6,9 @@
 # pylint: disable=protected-access
 import json
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 import mock
 import re
@@ -1597,10 +1599,11 @@ class TestProfile(unittest.TestCase):
         # assert
         self.assertEqual(creds_cache.retrieve_secret_of_service_principal(test_sp['servicePrincipalId']), None)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_new_sp_creds(self, _, mock_open_for_write, mock_read_file, mock_replace):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1624,6 +1627,7 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(token_entries, [self.token_entry1])
         self.assertEqual(creds_cache._service_principal_creds, [test_sp, test_sp2])
         mock_open_for_write.assert_called_with(mock.ANY, 'w+')
+        mock_replace.assert_called_with(mock.ANY, creds_cache._token_file)
 
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
@@ -1646,10 +1650,11 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(creds_cache._service_principal_creds, [test_sp])
         self.assertFalse(mock_open_for_write.called)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_add_preexisting_sp_new_secret(self, _, mock_open_for_write, mock_read_file, mock_replace):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1696,10 +1701,11 @@ class TestProfile(unittest.TestCase):
         self.assertRaises(ValueError, creds_cache.retrieve_token_for_service_principal,
                           'myapp', 'resource1', 'mytenant2', False)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
-    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file):
+    def test_credscache_remove_creds(self, _, mock_open_for_write, mock_read_file, mock_replace):
         cli = DummyCli()
         test_sp = {
             "servicePrincipalId": "myapp",
@@ -1726,11 +1732,12 @@ class TestProfile(unittest.TestCase):
         mock_open_for_write.assert_called_with(mock.ANY, 'w+')
         self.assertEqual(mock_open_for_write.call_count, 2)
 
+    @mock.patch('os.replace', autospec=True)
     @mock.patch('azure.cli.core._profile._load_tokens_from_file', autospec=True)
     @mock.patch('os.fdopen', autospec=True)
     @mock.patch('os.open', autospec=True)
     @mock.patch('adal.AuthenticationContext', autospec=True)
-    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file):  # pylint: disable=line-too-long
+    def test_credscache_new_token_added_by_adal(self, mock_adal_auth_context, _, mock_open_for_write, mock_read_file, mock_replace):  # pylint: disable=line-too-long
         cli = DummyCli()
         token_entry2 = {
             "accessToken": "new token",
@@ -1765,6 +1772,103 @@ class TestProfile(unittest.TestCase):
         self.assertEqual(token, 'new token')
         self.assertEqual(token_type, token_entry2['tokenType'])
 
+    def test_credscache_merge_changes_of_other_processes(self):
+        cli = DummyCli()
+        test_sp = {
+            "servicePrincipalId": "myapp",
+            "servicePrincipalTenant": "mytenant",
+            "accessToken": "Secret"
+        }
+        test_sp2 = {
+            "servicePrincipalId": "myapp2",
+            "servicePrincipalTenant": "mytenant2",
+            "accessToken": "Secret2"
+        }
+        token_dir = tempfile.mkdtemp()
+        token_file = os.path.join(token_dir, 'accessTokens.json')
+        with open(token_file, 'w') as f:
+            json.dump([self.token_entry1, test_sp], f)
+
+        with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+            creds_cache1 = CredsCache(cli, async_persist=False)
+            creds_cache2 = CredsCache(cli, async_persist=False)
+            creds_cache1.load_adal_token_cache()
+            creds_cache2.load_adal_token_cache()
+
+            # action
+            creds_cache1.save_service_principal_cred(test_sp2)
+            creds_cache2.remove_cached_creds('myapp')
+
+        # assert the service principal added by the first process is kept
+        with open(token_file) as f:
+            self.assertEqual(json.load(f), [self.token_entry1, test_sp2])
+        shutil.rmtree(token_dir)
+
+    @unittest.skipIf(sys.platform == 'win32', 'Creating symlinks requires a privilege on Windows')
+    def test_credscache_write_token_file_in_use(self):
+        from azure.cli.core._profile import _write_tokens_to_file
+        token_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, token_dir)
+        token_file = os.path.join(token_dir, 'accessTokens.json')
+        link = os.path.join(token_dir, 'link.json')
+        os.symlink(token_file, link)
+
+        # the file the link points to is written
+        _write_tokens_to_file(link, [self.token_entry1])
+        self.assertTrue(os.path.islink(link))
+        with open(token_file) as f:
+            self.assertEqual(json.load(f), [self.token_entry1])
+
+        # the file can't be replaced while another process has it open, so it's written in place
+        with mock.patch('os.replace', autospec=True, side_effect=PermissionError('in use')) as replace_mock, \
+                mock.patch('time.sleep'):
+            _write_tokens_to_file(link, [])
+        self.assertEqual(replace_mock.call_count, 3)
+        with open(token_file) as f:
+            self.assertEqual(json.load(f), [])
+        self.assertEqual(sorted(os.listdir(token_dir)), ['accessTokens.json', 'link.json'])
+
+    def test_credscache_refresh_token_once_for_all_processes(self):
+        from datetime import datetime, timedelta
+        cli = DummyCli()
+        time_format = '%Y-%m-%d %H:%M:%S.%f'
+        expires_on = (datetime.now() + timedelta(hours=1)).strftime(time_format)
+        token_entry = dict(self.token_entry1, expiresOn=(datetime.now() + timedelta(minutes=1)).strftime(time_format))
+        token_dir = tempfile.mkdtemp()
+        token_file = os.path.join(token_dir, 'accessTokens.json')
+        with open(token_file, 'w') as f:
+            json.dump([token_entry], f)
+        refreshed = []
+
+        def get_auth_context(_, tenant, cache):  # pylint: disable=unused-argument
+            def acquire_token(resource, username, client_id):  # pylint: disable=unused-argument
+                entry = cache.find({'userId': username})[0]
+                if entry['expiresOn'] < expires_on:
+                    refreshed.append(resource)
+                    entry = dict(entry, accessToken='new token', expiresOn=expires_on)
+                    cache.add([entry])
+                return entry
+
+            return mock.MagicMock(acquire_token=acquire_token)
+
+        with mock.patch.dict('os.environ', {'AZURE_ACCESS_TOKEN_FILE': token_file}):
+            creds_cache1 = CredsCache(cli, auth_ctx_factory=get_auth_context)
+            creds_cache2 = CredsCache(cli, auth_ctx_factory=get_auth_context)
+            creds_cache1.load_adal_token_cache()
+            creds_cache2.load_adal_token_cache()
+
+            # action
+            _, token1, _ = creds_cache1.retrieve_token_for_user(self.user1, self.tenant_id, token_entry['resource'])
+            _, token2, _ = creds_cache2.retrieve_token_for_user(self.user1, self.tenant_id, token_entry['resource'])
+
+        # assert
+        self.assertEqual(token1, 'new token')
+        self.assertEqual(token2, 'new token')
+        self.assertEqual(refreshed, [token_entry['resource']])
+        with open(token_file) as f:
+            self.assertEqual(json.load(f)[0]['expiresOn'], expires_on)
+        shutil.rmtree(token_dir)
+
     @mock.patch('azure.cli.core._profile.get_file_json', autospec=True)
     def test_credscache_good_error_on_file_corruption(self, mock_read_file):
         mock_read_file.side_effect = ValueError('a bad error for you')
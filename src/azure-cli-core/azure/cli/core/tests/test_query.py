@@ -0,0 +1,35 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import collections
+import unittest
+
+import jmespath
+from jmespath import Options
+
+from azure.cli.core._query import is_item_query, search_result
+
+
+class TestQuery(unittest.TestCase):
+
+    def test_search_items(self):
+        items = [{'name': 'a', 'location': 'westus', 'tags': None},
+                 {'name': 'b', 'location': 'eastus', 'tags': {'env': 'test'}},
+                 [{'name': 'c', 'location': 'westus', 'tags': {'env': 'prod'}}]]
+        for query in ['[].name', '[*].name', "[?location=='westus']", "[?location=='westus'].name", '[].tags.env',
+                      '[?tags].{n: name, env: tags.env}', '[]']:
+            query_expression = jmespath.compile(query)
+            self.assertTrue(is_item_query(query_expression), query)
+            # the items are queried one by one, with the same result as the query of the whole list
+            self.assertEqual(list(search_result(query_expression, (i for i in items))),
+                             query_expression.search(items, Options(collections.OrderedDict)), query)
+
+        for query in ['length(@)', '[0]', 'sort_by(@, &name)', '[].tags[].env', 'name']:
+            query_expression = jmespath.compile(query)
+            self.assertFalse(is_item_query(query_expression), query)
+
+
+if __name__ == '__main__':
+    unittest.main()
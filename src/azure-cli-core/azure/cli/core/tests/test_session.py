@@ -0,0 +1,47 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from azure.cli.core._session import ENV_DISABLE_CACHES, get_cache_path, get_cache_session
+
+
+class TestCacheSession(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        patcher = mock.patch('azure.cli.core._environment.get_config_dir', return_value=self.config_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict('os.environ')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop(ENV_DISABLE_CACHES, None)
+
+    def test_get_cache_session(self):
+        cache = get_cache_session('testCache.json')
+        self.assertIs(get_cache_session('testCache.json'), cache)
+        cache['key'] = {'value': 1}
+        with open(os.path.join(self.config_dir, 'testCache.json'), encoding='utf-8-sig') as f:
+            self.assertEqual(json.load(f), {'key': {'value': 1}})
+        self.assertEqual(get_cache_path('testCache', 'all.json.gz'),
+                         os.path.join(self.config_dir, 'testCache', 'all.json.gz'))
+
+    def test_get_cache_session_disabled(self):
+        os.environ[ENV_DISABLE_CACHES] = 'true'
+        self.assertIsNone(get_cache_session('testCache.json'))
+        self.assertIsNone(get_cache_path('testCache'))
+        self.assertEqual(os.listdir(self.config_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,7 +15,7 @@ import json
 from azure.cli.core.util import \
     (get_file_json, truncate_text, shell_safe_json_parse, b64_to_hex, hash_string, random_string,
      open_page_in_browser, can_launch_browser, handle_exception, ConfiguredDefaultSetter, send_raw_request,
-     should_disable_connection_verify, parse_proxy_resource_id, get_az_user_agent)
+     send_raw_request_paged, should_disable_connection_verify, parse_proxy_resource_id, get_az_user_agent)
 from azure.cli.core.mock import DummyCli
 
 
@@ -377,6 +377,52 @@ class TestUtils(unittest.TestCase):
             request = send_mock.call_args.args[1]
             self.assertEqual(request.headers['User-Agent'], get_az_user_agent() + ' env-ua ARG-UA')
 
+    @mock.patch('requests.Session.send', autospec=True)
+    def test_send_raw_request_paged(self, send_mock):
+        pages = [
+            {'value': [1, 2], 'nextLink': 'https://management.azure.com/subscriptions?api-version=2020-01-01&$skiptoken=a'},
+            {'value': [3], '@odata.nextLink': 'https://graph.microsoft.com/v1.0/users?$skiptoken=b'},
+            {'value': []}
+        ]
+        send_mock.side_effect = [mock.MagicMock(ok=True, json=mock.MagicMock(return_value=p)) for p in pages]
+        cli_ctx = DummyCli()
+        cli_ctx.data = {'command': 'rest'}
+
+        items = send_raw_request_paged(cli_ctx, 'POST', 'https://management.azure.com/subscriptions',
+                                       uri_parameters=['api-version=2020-01-01'], body='{"b1": "v1"}',
+                                       skip_authorization_header=True)
+        self.assertEqual(next(items), 1)
+        # the next page is only requested once the items of the first one are consumed
+        self.assertEqual(send_mock.call_count, 1)
+        self.assertEqual(list(items), [2, 3])
+
+        requests = [c.args[1] for c in send_mock.call_args_list]
+        self.assertEqual([r.method for r in requests], ['POST', 'GET', 'GET'])
+        self.assertEqual([r.url for r in requests], [
+            'https://management.azure.com/subscriptions?api-version=2020-01-01',
+            'https://management.azure.com/subscriptions?api-version=2020-01-01&$skiptoken=a',
+            'https://graph.microsoft.com/v1.0/users?$skiptoken=b'])
+        self.assertIsNone(requests[1].body)
+        # the connections are kept alive between the requests
+        self.assertEqual(len({id(c.args[0]) for c in send_mock.call_args_list}), 1)
+
+    @mock.patch('requests.Session.send', autospec=True)
+    def test_send_raw_request_output_file(self, send_mock):
+        response = mock.MagicMock(ok=True)
+        response.iter_content.return_value = [b'ab', b'c']
+        send_mock.return_value = response
+        cli_ctx = DummyCli()
+        cli_ctx.data = {'command': 'rest'}
+        _, output_file = tempfile.mkstemp()
+
+        send_raw_request(cli_ctx, 'GET', 'https://myaccount.blob.core.windows.net/mycontainer/myblob',
+                         output_file=output_file)
+
+        self.assertTrue(send_mock.call_args.kwargs['stream'])
+        with open(output_file, 'rb') as f:
+            self.assertEqual(f.read(), b'abc')
+        os.remove(output_file)
+
 
 class TestBase64ToHex(unittest.TestCase):
 
@@ -14,6 +14,7 @@ import platform
 import ssl
 import re
 import logging
+import weakref
 
 import six
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
@@ -692,11 +693,43 @@ def check_connectivity(url='https://example.org', max_retries=5, timeout=1):
     return success
 
 
+# Size of the chunks the response of a raw request is written to --output-file in
+_RAW_RESPONSE_CHUNK_SIZE = 1024 * 1024
+
+_ENDPOINT_RESOURCES = weakref.WeakKeyDictionary()
+
+
+def _get_endpoint_resources(endpoints):
+    """Get the endpoints of a cloud which can be the resource of a token, like `https://graph.windows.net/`."""
+    resources = _ENDPOINT_RESOURCES.get(endpoints)
+    if resources is None:
+        from azure.cli.core.cloud import CloudEndpointNotSetException
+        resources = []
+        for p in [x for x in dir(endpoints) if not x.startswith('_')]:
+            try:
+                value = getattr(endpoints, p)
+            except CloudEndpointNotSetException:
+                continue
+            if isinstance(value, six.string_types):
+                resources.append(value)
+        _ENDPOINT_RESOURCES[endpoints] = resources
+    return resources
+
+
+def _get_raw_request_session(cli_ctx):
+    from requests import Session
+    if not hasattr(cli_ctx, 'http_sessions'):
+        return Session()
+    # Keep the connections alive between the raw requests of the CLI
+    from azure.cli.core.commands.client_factory import _get_shared_http_session
+    return _get_shared_http_session(cli_ctx, 'raw', Session)
+
+
 def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  # pylint: disable=too-many-locals,too-many-branches,too-many-statements
                      body=None, skip_authorization_header=False, resource=None, output_file=None,
                      generated_client_request_id_name='x-ms-client-request-id'):
     import uuid
-    from requests import Session, Request
+    from requests import Request
     from requests.structures import CaseInsensitiveDict
 
     result = CaseInsensitiveDict()
@@ -765,9 +798,9 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
     # Replace common tokens with real values. It is for smooth experience if users copy and paste the url from
     # Azure Rest API doc
     from azure.cli.core._profile import Profile
-    profile = Profile(cli_ctx=cli_ctx)
     if '{subscriptionId}' in url:
-        url = url.replace('{subscriptionId}', cli_ctx.data['subscription_id'] or profile.get_subscription_id())
+        url = url.replace('{subscriptionId}',
+                          cli_ctx.data['subscription_id'] or Profile(cli_ctx=cli_ctx).get_subscription_id())
 
     # Prepare the Bearer token for `Authorization` header
     if not skip_authorization_header and url.lower().startswith('https://'):
@@ -779,16 +812,12 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
             if url.lower().startswith(endpoints.resource_manager.rstrip('/')):
                 resource = endpoints.active_directory_resource_id
             else:
-                from azure.cli.core.cloud import CloudEndpointNotSetException
-                for p in [x for x in dir(endpoints) if not x.startswith('_')]:
-                    try:
-                        value = getattr(endpoints, p)
-                    except CloudEndpointNotSetException:
-                        continue
-                    if isinstance(value, six.string_types) and url.lower().startswith(value.lower()):
+                for value in _get_endpoint_resources(endpoints):
+                    if url.lower().startswith(value.lower()):
                         resource = value
                         break
         if resource:
+            profile = Profile(cli_ctx=cli_ctx)
             # Prepare `subscription` for `get_raw_token`
             # If this is an ARM request, try to extract subscription ID from the URL.
             # But there are APIs which don't require subscription ID, like /subscriptions, /tenants
@@ -811,15 +840,16 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
                            "If access token is required, use --resource to specify the resource")
 
     # https://requests.readthedocs.io/en/latest/user/advanced/#prepared-requests
-    s = Session()
+    s = _get_raw_request_session(cli_ctx)
     req = Request(method=method, url=url, headers=headers, params=uri_parameters, data=body)
     prepped = s.prepare_request(req)
 
     # Merge environment settings into session
-    settings = s.merge_environment_settings(prepped.url, {}, None, not should_disable_connection_verify(), None)
+    stream = bool(output_file)
+    settings = s.merge_environment_settings(prepped.url, {}, stream, not should_disable_connection_verify(), None)
     _log_request(prepped)
     r = s.send(prepped, **settings)
-    _log_response(r)
+    _log_response(r, stream=stream)
 
     if not r.ok:
         reason = r.reason
@@ -828,11 +858,26 @@ def send_raw_request(cli_ctx, method, url, headers=None, uri_parameters=None,  #
         raise CLIError(reason)
     if output_file:
         with open(output_file, 'wb') as fd:
-            for chunk in r.iter_content(chunk_size=128):
+            for chunk in r.iter_content(chunk_size=_RAW_RESPONSE_CHUNK_SIZE):
                 fd.write(chunk)
     return r
 
 
+def send_raw_request_paged(cli_ctx, method, url, headers=None, uri_parameters=None, body=None, **kwargs):
+    """Send a raw request and follow the `nextLink` of its response, yielding the items of each page once it is
+    received. The next pages are requested with GET."""
+    while url:
+        page = send_raw_request(cli_ctx, method, url, headers, uri_parameters, body, **kwargs).json()
+        if not isinstance(page, dict) or not isinstance(page.get('value'), list):
+            yield page
+            return
+        for item in page['value']:
+            yield item
+        url = page.get('nextLink') or page.get('@odata.nextLink')
+        # The next link has the query parameters of the request in it
+        method, uri_parameters, body = 'GET', None, None
+
+
 def _extract_subscription_id(url):
     """Extract the subscription ID from an ARM request URL."""
     subscription_regex = '/subscriptions/([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})'
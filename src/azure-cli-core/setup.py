@@ -60,6 +60,7 @@ DEPENDENCIES = [
     'requests~=2.22',
     'six~=1.12',
     'pkginfo>=1.5.0.1',
+    'portalocker~=1.2',
     'azure-mgmt-resource==10.2.0',
     'azure-mgmt-core==1.2.0'
 ]
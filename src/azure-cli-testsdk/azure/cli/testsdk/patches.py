@@ -37,6 +37,17 @@ def patch_main_exception_handler(unit_test):
     mock_in_unit_test(unit_test, 'azure.cli.core.util.handle_exception', _handle_main_exception)
 
 
+def patch_disable_caches(unit_test):
+    # The commands of a test don't use what earlier commands cached in the config dir, like the api-versions of the
+    # providers, so that they make the requests in the recording
+    import mock
+    from azure.cli.core._session import ENV_DISABLE_CACHES
+
+    patcher = mock.patch.dict('os.environ', {ENV_DISABLE_CACHES: 'true'})
+    patcher.start()
+    unit_test.addCleanup(patcher.stop)
+
+
 def patch_load_cached_subscriptions(unit_test):
     def _handle_load_cached_subscription(*args, **kwargs):  # pylint: disable=unused-argument
 
@@ -8,9 +8,81 @@ import timeit
 # Log the start time
 start_time = timeit.default_timer()
 
+import os
 import sys
 import uuid
 
+
+def _use_daemon():
+    # Decide before importing azure.cli.core, so that forwarded commands stay cheap
+    from configparser import ConfigParser
+    if sys.platform == 'win32' or '_ARGCOMPLETE' in os.environ:
+        return False
+    value = os.environ.get('AZURE_CORE_USE_DAEMON')
+    if value is None:
+        config = ConfigParser()
+        config.read(os.path.join(_get_config_dir(), 'config'))
+        value = config.get('core', 'use_daemon', fallback='false')
+    return value.lower() in ['1', 'yes', 'true', 'on']
+
+
+def _get_config_dir():
+    return os.getenv('AZURE_CONFIG_DIR', None) or os.path.expanduser(os.path.join('~', '.azure'))
+
+
+def _run_in_daemon(args):
+    """Forward the command to the daemon, see azure.cli.core.daemon for the protocol.
+
+    :return: the exit code, or None if the command should run in this process.
+    """
+    import json
+    import socket
+    import subprocess
+
+    socket_path = os.path.join(_get_config_dir(), 'daemon.sock')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except socket.error:
+        # Start the daemon for the next commands and run this one in process
+        with open(os.devnull, 'r+') as devnull:
+            subprocess.Popen([sys.executable, '-m', 'azure.cli.core.daemon'], stdin=devnull, stdout=devnull,
+                             stderr=devnull, start_new_session=True)
+        return None
+
+    reader = sock.makefile('r', encoding='utf-8', newline='\n')
+
+    def _send(**message):
+        sock.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+    with sock, reader:
+        _send(argv=args, env=dict(os.environ), cwd=os.getcwd(), stdout_isatty=sys.stdout.isatty(),
+              stderr_isatty=sys.stderr.isatty())
+        for line in reader:
+            message = json.loads(line)
+            if 'stdout' in message:
+                sys.stdout.write(message['stdout'])
+                sys.stdout.flush()
+            elif 'stderr' in message:
+                sys.stderr.write(message['stderr'])
+                sys.stderr.flush()
+            elif message.get('stdin') == 'readline':
+                _send(stdin=sys.stdin.readline())
+            elif message.get('stdin') == 'read':
+                _send(stdin=sys.stdin.read(message['size']))
+            elif 'exit' in message:
+                return message['exit']
+            elif message.get('retry_locally'):
+                return None
+    # The daemon went away in the middle of the command
+    return 1
+
+
+if _use_daemon():
+    daemon_exit_code = _run_in_daemon(sys.argv[1:])
+    if daemon_exit_code is not None:
+        sys.exit(daemon_exit_code)
+
 import azure.cli.core.telemetry as telemetry
 from azure.cli.core import get_default_cli
 from knack.completion import ARGCOMPLETE_ENV_NAME
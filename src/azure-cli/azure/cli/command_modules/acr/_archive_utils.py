@@ -7,17 +7,27 @@ import tarfile
 import os
 import re
 import codecs
+import gzip
+import hashlib
+import threading
+import time
 from io import open
 import requests
 from knack.log import get_logger
 from knack.util import CLIError
 from msrestazure.azure_exceptions import CloudError
+from azure.cli.core._session import get_cache_session
 from azure.cli.core.profiles import ResourceType, get_sdk
 from ._azure_utils import get_blob_info
 from ._constants import TASK_VALID_VSTS_URLS
 
 logger = get_logger(__name__)
 
+# The uploaded source code archives, by registry and content hash. The uploads are temporary, so they aren't kept long.
+_UPLOAD_CACHE_MAX_AGE = 60 * 60
+_upload_cache_lock = threading.Lock()
+_DEFAULT_COMPRESS_LEVEL = 6
+
 
 def upload_source_code(cmd, client,
                        registry_name,
@@ -26,10 +36,14 @@ def upload_source_code(cmd, client,
                        tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
+    compress_level = cmd.cli_ctx.config.getint('acr', 'source_compress_level', fallback=_DEFAULT_COMPRESS_LEVEL)
+    if not 0 <= compress_level <= 9:
+        raise CLIError("Configuration 'acr.source_compress_level' should be an integer from 0 to 9.")
+    content_hash = _pack_source_code(source_location,
+                                     tar_file_path,
+                                     docker_file_path,
+                                     docker_file_in_tar,
+                                     compress_level=compress_level)
 
     size = os.path.getsize(tar_file_path)
     unit = 'GiB'
@@ -39,6 +53,14 @@ def upload_source_code(cmd, client,
             break
         size = size / 1024.0
 
+    cache_key = '{}/{}/{}/{}'.format(client.config.subscription_id, resource_group_name, registry_name,
+                                     content_hash).lower()
+    cached_upload = _get_cached_upload(cache_key)
+    if cached_upload and _is_upload_available(cmd, cached_upload['uploadUrl'], os.path.getsize(tar_file_path)):
+        logger.warning("Reusing the unchanged context uploaded before. Sending context ({0:.3f} {1}) to registry: "
+                       "{2}...".format(size, unit, registry_name))
+        return cached_upload['relativePath']
+
     logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
@@ -61,15 +83,60 @@ def upload_source_code(cmd, client,
                          container_name=container_name,
                          blob_name=blob_name,
                          file_path=tar_file_path)
+    _cache_upload(cache_key, relative_path, upload_url)
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
+def _get_cached_upload(cache_key):
+    cache = get_cache_session('acrSourceUploads.json')
+    if cache is None:
+        return None
+    with _upload_cache_lock:
+        entry = cache.get(cache_key)
+    if entry and 'uploadUrl' in entry and entry['time'] + _UPLOAD_CACHE_MAX_AGE > time.time():
+        return entry
+    return None
+
+
+def _is_upload_available(cmd, upload_url, size):
+    # The registry may have cleaned up the upload already, so the blob is checked before it's reused
+    from azure.common import AzureException
+    account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
+    BlockBlobService = get_sdk(cmd.cli_ctx, ResourceType.DATA_STORAGE, 'blob#BlockBlobService')
+    try:
+        blob = BlockBlobService(account_name=account_name,
+                                sas_token=sas_token,
+                                endpoint_suffix=endpoint_suffix).get_blob_properties(container_name, blob_name)
+    except AzureException as e:
+        logger.debug("The context uploaded before is not available, uploading it again. Error: %s", e)
+        return False
+    return blob.properties.content_length == size
+
+
+def _cache_upload(cache_key, relative_path, upload_url):
+    cache = get_cache_session('acrSourceUploads.json')
+    if cache is None:
+        return
+    now = time.time()
+    with _upload_cache_lock:
+        # expired uploads are dropped, so the cache doesn't grow with every build
+        for key in [k for k, v in cache.items() if v['time'] + _UPLOAD_CACHE_MAX_AGE <= now]:
+            del cache[key]
+        cache[cache_key] = {'time': now, 'relativePath': relative_path, 'uploadUrl': upload_url}
+
+
+def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar,
+                      compress_level=_DEFAULT_COMPRESS_LEVEL):
+    """Pack the source code into a gzipped tar. The same source code is packed into the same bytes.
+
+    :return: The SHA-256 hash of the archive
+    """
     logger.warning("Packing source code into tar to upload...")
 
     ignore_list, ignore_list_size = _load_dockerignore_file(source_location)
+    ignore_matcher = _IgnoreRuleMatcher(ignore_list or [])
     common_vcs_ignore_list = {'.git', '.gitignore', '.bzr', 'bzrignore', '.hg', '.hgignore', '.svn'}
 
     def _ignore_check(tarinfo, parent_ignored, parent_matching_rule_index):
@@ -83,37 +150,60 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
             # eg, it will ignore the files under .git folder.
             return parent_ignored, parent_matching_rule_index
 
-        for index, item in enumerate(ignore_list):
-            # stop checking the remaining rules whose priorities are lower than the parent matching rule
-            # at this point, current item should just inherit from parent
-            if index >= parent_matching_rule_index:
-                break
-            if re.match(item.pattern, tarinfo.name):
-                logger.debug(".dockerignore: rule '%s' matches '%s'.",
-                             item.rule, tarinfo.name)
-                return item.ignore, index
+        # the remaining rules whose priorities are lower than the parent matching rule are not checked,
+        # current item should just inherit from parent for them
+        index = ignore_matcher.match(tarinfo.name, parent_matching_rule_index)
+        if index is not None:
+            item = ignore_list[index]
+            logger.debug(".dockerignore: rule '%s' matches '%s'.",
+                         item.rule, tarinfo.name)
+            return item.ignore, index
 
         logger.debug(".dockerignore: no rule for '%s'. parent ignore '%s'",
                      tarinfo.name, parent_ignored)
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
-        # need to set arcname to empty string as the archive root path
-        _archive_file_recursively(tar,
-                                  source_location,
-                                  arcname="",
-                                  parent_ignored=False,
-                                  parent_matching_rule_index=ignore_list_size,
-                                  ignore_check=_ignore_check)
+    with open(tar_file_path, "wb") as f:
+        hashed_file = _HashingWriter(f)
+        # no file name or time in the gzip header, so an unchanged source code has the same hash
+        with gzip.GzipFile(filename='', mode='wb', compresslevel=compress_level, fileobj=hashed_file,
+                           mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode="w") as tar:
+                # need to set arcname to empty string as the archive root path
+                _archive_file_recursively(tar,
+                                          source_location,
+                                          arcname="",
+                                          parent_ignored=False,
+                                          parent_matching_rule_index=ignore_list_size,
+                                          ignore_check=_ignore_check)
+
+                # Add the Dockerfile if it's specified.
+                # In the case of run, there will be no Dockerfile.
+                if docker_file_path:
+                    docker_file_tarinfo = tar.gettarinfo(
+                        docker_file_path, docker_file_in_tar)
+                    with open(docker_file_path, "rb") as docker_file:
+                        tar.addfile(docker_file_tarinfo, docker_file)
+    return hashed_file.hexdigest()
+
 
-        # Add the Dockerfile if it's specified.
-        # In the case of run, there will be no Dockerfile.
-        if docker_file_path:
-            docker_file_tarinfo = tar.gettarinfo(
-                docker_file_path, docker_file_in_tar)
-            with open(docker_file_path, "rb") as f:
-                tar.addfile(docker_file_tarinfo, f)
+class _HashingWriter:
+    """Writes to a file and hashes what is written."""
+
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+
+    def write(self, data):
+        self._hash.update(data)
+        return self._fileobj.write(data)
+
+    def flush(self):
+        self._fileobj.flush()
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
 
 
 class IgnoreRule:  # pylint: disable=too-few-public-methods
@@ -144,6 +234,30 @@ class IgnoreRule:  # pylint: disable=too-few-public-methods
         self.pattern += "$"
 
 
+class _IgnoreRuleMatcher:  # pylint: disable=too-few-public-methods
+    """Finds the rule with the highest priority matching a path, like checking the rules one by one does.
+
+    The rules of higher priorities than a given one are compiled into a single regular expression, in which the
+    first alternative that matches is the first rule that does.
+    """
+
+    def __init__(self, ignore_list):
+        self._ignore_list = ignore_list
+        self._regexes = {}
+
+    def match(self, name, rule_count):
+        """:return: the index of the first matching rule among the first rule_count ones, or None"""
+        if rule_count <= 0:
+            return None
+        regex = self._regexes.get(rule_count)
+        if regex is None:
+            regex = re.compile('|'.join('(?P<r{}>{})'.format(index, item.pattern)
+                                        for index, item in enumerate(self._ignore_list[:rule_count])))
+            self._regexes[rule_count] = regex
+        m = regex.match(name)
+        return int(m.lastgroup[1:]) if m else None
+
+
 def _load_dockerignore_file(source_location):
     # reference: https://docs.docker.com/engine/reference/builder/#dockerignore-file
     docker_ignore_file = os.path.join(source_location, ".dockerignore")
@@ -190,8 +304,9 @@ def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matchin
             tar.addfile(tarinfo)
 
     # even the dir is ignored, its child items can still be included, so continue to scan
+    # (in a stable order, so the same files are archived into the same bytes)
     if tarinfo.isdir():
-        for f in os.listdir(name):
+        for f in sorted(os.listdir(name)):
             _archive_file_recursively(tar, os.path.join(name, f), os.path.join(arcname, f),
                                       parent_ignored=ignored, parent_matching_rule_index=matching_rule_index,
                                       ignore_check=ignore_check)
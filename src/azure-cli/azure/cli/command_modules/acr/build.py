@@ -65,8 +65,9 @@ def acr_build(cmd,  # pylint: disable=too-many-locals
             # NOTE: os.path.basename is unable to parse "\" in the file path
             original_docker_file_name = os.path.basename(
                 docker_file_path.replace("\\", "/"))
+            # the name is kept the same between builds, so an unchanged context isn't uploaded again
             docker_file_in_tar = '{}_{}'.format(
-                uuid.uuid4().hex, original_docker_file_name)
+                uuid.uuid5(uuid.NAMESPACE_URL, os.path.abspath(docker_file_path)).hex, original_docker_file_name)
 
             source_location = upload_source_code(
                 cmd, client_registries, registry_name, resource_group_name,
@@ -0,0 +1,94 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tarfile
+import tempfile
+import unittest
+import mock
+
+from azure.common import AzureMissingResourceHttpError
+
+from azure.cli.core.mock import DummyCli
+from azure.cli.command_modules.acr._archive_utils import _pack_source_code, upload_source_code
+
+
+class AcrArchiveUtilsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.source_dir = tempfile.mkdtemp()
+        self.tar_dir = tempfile.mkdtemp()
+        for path in ['app/main.py', 'app/main.pyc', 'app/keep.pyc', 'docs/readme.md', 'docs/api/index.md',
+                     '.git/HEAD', 'Dockerfile']:
+            path = os.path.join(self.source_dir, path)
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as f:
+                f.write(path)
+        with open(os.path.join(self.source_dir, '.dockerignore'), 'w') as f:
+            f.write('# comment\n**/*.pyc\n!app/keep.pyc\ndocs\n!docs/api\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.source_dir)
+        shutil.rmtree(self.tar_dir)
+
+    def _pack(self, name='source.tar.gz'):
+        tar_file_path = os.path.join(self.tar_dir, name)
+        content_hash = _pack_source_code(self.source_dir, tar_file_path, None, None)
+        with tarfile.open(tar_file_path) as tar:
+            return content_hash, sorted(tar.getnames())
+
+    def test_pack_source_code_applies_ignore_rules(self):
+        _, names = self._pack()
+        self.assertEqual(names, ['', '.dockerignore', 'Dockerfile', 'app', 'app/keep.pyc', 'app/main.py',
+                                 'docs/api', 'docs/api/index.md'])
+
+    def test_pack_source_code_is_reproducible(self):
+        content_hash, _ = self._pack('first.tar.gz')
+        self.assertEqual(self._pack('second.tar.gz')[0], content_hash)
+        with open(os.path.join(self.source_dir, 'app', 'main.py'), 'a') as f:
+            f.write('changed')
+        self.assertNotEqual(self._pack('third.tar.gz')[0], content_hash)
+
+    @mock.patch('azure.cli.command_modules.acr._archive_utils.get_sdk', autospec=True)
+    @mock.patch('azure.cli.command_modules.acr._archive_utils.get_cache_session', autospec=True)
+    def test_upload_source_code_skips_unchanged_context(self, get_upload_cache_mock, get_sdk_mock):
+        get_upload_cache_mock.return_value = {}
+        cmd = mock.MagicMock()
+        cmd.cli_ctx = DummyCli()
+        client = mock.MagicMock()
+        client.config.subscription_id = 'sub'
+        client.get_build_source_upload_url.return_value = mock.MagicMock(
+            upload_url='https://account.blob.core.windows.net/container/source.tar.gz?sig=secret',
+            relative_path='source/source.tar.gz')
+        block_blob_service = get_sdk_mock.return_value.return_value
+
+        def _upload(name):
+            return upload_source_code(cmd, client, 'registry', 'rg', self.source_dir,
+                                      os.path.join(self.tar_dir, name), None, None)
+
+        self.assertEqual(_upload('first.tar.gz'), 'source/source.tar.gz')
+        block_blob_service.get_blob_properties.return_value.properties.content_length = \
+            os.path.getsize(os.path.join(self.tar_dir, 'first.tar.gz'))
+        self.assertEqual(_upload('second.tar.gz'), 'source/source.tar.gz')
+        client.get_build_source_upload_url.assert_called_once_with('rg', 'registry')
+        block_blob_service.create_blob_from_path.assert_called_once()
+        block_blob_service.get_blob_properties.assert_called_once_with('container', 'source.tar.gz')
+
+        # the upload is gone, so it's uploaded again
+        block_blob_service.get_blob_properties.side_effect = AzureMissingResourceHttpError('Not Found', 404)
+        self.assertEqual(_upload('second.tar.gz'), 'source/source.tar.gz')
+        self.assertEqual(block_blob_service.create_blob_from_path.call_count, 2)
+        block_blob_service.get_blob_properties.side_effect = None
+
+        with open(os.path.join(self.source_dir, 'app', 'main.py'), 'a') as f:
+            f.write('changed')
+        _upload('third.tar.gz')
+        self.assertEqual(block_blob_service.create_blob_from_path.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,10 @@ FUNCTIONS_NO_V2_REGIONS = {
     "USSec West",
     "USSec East"
 }
+# in seconds, the status of a zip deployment is checked more and more rarely from the (configurable) interval
+ZIP_DEPLOY_POLL_INTERVAL = 2
+ZIP_DEPLOY_MAX_POLL_INTERVAL = 15
+ZIP_DEPLOY_TIMEOUT = 900
 
 
 class FUNCTIONS_STACKS_API_KEYS():
@@ -60,7 +60,8 @@ from ._create_util import (zip_contents_from_dir, get_runtime_version_details, c
                            detect_os_form_src)
 from ._constants import (FUNCTIONS_STACKS_API_JSON_PATHS, FUNCTIONS_STACKS_API_KEYS,
                          FUNCTIONS_LINUX_RUNTIME_VERSION_REGEX, FUNCTIONS_WINDOWS_RUNTIME_VERSION_REGEX,
-                         NODE_VERSION_DEFAULT, RUNTIME_STACKS, FUNCTIONS_NO_V2_REGIONS)
+                         NODE_VERSION_DEFAULT, RUNTIME_STACKS, FUNCTIONS_NO_V2_REGIONS, ZIP_DEPLOY_POLL_INTERVAL,
+                         ZIP_DEPLOY_MAX_POLL_INTERVAL, ZIP_DEPLOY_TIMEOUT)
 
 logger = get_logger(__name__)
 
@@ -408,25 +409,69 @@ def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=No
     import requests
     import os
     from azure.cli.core.util import should_disable_connection_verify
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment. This operation can take a while to complete ...")
-        res = requests.post(zip_url, data=zip_content, headers=headers, verify=not should_disable_connection_verify())
-        logger.warning("Deployment endpoint responded with status code %d", res.status_code)
-
-    # check if there's an ongoing process
-    if res.status_code == 409:
-        raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
-                       "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
-                       "is removed.".format(deployment_status_url))
-
-    # check the status of async deployment
-    response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
-                                            authorization, timeout)
+    # The connection is kept alive from the upload to the last status check
+    with requests.Session() as session:
+        session.verify = not should_disable_connection_verify()
+        # Stream the file content, deployment packages can be too large to be read in memory
+        src = os.path.realpath(os.path.expanduser(src))
+        with open(src, 'rb') as fs:
+            logger.warning("Starting zip deployment. This operation can take a while to complete ...")
+            zip_content = _ZipDeployReader(fs, os.path.getsize(src), cmd.cli_ctx.get_progress_controller(det=True))
+            try:
+                res = session.post(zip_url, data=zip_content, headers=headers)
+            finally:
+                zip_content.end()
+            logger.warning("Deployment endpoint responded with status code %d", res.status_code)
+
+        # check if there's an ongoing process
+        if res.status_code == 409:
+            raise CLIError("There may be an ongoing deployment or your app setting has WEBSITE_RUN_FROM_PACKAGE. "
+                           "Please track your deployment in {} and ensure the WEBSITE_RUN_FROM_PACKAGE app setting "
+                           "is removed.".format(deployment_status_url))
+
+        # check the status of async deployment
+        response = _check_zip_deployment_status(cmd, resource_group_name, name, deployment_status_url,
+                                                authorization, timeout, session=session)
     return response
 
 
+class _ZipDeployReader:
+    """A file object streaming a zip package to the zip deployment endpoint, which reports the upload progress.
+    It can be rewound, so requests can send it again when it's redirected."""
+
+    def __init__(self, stream, size, progress_controller):
+        self._stream = stream
+        self._size = size
+        self._uploaded = 0
+        self._progress_controller = progress_controller
+        self._percent = None
+
+    def __len__(self):
+        # used as the Content-Length
+        return self._size
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._uploaded += len(data)
+        # the reads are small, so the progress is only reported when its percentage changes
+        percent = self._uploaded * 100 // self._size if self._size else 100
+        if percent != self._percent:
+            self._percent = percent
+            self._progress_controller.add(message='Uploading', value=self._uploaded, total_val=self._size)
+        return data
+
+    def tell(self):
+        return self._stream.tell()
+
+    def seek(self, offset, whence=0):
+        position = self._stream.seek(offset, whence)
+        self._uploaded = position
+        return position
+
+    def end(self):
+        self._progress_controller.end()
+
+
 def add_remote_build_app_settings(cmd, resource_group_name, name, slot):
     settings = get_app_settings(cmd, resource_group_name, name, slot)
     scm_do_build_during_deployment = None
@@ -3076,22 +3121,31 @@ def list_locations(cmd, sku, linux_workers_enabled=None):
     return [geo_region for geo_region in web_client_geo_regions if geo_region.name in providers_client_locations_list]
 
 
-def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None):
+def _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout=None,
+                                 session=None):
     import requests
     from azure.cli.core.util import should_disable_connection_verify
-    total_trials = (int(timeout) // 2) if timeout else 450
-    num_trials = 0
-    while num_trials < total_trials:
-        time.sleep(2)
-        response = requests.get(deployment_status_url, headers=authorization,
-                                verify=not should_disable_connection_verify())
+    if session is None:
+        with requests.Session() as session:
+            session.verify = not should_disable_connection_verify()
+            return _check_zip_deployment_status(cmd, rg_name, name, deployment_status_url, authorization, timeout,
+                                                session=session)
+    # The status is checked more and more rarely, starting at the configured interval
+    interval = cmd.cli_ctx.config.getint('appservice', 'zip_deploy_poll_interval',
+                                         fallback=ZIP_DEPLOY_POLL_INTERVAL)
+    if interval <= 0:
+        raise CLIError("Configuration 'appservice.zip_deploy_poll_interval' should be a positive integer.")
+    deadline = time.time() + (int(timeout) if timeout else ZIP_DEPLOY_TIMEOUT)
+    res_dict = {}
+    while time.time() < deadline:
+        time.sleep(min(interval, max(deadline - time.time(), 0)))
+        interval = min(interval * 2, ZIP_DEPLOY_MAX_POLL_INTERVAL)
+        response = session.get(deployment_status_url, headers=authorization)
         try:
             res_dict = response.json()
         except json.decoder.JSONDecodeError:
             logger.warning("Deployment status endpoint %s returns malformed data. Retrying...", deployment_status_url)
             res_dict = {}
-        finally:
-            num_trials = num_trials + 1
 
         if res_dict.get('status', 0) == 3:
             _configure_default_logging(cmd, rg_name, name)
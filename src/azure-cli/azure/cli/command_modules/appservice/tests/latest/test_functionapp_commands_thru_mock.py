@@ -5,6 +5,7 @@
 import unittest
 import mock
 import os
+import tempfile
 
 from azure.mgmt.web import WebSiteManagementClient
 from azure.cli.core.adal_authentication import AdalAuthentication
@@ -183,6 +184,50 @@ class TestFunctionappMocked(unittest.TestCase):
         get_site_credential_mock.assert_called_with(cmd_mock.cli_ctx, 'rg', 'name', None)
         get_scm_url_mock.assert_called_with(cmd_mock, 'rg', 'name', None)
 
+    @mock.patch('azure.cli.command_modules.appservice.custom.time.sleep')
+    @mock.patch('requests.Session', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', return_value=('usr', 'pwd'))
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', return_value='https://name.scm')
+    def test_enable_zip_deploy_streams_the_package(self,
+                                                   get_scm_url_mock,
+                                                   get_site_credential_mock,
+                                                   session_mock,
+                                                   sleep_mock):
+        # prepare
+        cmd_mock = _get_test_cmd()
+        zip_file = os.path.join(tempfile.mkdtemp(), 'app.zip')
+        with open(zip_file, 'wb') as f:
+            f.write(b'0' * 100000)
+        uploaded = []
+
+        def _post(url, data=None, headers=None):
+            self.assertEqual(len(data), 100000)
+            # the package is rewound, like requests does to send it again on a redirect
+            data.read(8192)
+            self.assertEqual(data.tell(), 8192)
+            data.seek(0)
+            chunk = data.read(8192)
+            while chunk:
+                uploaded.append(chunk)
+                chunk = data.read(8192)
+            return mock.MagicMock(status_code=202)
+
+        session = session_mock.return_value.__enter__.return_value
+        session.post.side_effect = _post
+        session.get.side_effect = [mock.MagicMock(**{'json.return_value': {'status': s}}) for s in (1, 1, 1, 4)]
+
+        # action
+        result = enable_zip_deploy(cmd_mock, 'rg', 'name', zip_file)
+
+        # assert
+        self.assertEqual(result, {'status': 4})
+        self.assertEqual(b''.join(uploaded), b'0' * 100000)
+        session.post.assert_called_once()
+        self.assertEqual(session.post.call_args[0][0], 'https://name.scm/api/zipdeploy?isAsync=true')
+        # the status is checked on the same connection, more and more rarely
+        self.assertEqual(session.get.call_count, 4)
+        self.assertEqual([c[0][0] for c in sleep_mock.call_args_list], [2, 4, 8, 15])
+
     @mock.patch('azure.cli.command_modules.appservice.custom._get_app_settings_from_scm', return_value={
         'SCM_DO_BUILD_DURING_DEPLOYMENT': 'true'
     })
@@ -11,6 +11,7 @@ OUTPUT_LIST = [
      'desc': 'Colored JSON formatted output that most closely matches API responses.'},
     {'name': 'table', 'desc': 'Human-readable output format.'},
     {'name': 'tsv', 'desc': 'Tab- and Newline-delimited. Great for GREP, AWK, etc.'},
+    {'name': 'jsonl', 'desc': 'JSON Lines, a JSON object per line. Long lists are written as they are fetched.'},
     {'name': 'yaml', 'desc': 'YAML formatted output. An alternative to JSON. Great for configuration files.'},
     {'name': 'yamlc', 'desc': 'Colored YAML formatted output. An alternative to JSON. Great for configuration files.'},
     {'name': 'none', 'desc': 'No output, except for errors and warnings.'}
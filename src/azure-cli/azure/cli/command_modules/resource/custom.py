@@ -15,9 +15,12 @@ import platform
 import re
 import ssl
 import sys
+import threading
+import time
 import uuid
 import base64
 
+import six
 from six.moves.urllib.request import urlopen  # pylint: disable=import-error
 from six.moves.urllib.parse import urlparse  # pylint: disable=import-error
 
@@ -25,6 +28,7 @@ from msrestazure.tools import is_valid_resource_id, parse_resource_id
 
 from azure.mgmt.resource.resources.models import GenericResource, DeploymentMode
 
+from azure.cli.core._session import get_cache_session
 from azure.cli.core.parser import IncorrectUsageError
 from azure.cli.core.util import get_file_json, read_file_content, shell_safe_json_parse, sdk_no_wait
 from azure.cli.core.commands import LongRunningOperation
@@ -955,7 +959,6 @@ def _get_auth_provider_latest_api_version(cli_ctx):
 
 
 def _update_provider(cli_ctx, namespace, registering, wait):
-    import time
     target_state = 'Registered' if registering else 'Unregistered'
     rcf = _resource_client_factory(cli_ctx)
     if registering:
@@ -1567,7 +1570,7 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     """
     Deletes the given resource(s).
     This function allows deletion of ids with dependencies on one another.
-    This is done with multiple passes through the given ids.
+    Independent resources are deleted at the same time, see _delete_resources.
     """
     parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(cmd.cli_ctx,
                                                                               resource_group_name,
@@ -1578,34 +1581,11 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version, latest_include_preview), id_dict)
                      for id_dict in parsed_ids]
 
-    results = []
-    from msrestazure.azure_exceptions import CloudError
-    while to_be_deleted:
-        logger.debug("Start new loop to delete resources.")
-        operations = []
-        failed_to_delete = []
-        for rsrc_utils, id_dict in to_be_deleted:
-            try:
-                operations.append(rsrc_utils.delete())
-                resource = _build_resource_id(**id_dict) or resource_name
-                logger.debug("deleting %s", resource)
-            except CloudError as e:
-                # request to delete failed, add parsed id dict back to queue
-                id_dict['exception'] = str(e)
-                failed_to_delete.append((rsrc_utils, id_dict))
-        to_be_deleted = failed_to_delete
-
-        # stop deleting if none deletable
-        if not operations:
-            break
-
-        # all operations return result before next pass
-        for operation in operations:
-            results.append(operation.result())
+    results, failed = _delete_resources(cmd.cli_ctx, to_be_deleted)
 
-    if to_be_deleted:
+    if failed:
         error_msg_builder = ['Some resources failed to be deleted (run with `--verbose` for more information):']
-        for _, id_dict in to_be_deleted:
+        for _, id_dict in failed:
             logger.info(id_dict['exception'])
             resource_id = _build_resource_id(**id_dict) or id_dict['resource_id']
             error_msg_builder.append(resource_id)
@@ -1614,6 +1594,96 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     return _single_or_collection(results)
 
 
+# The resources of a type are deleted after the resources of the types in the groups before it,
+# since they can't be deleted while they are in use by them. Other types are deleted in any order.
+_RESOURCE_DELETION_ORDER = [
+    ['microsoft.compute/virtualmachines', 'microsoft.compute/virtualmachinescalesets'],
+    ['microsoft.network/networkinterfaces', 'microsoft.compute/disks', 'microsoft.compute/availabilitysets'],
+    ['microsoft.network/loadbalancers', 'microsoft.network/applicationgateways'],
+    ['microsoft.network/publicipaddresses', 'microsoft.network/networksecuritygroups'],
+    ['microsoft.network/virtualnetworks']
+]
+
+
+def _get_deletion_dependencies(parsed_ids):
+    """Get the indexes of the resources each resource must be deleted after: its child resources, and the
+    resources using it according to _RESOURCE_DELETION_ORDER."""
+    rank = {t: i for i, types in enumerate(_RESOURCE_DELETION_ORDER) for t in types}
+    resources = []
+    for id_dict in parsed_ids:
+        resource_id = (id_dict.get('resource_id') or _build_resource_id(**id_dict) or '').lower().rstrip('/')
+        parts = parse_resource_id(resource_id) if resource_id else {}
+        types = [parts[k] for k in ('type', 'child_type_1', 'child_type_2', 'child_type_3') if parts.get(k)]
+        resource_type = '/'.join([parts.get('namespace', '')] + types)
+        resources.append((resource_id, rank.get(resource_type)))
+
+    def _is_child(child_id, parent_id):
+        return bool(parent_id) and child_id.startswith(parent_id + '/')
+
+    dependencies = []
+    for resource_id, resource_rank in resources:
+        dependencies.append({
+            i for i, (other_id, other_rank) in enumerate(resources)
+            if _is_child(other_id, resource_id) or
+            (resource_rank is not None and other_rank is not None and other_rank < resource_rank and
+             not _is_child(resource_id, other_id))})
+    return dependencies
+
+
+def _delete_resources(cli_ctx, to_be_deleted):
+    """Delete the resources at the same time, as soon as the resources they depend on are deleted.
+
+    The deletions that fail are retried once the others are done, as long as some resources were deleted since they
+    failed, since they may have been in use by them. The resources depending on them wait for the retry.
+    :return: The results of the deletions, and the resources which failed to be deleted
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from msrestazure.azure_exceptions import CloudError
+
+    dependencies = _get_deletion_dependencies([id_dict for _, id_dict in to_be_deleted])
+    pending = set(range(len(to_be_deleted)))
+    running = {}
+    results = {}
+    failed = set()
+    deleted_since_failure = False
+
+    def _delete(rsrc_utils):
+        return rsrc_utils.delete().result()
+
+    max_workers = max(1, cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=10))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            waiting = pending | failed | set(running.values())
+            ready = [i for i in sorted(pending) if not dependencies[i] & waiting]
+            if not ready and not running:
+                if failed and deleted_since_failure:
+                    logger.debug("Retry deleting %d resources.", len(failed))
+                    pending, failed, deleted_since_failure = pending | failed, set(), False
+                    continue
+                # the remaining resources depend on resources that can't be deleted, try them anyway
+                ready = sorted(pending)
+            if not ready and not running:
+                break
+            for i in ready:
+                rsrc_utils, id_dict = to_be_deleted[i]
+                logger.debug("deleting %s", _build_resource_id(**id_dict) or id_dict.get('resource_name'))
+                pending.remove(i)
+                running[executor.submit(_delete, rsrc_utils)] = i
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = running.pop(future)
+                try:
+                    results[i] = future.result()
+                    deleted_since_failure = True
+                except CloudError as e:
+                    # request to delete failed, it will be retried
+                    to_be_deleted[i][1]['exception'] = str(e)
+                    failed.add(i)
+
+    return [results[i] for i in sorted(results)], [to_be_deleted[i] for i in sorted(failed)]
+
+
 # pylint: unused-argument
 def update_resource(cmd, parameters, resource_ids=None,
                     resource_group_name=None, resource_provider_namespace=None,
@@ -2187,7 +2257,6 @@ def update_policy_setdefinition(cmd, policy_set_definition_name, definitions=Non
 
 def _register_rp(cli_ctx, subscription_id=None):
     rp = "Microsoft.Management"
-    import time
     rcf = get_mgmt_service_client(
         cli_ctx,
         ResourceType.MGMT_RESOURCE_RESOURCES,
@@ -2649,6 +2718,42 @@ def update_tag_at_scope(cmd, resource_id, tags, operation):
 # endregion
 
 
+# The api-versions of the resource types of the providers, cached on disk for each subscription
+_PROVIDER_CACHE_MAX_AGE = 24 * 60 * 60
+_provider_cache_lock = threading.Lock()
+_provider_locks = {}
+
+
+def _get_provider_api_versions(rcf, resource_provider_namespace, refresh=False):
+    """Get the api-versions of the resource types of a provider, as {resource type in lower case: api-versions}.
+
+    They are cached for a day, and a provider is only looked up once when --ids jobs run concurrently.
+    :return: The api-versions and whether they come from the cache
+    """
+    subscription_id = getattr(getattr(rcf, 'config', None), 'subscription_id', None)
+    cache = get_cache_session('providerApiVersions.json') if isinstance(subscription_id, six.string_types) else None
+    if cache is None:
+        return _fetch_provider_api_versions(rcf, resource_provider_namespace), False
+
+    key = '{}/{}'.format(subscription_id, resource_provider_namespace).lower()
+    with _provider_cache_lock:
+        provider_lock = _provider_locks.setdefault(key, threading.Lock())
+    with provider_lock:
+        with _provider_cache_lock:
+            entry = cache.get(key)
+        if not refresh and entry and entry['time'] + _PROVIDER_CACHE_MAX_AGE > time.time():
+            return entry['resourceTypes'], True
+        api_versions = _fetch_provider_api_versions(rcf, resource_provider_namespace)
+        with _provider_cache_lock:
+            cache[key] = {'time': time.time(), 'resourceTypes': api_versions}
+        return api_versions, False
+
+
+def _fetch_provider_api_versions(rcf, resource_provider_namespace):
+    provider = rcf.providers.get(resource_provider_namespace)
+    return {t.resource_type.lower(): t.api_versions or [] for t in provider.resource_types}
+
+
 class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
     def __init__(self, cli_ctx,
                  resource_group_name=None, resource_provider_namespace=None,
@@ -2879,24 +2984,25 @@ class _ResourceUtils:  # pylint: disable=too-many-instance-attributes
     @staticmethod
     def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type,
                             latest_include_preview=False):
-        provider = rcf.providers.get(resource_provider_namespace)
-
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
+        provider_api_versions, cached = _get_provider_api_versions(rcf, resource_provider_namespace)
+        if resource_type_str.lower() not in provider_api_versions and cached:
+            # The resource type may be newer than the cached provider
+            provider_api_versions, _ = _get_provider_api_versions(rcf, resource_provider_namespace, refresh=True)
+        if resource_type_str.lower() not in provider_api_versions:
             raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
+        api_versions = provider_api_versions[resource_type_str.lower()]
+        if api_versions:
             # If latest_include_preview is true,
             # the last api-version will be taken regardless of whether it is preview version or not
             if latest_include_preview:
-                return rt[0].api_versions[0]
+                return api_versions[0]
             # Take the latest stable version first.
             # if there is no stable version, the latest preview version will be taken.
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+            npv = [v for v in api_versions if 'preview' not in v.lower()]
+            return npv[0] if npv else api_versions[0]
         raise IncorrectUsageError(
             'API version is required and could not be resolved for resource {}'
             .format(resource_type))
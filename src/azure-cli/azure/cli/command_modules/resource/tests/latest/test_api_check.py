@@ -3,11 +3,14 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import time
 import unittest
 
 try:
+    from unittest import mock
     from unittest.mock import MagicMock
 except ImportError:
+    import mock
     from mock import MagicMock
 
 from knack.util import CLIError
@@ -91,6 +94,45 @@ class TestApiCheck(unittest.TestCase):
                                    resource_group_name='rg', rcf=rcf, latest_include_preview=True)
         self.assertEqual(res_utils.api_version, "2016-01-01-preview")
 
+    def test_resolve_api_provider_cache(self):
+        import os
+        import shutil
+        import tempfile
+        from azure.cli.core._session import Session
+        from azure.cli.core.mock import DummyCli
+        cli = DummyCli()
+        cache_dir = tempfile.mkdtemp()
+        cache = Session()
+        cache.load(os.path.join(cache_dir, 'providerApiVersions.json'))
+        rcf = self._get_mock_client()
+        rcf.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+
+        with mock.patch('azure.cli.command_modules.resource.custom.get_cache_session', return_value=cache):
+            for _ in range(2):
+                res_utils = _ResourceUtils(cli, resource_id='/subscriptions/00000000-0000-0000-0000-000000000000/'
+                                                            'resourceGroups/rg/providers/Mock/test/vnet1', rcf=rcf)
+                self.assertEqual(res_utils.api_version, "2016-01-01")
+            self.assertEqual(rcf.providers.get.call_count, 1)
+
+            # the provider is looked up again for a resource type not in the cache
+            with self.assertRaises(CLIError):
+                _ResourceUtils(cli, resource_type='Mock/new', resource_name='vnet1', resource_group_name='rg',
+                               rcf=rcf)
+            self.assertEqual(rcf.providers.get.call_count, 2)
+
+            # and once the cache expires
+            with mock.patch('time.time', return_value=time.time() + 2 * 24 * 60 * 60):
+                _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1', resource_group_name='rg',
+                               rcf=rcf)
+            self.assertEqual(rcf.providers.get.call_count, 3)
+
+        # the cache is shared by the following az commands
+        cache.load(cache.filename)
+        self.assertEqual(list(cache.data), ['00000000-0000-0000-0000-000000000000/mock'])
+        self.assertEqual(cache.data['00000000-0000-0000-0000-000000000000/mock']['resourceTypes']['test'],
+                         ['2016-01-01-preview', '2016-01-01'])
+        shutil.rmtree(cache_dir)
+
     def _get_mock_client(self):
         client = MagicMock()
         provider = MagicMock()
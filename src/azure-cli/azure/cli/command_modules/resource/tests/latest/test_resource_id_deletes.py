@@ -3,7 +3,15 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 import os
+import threading
+import time
 import unittest
+
+import mock
+from msrestazure.azure_exceptions import CloudError
+
+from azure.cli.core.mock import DummyCli
+from azure.cli.command_modules.resource.custom import _delete_resources, _get_deletion_dependencies
 from azure.cli.testsdk import ScenarioTest, JMESPathCheck, ResourceGroupPreparer, live_only
 
 
@@ -25,5 +33,77 @@ class ResourceDeleteTests(ScenarioTest):
         self.cmd('resource wait --ids {} --deleted --timeout 300'.format(''.join(rsrc_list)))
 
 
+class ResourceDeleteSchedulerTests(unittest.TestCase):
+    rg_id = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/rg/providers/'
+    vm_id = rg_id + 'Microsoft.Compute/virtualMachines/vm'
+    nic_id = rg_id + 'Microsoft.Network/networkInterfaces/nic'
+    disk_id = rg_id + 'Microsoft.Compute/disks/disk'
+    vnet_id = rg_id + 'Microsoft.Network/virtualNetworks/vnet'
+    subnet_id = vnet_id + '/subnets/subnet'
+    vault_id = rg_id + 'Microsoft.KeyVault/vaults/vault'
+
+    def test_get_deletion_dependencies(self):
+        ids = [self.vnet_id, self.subnet_id, self.nic_id, self.vm_id, self.disk_id, self.vault_id]
+        dependencies = _get_deletion_dependencies([{'resource_id': i} for i in ids])
+        self.assertEqual(dependencies, [{1, 2, 3, 4}, set(), {3}, set(), {3}, set()])
+
+    def test_delete_resources(self):
+        ids = [self.vnet_id, self.subnet_id, self.nic_id, self.vm_id, self.disk_id, self.vault_id]
+        deleted = []
+        running = []
+        max_running = [0]
+        lock = threading.Lock()
+        # the subnet can't be deleted until the nic is
+        attempts = {self.subnet_id: 0}
+
+        def _delete(resource_id):
+            with lock:
+                running.append(resource_id)
+                max_running[0] = max(max_running[0], len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(resource_id)
+                if resource_id == self.subnet_id and self.nic_id not in deleted:
+                    attempts[resource_id] += 1
+                    raise CloudError(mock.MagicMock(status_code=400), error='InUseSubnetCannotBeDeleted')
+                deleted.append(resource_id)
+            return resource_id
+
+        def _get_rsrc_utils(resource_id):
+            rsrc_utils = mock.MagicMock()
+            rsrc_utils.delete.return_value.result.side_effect = lambda: _delete(resource_id)
+            return rsrc_utils
+
+        cli = DummyCli()
+        # the nic is slower to delete than the subnet
+        ids.remove(self.nic_id)
+        to_be_deleted = [(_get_rsrc_utils(i), {'resource_id': i}) for i in ids + [self.nic_id]]
+        with mock.patch.object(cli.config, 'getint', return_value=4):
+            results, failed = _delete_resources(cli, to_be_deleted)
+
+        self.assertEqual(failed, [])
+        self.assertEqual(results, ids + [self.nic_id])
+        self.assertEqual(attempts[self.subnet_id], 1)
+        self.assertLess(deleted.index(self.vm_id), deleted.index(self.nic_id))
+        self.assertLess(deleted.index(self.vm_id), deleted.index(self.disk_id))
+        self.assertEqual(deleted[-1], self.vnet_id)
+        self.assertGreater(max_running[0], 1)
+        self.assertLessEqual(max_running[0], 4)
+
+    def test_delete_resources_reports_failures(self):
+        cli = DummyCli()
+        rsrc_utils = mock.MagicMock()
+        rsrc_utils.delete.side_effect = CloudError(mock.MagicMock(status_code=409), error='ScopeLocked')
+        to_be_deleted = [(rsrc_utils, {'resource_id': self.vault_id}), (mock.MagicMock(), {'resource_id': self.vm_id})]
+
+        results, failed = _delete_resources(cli, to_be_deleted)
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(failed, [to_be_deleted[0]])
+        self.assertIn('exception', failed[0][1])
+        # retried once after the other resource was deleted
+        self.assertEqual(rsrc_utils.delete.call_count, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
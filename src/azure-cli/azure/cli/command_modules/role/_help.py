@@ -605,6 +605,11 @@ helps['role assignment list'] = """
 type: command
 short-summary: List role assignments.
 long-summary: By default, only assignments scoped to subscription will be displayed. To view assignments scoped by resource or group, use `--all`.
+  The names of roles and principals are cached for an hour. Use `--no-resolve` to list the assignments without them.
+examples:
+  - name: List all assignments under the current subscription, without the names of their roles and principals.
+    text: |
+        az role assignment list --all --no-resolve
 """
 
 helps['role assignment list-changelogs'] = """
@@ -21,8 +21,8 @@ def transform_definition_list(result):
 
 
 def transform_assignment_list(result):
-    return [OrderedDict([('Principal', r['principalName']),
-                         ('Role', r['roleDefinitionName']),
+    return [OrderedDict([('Principal', r.get('principalName')),
+                         ('Role', r.get('roleDefinitionName')),
                          ('Scope', r['scope'])]) for r in result]
 
 
@@ -10,6 +10,8 @@ import datetime
 import json
 import re
 import os
+import threading
+import time
 import uuid
 import itertools
 from dateutil.relativedelta import relativedelta
@@ -21,6 +23,7 @@ from msrestazure.azure_exceptions import CloudError
 from knack.log import get_logger
 from knack.util import CLIError, todict
 
+from azure.cli.core._session import get_cache_session
 from azure.cli.core.profiles import ResourceType, get_api_version
 from azure.graphrbac.models import GraphErrorException
 
@@ -37,6 +40,8 @@ from ._multi_api_adaptor import MultiAPIAdaptor
 
 logger = get_logger(__name__)
 
+_GRAPH_MAX_CONCURRENT_REQUESTS = 5
+
 # pylint: disable=too-many-lines
 
 
@@ -163,10 +168,12 @@ def _create_role_assignment(cli_ctx, role, assignee, resource_group_name=None, s
 
 def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=None,
                           scope=None, include_inherited=False,
-                          show_all=False, include_groups=False, include_classic_administrators=False):
+                          show_all=False, include_groups=False, include_classic_administrators=False,
+                          no_resolve=False):
     '''
     :param include_groups: include extra assignments to the groups of which the user is a
     member(transitively).
+    :param no_resolve: skip filling in the names of the roles and the principals.
     '''
     graph_client = _graph_client_factory(cmd.cli_ctx)
     factory = _auth_client_factory(cmd.cli_ctx, scope)
@@ -191,14 +198,18 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     if not results:
         return []
+    if no_resolve:
+        return _remove_additional_properties(results)
 
     # 1. fill in logic names to get things understandable.
     # (it's possible that associated roles and principals were deleted, and we just do nothing.)
     # 2. fill in role names
-    role_defs = list(definitions_client.list(
-        scope=scope or ('/subscriptions/' + definitions_client.config.subscription_id)))
     worker = MultiAPIAdaptor(cmd.cli_ctx)
-    role_dics = {i.id: worker.get_role_property(i, 'role_name') for i in role_defs}
+    tenant_id = _get_tenant_id(cmd.cli_ctx, definitions_client.config.subscription_id)
+    role_definition_ids = set(worker.get_role_property(i, 'roleDefinitionId')
+                              for i in results if not i.get('roleDefinitionName'))
+    role_dics = _resolve_role_names(cmd.cli_ctx, definitions_client, tenant_id, role_definition_ids,
+                                    scope or ('/subscriptions/' + definitions_client.config.subscription_id))
     for i in results:
         if not i.get('roleDefinitionName'):
             if role_dics.get(worker.get_role_property(i, 'roleDefinitionId')):
@@ -213,8 +224,7 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
 
     if principal_ids:
         try:
-            principals = _get_object_stubs(graph_client, principal_ids)
-            principal_dics = {i.object_id: _get_displayable_name(i) for i in principals}
+            principal_dics = _resolve_principal_names(graph_client, tenant_id, principal_ids)
 
             for i in [r for r in results if not r.get('principalName')]:
                 i['principalName'] = ''
@@ -225,6 +235,10 @@ def list_role_assignments(cmd, assignee=None, role=None, resource_group_name=Non
             # failure on resolving principal due to graph permission should not fail the whole thing
             logger.info("Failed to resolve graph object information per error '%s'", ex)
 
+    return _remove_additional_properties(results)
+
+
+def _remove_additional_properties(results):
     for r in results:
         if not r.get('additionalProperties'):  # remove the useless "additionalProperties"
             r.pop('additionalProperties', None)
@@ -429,6 +443,79 @@ def _get_displayable_name(graph_object):
     return graph_object.display_name or ''
 
 
+# The names of role definitions and directory objects, cached on disk for each tenant
+_NAME_CACHE_MAX_AGE = 60 * 60
+_name_cache_lock = threading.Lock()
+
+
+def _get_tenant_id(cli_ctx, subscription_id):
+    from azure.cli.core._profile import Profile
+    try:
+        return Profile(cli_ctx=cli_ctx).get_subscription(subscription_id)['tenantId']
+    except CLIError:
+        return None
+
+
+def _get_cached_names(tenant_id, kind):
+    """Get the names of a kind of objects, 'roleDefinitions' or 'objects', cached for a tenant and not expired yet."""
+    cache = get_cache_session('roleNames.json') if tenant_id else None
+    if cache is None:
+        return {}
+    with _name_cache_lock:
+        entries = cache.get(tenant_id, {}).get(kind, {})
+    now = time.time()
+    return {key: entry['name'] for key, entry in entries.items() if entry['time'] + _NAME_CACHE_MAX_AGE > now}
+
+
+def _cache_names(tenant_id, kind, names):
+    cache = get_cache_session('roleNames.json') if tenant_id else None
+    if cache is None or not names:
+        return
+    now = time.time()
+    with _name_cache_lock:
+        tenant_entry = cache.get(tenant_id, {})
+        # expired entries are dropped, so deleted objects don't pile up
+        entries = {key: entry for key, entry in tenant_entry.get(kind, {}).items()
+                   if entry['time'] + _NAME_CACHE_MAX_AGE > now}
+        entries.update((key, {'name': name, 'time': now}) for key, name in names.items())
+        tenant_entry[kind] = entries
+        cache[tenant_id] = tenant_entry
+
+
+def _resolve_role_names(cli_ctx, definitions_client, tenant_id, role_definition_ids, scope):
+    """Get the names of role definitions. The role definitions of the scope are only listed when some of the names
+    are not cached.
+
+    :return: The names keyed by role definition id
+    """
+    def _key(role_definition_id):
+        # the id of a role definition differs by the scope it is read from, its name (a GUID) doesn't
+        return role_definition_id.split('/')[-1].lower()
+
+    names = _get_cached_names(tenant_id, 'roleDefinitions')
+    if any(_key(i) not in names for i in role_definition_ids):
+        worker = MultiAPIAdaptor(cli_ctx)
+        role_defs = {_key(i.id): worker.get_role_property(i, 'role_name')
+                     for i in definitions_client.list(scope=scope)}
+        _cache_names(tenant_id, 'roleDefinitions', role_defs)
+        names.update(role_defs)
+    return {i: names[_key(i)] for i in role_definition_ids if _key(i) in names}
+
+
+def _resolve_principal_names(graph_client, tenant_id, principal_ids):
+    """Get the displayable names of directory objects. Only those not cached are looked up in the graph.
+
+    :return: The names keyed by object id
+    """
+    names = _get_cached_names(tenant_id, 'objects')
+    missing = [i for i in principal_ids if i not in names]
+    if missing:
+        principals = {i.object_id: _get_displayable_name(i) for i in _get_object_stubs(graph_client, missing)}
+        _cache_names(tenant_id, 'objects', principals)
+        names.update(principals)
+    return names
+
+
 def delete_role_assignments(cmd, ids=None, assignee=None, role=None, resource_group_name=None,
                             scope=None, include_inherited=False, yes=None):
     factory = _auth_client_factory(cmd.cli_ctx, scope)
@@ -1318,8 +1405,6 @@ def create_service_principal_for_rbac(
         # pylint:disable=too-many-statements,too-many-locals, too-many-branches
         cmd, name=None, years=None, create_cert=False, cert=None, scopes=None, role='Contributor',
         show_auth_for_sdk=None, skip_assignment=False, keyvault=None):
-    import time
-
     graph_client = _graph_client_factory(cmd.cli_ctx)
     role_client = _auth_client_factory(cmd.cli_ctx).role_assignments
     scopes = scopes or ['/subscriptions/' + role_client.config.subscription_id]
@@ -1516,8 +1601,6 @@ def _create_self_signed_cert(start_date, end_date):  # pylint: disable=too-many-
 
 
 def _create_self_signed_cert_with_keyvault(cli_ctx, years, keyvault, keyvault_cert_name):  # pylint: disable=too-many-locals
-    import time
-
     kv_client = _get_keyvault_client(cli_ctx)
     cert_policy = {
         'issuer_parameters': {
@@ -1726,12 +1809,19 @@ def _resolve_object_id(cli_ctx, assignee, fallback_to_object_id=False):
 
 def _get_object_stubs(graph_client, assignees):
     from azure.graphrbac.models import GetObjectsParameters
-    result = []
     assignees = list(assignees)  # callers could pass in a set
-    for i in range(0, len(assignees), 1000):
-        params = GetObjectsParameters(include_directory_object_references=True, object_ids=assignees[i:i + 1000])
-        result += list(graph_client.objects.get_objects_by_object_ids(params))
-    return result
+    # graph takes up to 1000 object ids per call, so split into chunks here and get them concurrently
+    chunks = [assignees[i:i + 1000] for i in range(0, len(assignees), 1000)]
+
+    def _get_objects(object_ids):
+        params = GetObjectsParameters(include_directory_object_references=True, object_ids=object_ids)
+        return list(graph_client.objects.get_objects_by_object_ids(params))
+
+    if len(chunks) <= 1:
+        return _get_objects(chunks[0]) if chunks else []
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(chunks), _GRAPH_MAX_CONCURRENT_REQUESTS)) as executor:
+        return list(itertools.chain.from_iterable(executor.map(_get_objects, chunks)))
 
 
 def _get_owner_url(cli_ctx, owner_object_id):
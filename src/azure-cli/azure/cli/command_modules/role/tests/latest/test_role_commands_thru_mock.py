@@ -25,7 +25,8 @@ from azure.cli.command_modules.role.custom import (create_role_definition,
                                                    _get_object_stubs,
                                                    list_service_principal_owners,
                                                    list_application_owners,
-                                                   delete_role_assignments)
+                                                   delete_role_assignments,
+                                                   list_role_assignments)
 
 from knack.util import CLIError
 
@@ -397,16 +398,65 @@ class TestRoleMocked(unittest.TestCase):
         _get_object_stubs(graph_client, assignees)
 
         # assert
-        # we get called with right args
+        # we get called with right args, the chunks are got concurrently
         self.assertEqual(graph_client.objects.get_objects_by_object_ids.call_count, 3)
         object_groups = []
         for i in range(0, 2001, 1000):
             object_groups.append([i for i in range(i, min(i + 1000, 2001))])
 
-        for call, group in zip(graph_client.objects.get_objects_by_object_ids.call_args_list, object_groups):
+        calls = sorted(graph_client.objects.get_objects_by_object_ids.call_args_list, key=lambda c: c[0][0].object_ids[0])
+        for call, group in zip(calls, object_groups):
             args, _ = call
             self.assertEqual(args[0].object_ids, group)
 
+    @mock.patch('azure.cli.command_modules.role.custom._get_tenant_id', autospec=True)
+    @mock.patch('azure.cli.command_modules.role.custom.get_cache_session', autospec=True)
+    @mock.patch('azure.cli.command_modules.role.custom._graph_client_factory', autospec=True)
+    @mock.patch('azure.cli.command_modules.role.custom._auth_client_factory', autospec=True)
+    def test_role_assignment_list_caches_names(self, client_mock, graph_client_mock, name_cache_mock, tenant_id_mock):
+        role_id = '/subscriptions/sub123/providers/Microsoft.Authorization/roleDefinitions/role1'
+        assignment = mock.MagicMock(id='a1', principal_id='p1', role_definition_id=role_id,
+                                    scope='/subscriptions/sub123', additional_properties={})
+        faked_auth_client = client_mock.return_value
+        faked_auth_client.role_assignments.list_for_scope.return_value = [assignment]
+        faked_auth_client.role_definitions.config.subscription_id = 'sub123'
+        role_def = mock.MagicMock(id=role_id.replace('/subscriptions/sub123', ''), role_name='Reader')
+        faked_auth_client.role_definitions.list.return_value = [role_def]
+        graph_client = graph_client_mock.return_value
+        graph_client.objects.get_objects_by_object_ids.return_value = [
+            mock.MagicMock(object_id='p1', user_principal_name='john@contoso.com')]
+        name_cache_mock.return_value = {}
+        tenant_id_mock.return_value = 'tenant1'
+        cmd = mock.MagicMock()
+        cmd.cli_ctx = DummyCli()
+
+        def _list():
+            with mock.patch('azure.cli.command_modules.role.custom.todict', side_effect=lambda x: [
+                    {'principalId': a.principal_id, 'roleDefinitionId': a.role_definition_id, 'scope': a.scope}
+                    for a in x]):
+                return list_role_assignments(cmd)
+
+        # action
+        for _ in range(2):
+            result = _list()
+            # assert
+            self.assertEqual(result[0]['roleDefinitionName'], 'Reader')
+            self.assertEqual(result[0]['principalName'], 'john@contoso.com')
+        # the second listing reads the names from the cache
+        faked_auth_client.role_definitions.list.assert_called_once()
+        graph_client.objects.get_objects_by_object_ids.assert_called_once()
+
+        # names of another tenant are not shared
+        tenant_id_mock.return_value = 'tenant2'
+        _list()
+        self.assertEqual(faked_auth_client.role_definitions.list.call_count, 2)
+
+        # names are not resolved
+        with mock.patch('azure.cli.command_modules.role.custom.todict', side_effect=lambda x: [{'principalId': 'p1'}]):
+            result = list_role_assignments(cmd, no_resolve=True)
+        self.assertEqual(result, [{'principalId': 'p1'}])
+        self.assertEqual(faked_auth_client.role_definitions.list.call_count, 2)
+
 
 class FakedError(object):  # pylint: disable=too-few-public-methods
     def __init__(self, message):
@@ -979,6 +979,9 @@ examples:
   - name: Upload all files with the format 'cli-201x-xx-xx.txt' except cli-2018-xx-xx.txt' and 'cli-2019-xx-xx.txt' in a container.
     text: |
         az storage blob upload-batch -d mycontainer -s <path-to-directory> --pattern cli-201[!89]-??-??.txt
+  - name: Upload only the files which changed since the last upload, keeping the MD5 of the local files in a manifest.
+    text: |
+        az storage blob upload-batch -d mycontainer -s <path-to-directory> --sync --sync-manifest ~/mycontainer.manifest.json
 """
 
 helps['storage blob url'] = """
@@ -72,6 +72,9 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
                                     action='store_true', validator=add_progress_callback)
     socket_timeout_type = CLIArgumentType(help='The socket timeout(secs), used by the service to regulate data flow.',
                                           type=int)
+    max_parallel_files_type = CLIArgumentType(help='Maximum number of files transferred at the same time. Files '
+                                                   'that fail to transfer are retried once after the others.',
+                                              type=int)
     large_file_share_type = CLIArgumentType(
         action='store_true', min_api='2019-04-01',
         help='Enable the capability to support large file shares with more than 5 TiB capacity for storage account.'
@@ -687,6 +690,13 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.argument('maxsize_condition', arg_group='Content Control')
         c.argument('validate_content', action='store_true', min_api='2016-05-31', arg_group='Content Control')
         c.argument('blob_type', options_list=('--type', '-t'), arg_type=get_enum_type(get_blob_types()))
+        c.argument('max_parallel_files', max_parallel_files_type)
+        c.argument('sync', action='store_true',
+                   help='Only upload the files which are missing from the destination or differ from the blobs by '
+                        'size, MD5 or, for blobs without MD5, modification time.')
+        c.argument('sync_manifest', type=file_type, completer=FilesCompleter(),
+                   help='With --sync, a file to keep the MD5 of the local files in between runs, so that only the '
+                        'files changed since are hashed again.')
         c.extra('no_progress', progress_type)
         c.extra('socket_timeout', socket_timeout_type)
 
@@ -707,6 +717,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-locals, too-many-statem
         c.extra('socket_timeout', socket_timeout_type)
         c.argument('max_connections', type=int,
                    help='Maximum number of parallel connections to use when the blob size exceeds 64MB.')
+        c.argument('max_parallel_files', max_parallel_files_type)
 
     with self.argument_context('storage blob delete') as c:
         from .sdkutil import get_delete_blob_snapshot_type_names
@@ -17,7 +17,7 @@ from azure.cli.command_modules.storage.util import (create_blob_service_from_sto
                                                     create_short_lived_container_sas,
                                                     filter_none, collect_blobs, collect_blob_objects, collect_files,
                                                     mkdir_p, guess_content_type, normalize_blob_file_path,
-                                                    check_precondition_success)
+                                                    check_precondition_success, run_batch_transfers)
 from knack.log import get_logger
 from knack.util import CLIError
 
@@ -216,9 +216,10 @@ def storage_blob_copy_batch(cmd, client, source_client, container_name=None,
 
 # pylint: disable=unused-argument
 def storage_blob_download_batch(client, source, destination, source_container_name, pattern=None, dryrun=False,
-                                progress_callback=None, max_connections=2):
+                                progress_callback=None, max_connections=2, max_parallel_files=1):
 
-    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name):
+    def _download_blob(blob_service, container, destination_folder, normalized_blob_name, blob_name,
+                       file_progress_callback):
         # TODO: try catch IO exception
         destination_path = os.path.join(destination_folder, normalized_blob_name)
         destination_folder = os.path.dirname(destination_path)
@@ -226,7 +227,7 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             mkdir_p(destination_folder)
 
         blob = blob_service.get_blob_to_path(container, blob_name, destination_path, max_connections=max_connections,
-                                             progress_callback=progress_callback)
+                                             progress_callback=file_progress_callback)
         return blob.name
 
     source_blobs = collect_blobs(client, source_container_name, pattern)
@@ -250,24 +251,13 @@ def storage_blob_download_batch(client, source, destination, source_container_na
             logger.warning('  - %s', b)
         return []
 
-    # Tell progress reporter to reuse the same hook
-    if progress_callback:
-        progress_callback.reuse = True
+    def _download(blob_normed, file_progress_callback):
+        return _download_blob(client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed],
+                              file_progress_callback)
 
-    results = []
-    for index, blob_normed in enumerate(blobs_to_download):
-        # add blob name and number to progress message
-        if progress_callback:
-            progress_callback.message = '{}/{}: "{}"'.format(
-                index + 1, len(blobs_to_download), blobs_to_download[blob_normed])
-        results.append(_download_blob(
-            client, source_container_name, destination, blob_normed, blobs_to_download[blob_normed]))
-
-    # end progress hook
-    if progress_callback:
-        progress_callback.hook.end()
-
-    return results
+    blobs_normed = list(blobs_to_download)
+    return run_batch_transfers(_download, blobs_normed, [blobs_to_download[b] for b in blobs_normed],
+                               max_parallel_files=max_parallel_files, progress_callback=progress_callback)
 
 
 def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  # pylint: disable=too-many-locals
@@ -276,7 +266,8 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
                               content_settings=None, metadata=None, validate_content=False,
                               maxsize_condition=None, max_connections=2, lease_id=None, progress_callback=None,
                               if_modified_since=None, if_unmodified_since=None, if_match=None,
-                              if_none_match=None, timeout=None, dryrun=False):
+                              if_none_match=None, timeout=None, dryrun=False, max_parallel_files=1, sync=False,
+                              sync_manifest=None):
     def _create_return_result(blob_name, blob_content_settings, upload_result=None):
         blob_name = normalize_blob_file_path(destination_path, blob_name)
         return {
@@ -288,6 +279,16 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
     source_files = source_files or []
     t_content_settings = cmd.get_models('blob.models#ContentSettings')
 
+    local_md5 = {}
+    if sync:
+        manifest = _load_sync_manifest(sync_manifest)
+        total = len(source_files)
+        source_files = _get_files_to_sync(client, destination_container_name, destination_path, source_files,
+                                          manifest, local_md5)
+        logger.info('%d of %d files are up to date', total - len(source_files), total)
+        if sync_manifest and not dryrun:
+            _save_sync_manifest(sync_manifest, manifest)
+
     results = []
     if dryrun:
         logger.info('upload action: from %s to %s', source, destination)
@@ -303,40 +304,100 @@ def storage_blob_upload_batch(cmd, client, source, destination, pattern=None,  #
         def _upload_blob(*args, **kwargs):
             return upload_blob(*args, **kwargs)
 
-        # Tell progress reporter to reuse the same hook
-        if progress_callback:
-            progress_callback.reuse = True
-
-        for index, source_file in enumerate(source_files):
+        def _upload(source_file, file_progress_callback):
             src, dst = source_file
-            # logger.warning('uploading %s', src)
             guessed_content_settings = guess_content_type(src, content_settings, t_content_settings)
-
-            # add blob name and number to progress message
-            if progress_callback:
-                progress_callback.message = '{}/{}: "{}"'.format(
-                    index + 1, len(source_files), normalize_blob_file_path(destination_path, dst))
-
+            if src in local_md5 and not guessed_content_settings.content_md5:
+                # keep the hash of files uploaded in blocks too, for the next sync to compare with
+                guessed_content_settings = t_content_settings(
+                    content_type=guessed_content_settings.content_type,
+                    content_encoding=guessed_content_settings.content_encoding,
+                    content_disposition=guessed_content_settings.content_disposition,
+                    content_language=guessed_content_settings.content_language,
+                    content_md5=local_md5[src],
+                    cache_control=guessed_content_settings.cache_control)
             include, result = _upload_blob(cmd, client, file_path=src, container_name=destination_container_name,
                                            blob_name=normalize_blob_file_path(destination_path, dst),
                                            blob_type=blob_type, content_settings=guessed_content_settings,
                                            metadata=metadata, validate_content=validate_content,
                                            maxsize_condition=maxsize_condition, max_connections=max_connections,
-                                           lease_id=lease_id, progress_callback=progress_callback,
+                                           lease_id=lease_id, progress_callback=file_progress_callback,
                                            if_modified_since=if_modified_since,
                                            if_unmodified_since=if_unmodified_since, if_match=if_match,
                                            if_none_match=if_none_match, timeout=timeout)
-            if include:
-                results.append(_create_return_result(dst, guessed_content_settings, result))
-        # end progress hook
-        if progress_callback:
-            progress_callback.hook.end()
+            return _create_return_result(dst, guessed_content_settings, result) if include else None
+
+        results = run_batch_transfers(_upload, source_files,
+                                      [normalize_blob_file_path(destination_path, dst) for _, dst in source_files],
+                                      max_parallel_files=max_parallel_files, progress_callback=progress_callback)
+        results = [r for r in results if r is not None]
         num_failures = len(source_files) - len(results)
         if num_failures:
             logger.warning('%s of %s files not uploaded due to "Failed Precondition"', num_failures, len(source_files))
     return results
 
 
+def _get_files_to_sync(client, container_name, destination_path, source_files, manifest, local_md5):
+    """
+    Compare the local files with the blobs of the destination, listed at once, and return those that changed.
+    Files are compared by size, then by MD5 when the blob has one, or by modification time otherwise.
+    """
+    remote_pattern = normalize_blob_file_path(destination_path, '*') if destination_path else None
+    blobs = {name: blob for name, blob in collect_blob_objects(client, container_name, remote_pattern)}
+
+    changed_files = []
+    for src, dst in source_files:
+        blob = blobs.get(normalize_blob_file_path(destination_path, dst))
+        stat = os.stat(src)
+        if blob is None or blob.properties.content_length != stat.st_size:
+            changed = True
+        elif blob.properties.content_settings.content_md5:
+            local_md5[src] = _get_local_md5(src, stat, manifest)
+            changed = local_md5[src] != blob.properties.content_settings.content_md5
+        else:
+            changed = stat.st_mtime > blob.properties.last_modified.timestamp()
+        if changed:
+            if src not in local_md5:
+                local_md5[src] = _get_local_md5(src, stat, manifest)
+            changed_files.append((src, dst))
+    return changed_files
+
+
+def _get_local_md5(file_path, stat, manifest):
+    """Get the base64 encoded MD5 of the file, from the manifest when the file hasn't changed since it was hashed."""
+    entry = manifest.get(file_path)
+    if entry and entry.get('size') == stat.st_size and entry.get('mtime') == stat.st_mtime:
+        return entry['md5']
+
+    import base64
+    import hashlib
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(4 * 1024 * 1024), b''):
+            md5.update(chunk)
+    content_md5 = base64.b64encode(md5.digest()).decode('utf-8')
+    manifest[file_path] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'md5': content_md5}
+    return content_md5
+
+
+def _load_sync_manifest(manifest_path):
+    import json
+    if not manifest_path or not os.path.isfile(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+    except ValueError:
+        logger.warning("Ignoring the sync manifest '%s' as it is not valid JSON.", manifest_path)
+        return {}
+
+
+def _save_sync_manifest(manifest_path, manifest):
+    import json
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f)
+
+
 def transform_blob_type(cmd, blob_type):
     """
     get_blob_types() will get ['block', 'page', 'append']
@@ -29,6 +29,12 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd(cmd, storage_account_info)
         self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
 
+        # download several files at the same time
+        local_folder = self.create_temp_dir()
+        self.storage_cmd('storage blob download-batch -s {} -d "{}" --max-parallel-files 8', storage_account_info,
+                         src_container, local_folder)
+        self.assertEqual(41, sum(len(f) for r, d, f in os.walk(local_folder)))
+
         # download recursively with wild card *, and use URL as source
         local_folder = self.create_temp_dir()
         src_url = self.storage_cmd('storage blob url -c {} -n readme -otsv', storage_account_info, src_container).output
@@ -82,6 +88,13 @@ class StorageBatchOperationScenarios(StorageScenarioMixin, LiveScenarioTest):
         self.storage_cmd('storage blob list -c {}', storage_account_info, container).assert_with_checks(
             JMESPathCheck('length(@)', 41))
 
+        # upload several files at the same time
+        container = self.create_container(storage_account_info)
+        self.storage_cmd('storage blob upload-batch -s "{}" -d {} --max-parallel-files 8', storage_account_info,
+                         test_dir, container)
+        self.storage_cmd('storage blob list -c {}', storage_account_info, container).assert_with_checks(
+            JMESPathCheck('length(@)', 41))
+
         # upload files with pattern apple/*
         container = self.create_container(storage_account_info)
         src_url = self.storage_cmd('storage blob url -c {} -n \'\' -otsv', storage_account_info,
@@ -0,0 +1,225 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+
+import mock
+from knack.util import CLIError
+
+from azure.cli.command_modules.storage.util import run_batch_transfers, collect_blobs, glob_files_remotely
+from azure.cli.command_modules.storage.operations.blob import (_get_files_to_sync, _load_sync_manifest,
+                                                               _save_sync_manifest)
+
+
+Blob = namedtuple('Blob', ['name'])
+
+
+class TestRunBatchTransfers(unittest.TestCase):
+
+    def _progress_callback(self):
+        progress_callback = mock.MagicMock()
+        progress_callback.hook = mock.MagicMock()
+        return progress_callback
+
+    def test_run_batch_transfers_serially(self):
+        progress_callback = self._progress_callback()
+        messages = []
+
+        def _transfer(item, file_progress_callback):
+            self.assertIs(file_progress_callback, progress_callback)
+            messages.append(progress_callback.message)
+            return item * 2
+
+        results = run_batch_transfers(_transfer, [1, 2, 3], ['a', 'b', 'c'], progress_callback=progress_callback)
+        self.assertEqual(results, [2, 4, 6])
+        self.assertEqual(messages, ['1/3: "a"', '2/3: "b"', '3/3: "c"'])
+        self.assertTrue(progress_callback.reuse)
+        progress_callback.hook.end.assert_called_once_with()
+
+    def test_run_batch_transfers_in_parallel(self):
+        progress_callback = self._progress_callback()
+
+        def _transfer(item, file_progress_callback):
+            # later items finish first
+            time.sleep(0.01 * (5 - item))
+            file_progress_callback(10, 10)
+            return item
+
+        results = run_batch_transfers(_transfer, list(range(5)), list('abcde'), max_parallel_files=5,
+                                      progress_callback=progress_callback)
+        self.assertEqual(results, [0, 1, 2, 3, 4])
+        # the progress of the files is reported together
+        progress_callback.assert_called_with(50, 50)
+        self.assertEqual(progress_callback.message, '5/5 files')
+        progress_callback.hook.end.assert_called_once_with()
+
+    def test_run_batch_transfers_retries_transient_failures(self):
+        from azure.common import AzureException, AzureHttpError
+        attempts = {}
+
+        def _transfer(item, _):
+            attempts[item] = attempts.get(item, 0) + 1
+            if item == 'flaky' and attempts[item] == 1:
+                try:
+                    raise ConnectionResetError('connection reset')
+                except ConnectionResetError as ex:
+                    # the storage SDK wraps the errors of the connection
+                    raise AzureException(str(ex))
+            if item == 'throttled' and attempts[item] == 1:
+                raise AzureHttpError('server busy', 503)
+            if item.startswith('down'):
+                raise AzureHttpError('{} is down'.format(item), 500)
+            return item
+
+        self.assertEqual(run_batch_transfers(_transfer, ['ok', 'flaky', 'throttled'], ['ok', 'flaky', 'throttled'],
+                                             max_parallel_files=3), ['ok', 'flaky', 'throttled'])
+        self.assertEqual(attempts, {'ok': 1, 'flaky': 2, 'throttled': 2})
+
+        with self.assertRaisesRegexp(AzureHttpError, 'down1 is down'):
+            run_batch_transfers(_transfer, ['ok', 'down1'], ['ok', 'down1'])
+        self.assertEqual(attempts['down1'], 2)
+
+        with self.assertRaisesRegexp(CLIError, '2 of 3 files failed to transfer.'):
+            run_batch_transfers(_transfer, ['ok', 'down2', 'down3'], ['ok', 'down2', 'down3'], max_parallel_files=3)
+        self.assertEqual(attempts['down3'], 2)
+
+    def test_run_batch_transfers_fails_fast(self):
+        progress_callback = self._progress_callback()
+        attempts = []
+
+        def _transfer(item, _):
+            attempts.append(item)
+            if item == 'missing':
+                raise IOError('{} is missing'.format(item))
+            return item
+
+        with self.assertRaisesRegexp(IOError, 'missing is missing'):
+            run_batch_transfers(_transfer, ['ok', 'missing', 'later'], ['ok', 'missing', 'later'],
+                                progress_callback=progress_callback)
+        # neither retried nor followed by the other transfers
+        self.assertEqual(attempts, ['ok', 'missing'])
+        progress_callback.hook.end.assert_called_once_with()
+
+
+class TestCollectBlobs(unittest.TestCase):
+
+    def test_collect_blobs_lists_pattern_prefix(self):
+        blob_service = mock.MagicMock()
+        names = ['logs/2020/a.gz', 'logs/2020/b.txt', 'logs/2020/sub/c.gz']
+        blob_service.list_blobs.side_effect = lambda container, prefix=None: [
+            Blob(n) for n in names if n.startswith(prefix or '')]
+
+        self.assertEqual(collect_blobs(blob_service, 'container', 'logs/2020/*.gz'),
+                         ['logs/2020/a.gz', 'logs/2020/sub/c.gz'])
+        blob_service.list_blobs.assert_called_with('container', prefix='logs/2020/')
+
+        self.assertEqual(collect_blobs(blob_service, 'container', 'logs/202[01]/b*'), ['logs/2020/b.txt'])
+        blob_service.list_blobs.assert_called_with('container', prefix='logs/202')
+
+        self.assertEqual(len(collect_blobs(blob_service, 'container', '*')), 3)
+        blob_service.list_blobs.assert_called_with('container', prefix=None)
+
+        self.assertEqual(len(collect_blobs(blob_service, 'container')), 3)
+        blob_service.list_blobs.assert_called_with('container', prefix=None)
+
+
+class TestGlobFilesRemotely(unittest.TestCase):
+
+    def test_glob_files_remotely(self):
+        Directory = namedtuple('Directory', ['name'])
+        File = namedtuple('File', ['name'])
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = (Directory, File)
+        tree = {
+            '': [File('a.txt'), Directory('d1'), Directory('d2')],
+            'd1': [File('b.txt'), File('c.log'), Directory('sub')],
+            os.path.join('d1', 'sub'): [File('d.txt')],
+            'd2': [],
+        }
+
+        def _list(share_name, directory):
+            self.assertEqual(share_name, 'share')
+            time.sleep(0.01)
+            return iter(tree[directory])
+
+        client = mock.MagicMock()
+        client.list_directories_and_files.side_effect = _list
+
+        self.assertEqual(sorted(glob_files_remotely(cmd, client, 'share', None)),
+                         [('', 'a.txt'), ('d1', 'b.txt'), ('d1', 'c.log'), (os.path.join('d1', 'sub'), 'd.txt')])
+        self.assertEqual(client.list_directories_and_files.call_count, 4)
+        self.assertEqual(sorted(glob_files_remotely(cmd, client, 'share', '*.txt', max_workers=2)),
+                         [('', 'a.txt'), ('d1', 'b.txt'), (os.path.join('d1', 'sub'), 'd.txt')])
+
+        # files are yielded before the whole share is walked
+        client.list_directories_and_files.reset_mock()
+        self.assertEqual(next(glob_files_remotely(cmd, client, 'share', None)), ('', 'a.txt'))
+        self.assertLess(client.list_directories_and_files.call_count, 4)
+
+    def test_glob_files_remotely_raises_listing_errors(self):
+        cmd = mock.MagicMock()
+        cmd.get_models.return_value = (type('Directory', (), {}), type('File', (), {}))
+        client = mock.MagicMock()
+        client.list_directories_and_files.side_effect = ValueError('share not found')
+        with self.assertRaisesRegex(ValueError, 'share not found'):
+            list(glob_files_remotely(cmd, client, 'share', None))
+
+
+class TestSyncUploadBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.source = tempfile.mkdtemp()
+        self.files = []
+        for name, content in [('same', b'same'), ('same_md5', b'md5'), ('resized', b'resized'),
+                              ('modified', b'modified'), ('new', b'new')]:
+            path = os.path.join(self.source, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            self.files.append((path, name))
+
+    def tearDown(self):
+        shutil.rmtree(self.source)
+
+    @staticmethod
+    def _blob(size, md5=None, last_modified=None):
+        blob = mock.MagicMock()
+        blob.properties.content_length = size
+        blob.properties.content_settings.content_md5 = md5
+        blob.properties.last_modified = last_modified or datetime.now(timezone.utc) + timedelta(hours=1)
+        return blob
+
+    def test_get_files_to_sync(self):
+        blobs = [('dir/same', self._blob(4)),
+                 ('dir/same_md5', self._blob(3, md5='G8KbNvYjuoKq9nJP07FnGA==')),
+                 ('dir/resized', self._blob(3)),
+                 ('dir/modified', self._blob(8, last_modified=datetime(2000, 1, 1, tzinfo=timezone.utc)))]
+        manifest, local_md5 = {}, {}
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.collect_blob_objects',
+                        return_value=blobs) as collect_blob_objects:
+            changed = _get_files_to_sync(mock.MagicMock(), 'container', 'dir', self.files, manifest, local_md5)
+        self.assertEqual(collect_blob_objects.call_args[0][1:], ('container', 'dir/*'))
+        self.assertEqual([dst for _, dst in changed], ['resized', 'modified', 'new'])
+        # the files uploaded keep their MD5
+        self.assertEqual(sorted(os.path.basename(p) for p in local_md5), ['modified', 'new', 'resized', 'same_md5'])
+        self.assertEqual(local_md5[os.path.join(self.source, 'same_md5')], 'G8KbNvYjuoKq9nJP07FnGA==')
+
+        # unchanged files are not hashed again
+        manifest_path = os.path.join(self.source, 'manifest.json')
+        _save_sync_manifest(manifest_path, manifest)
+        manifest = _load_sync_manifest(manifest_path)
+        with mock.patch('azure.cli.command_modules.storage.operations.blob.collect_blob_objects',
+                        return_value=blobs), mock.patch('hashlib.md5') as md5:
+            _get_files_to_sync(mock.MagicMock(), 'container', 'dir', self.files, manifest, {})
+        md5.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
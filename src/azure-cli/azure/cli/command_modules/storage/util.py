@@ -29,7 +29,8 @@ def collect_blob_objects(blob_service, container, pattern=None):
         if blob_service.exists(container, pattern):
             yield pattern, blob_service.get_blob_properties(container, pattern)
     else:
-        for blob in blob_service.list_blobs(container):
+        # Only the blobs starting with the literal part of the pattern can match, so let the service filter them
+        for blob in blob_service.list_blobs(container, prefix=_get_pattern_prefix(pattern)):
             try:
                 blob_name = blob.name.encode('utf-8') if isinstance(blob.name, unicode) else blob.name
             except NameError:
@@ -87,20 +88,39 @@ def glob_files_locally(folder_path, pattern):
                 yield (full_path, full_path[len_folder_path:])
 
 
-def glob_files_remotely(cmd, client, share_name, pattern):
-    """glob the files in remote file share based on the given pattern"""
-    from collections import deque
+def glob_files_remotely(cmd, client, share_name, pattern, max_workers=8):
+    """glob the files in remote file share based on the given pattern
+
+    Up to max_workers directories are listed at the same time. The files of a directory are yielded as soon as it
+    is listed, so they can be processed while the rest of the share is still being walked.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
     t_dir, t_file = cmd.get_models('file.models#Directory', 'file.models#File')
 
-    queue = deque([""])
-    while queue:
-        current_dir = queue.pop()
-        for f in client.list_directories_and_files(share_name, current_dir):
-            if isinstance(f, t_file):
-                if not pattern or _match_path(os.path.join(current_dir, f.name), pattern):
-                    yield current_dir, f.name
-            elif isinstance(f, t_dir):
-                queue.appendleft(os.path.join(current_dir, f.name))
+    def _list_directory(directory):
+        return directory, list(client.list_directories_and_files(share_name, directory))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {executor.submit(_list_directory, "")}
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                current_dir, items = future.result()
+                files = []
+                for f in items:
+                    if isinstance(f, t_file):
+                        files.append(f.name)
+                    elif isinstance(f, t_dir):
+                        pending.add(executor.submit(_list_directory, os.path.join(current_dir, f.name)))
+                for name in files:
+                    if not pattern or _match_path(os.path.join(current_dir, name), pattern):
+                        yield current_dir, name
+    finally:
+        # the caller may stop early, or a listing may fail; don't wait for the rest of the walk
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
 
 
 def create_short_lived_blob_sas(cmd, account_name, account_key, container, blob):
@@ -173,6 +193,14 @@ def _pattern_has_wildcards(p):
     return not p or p.find('*') != -1 or p.find('?') != -1 or p.find('[') != -1
 
 
+def _get_pattern_prefix(pattern):
+    """Get the part of the pattern before the first wildcard, or None when it starts with one."""
+    if not pattern:
+        return None
+    import re
+    return re.match(r'[^*?[]*', pattern).group(0) or None
+
+
 def _match_path(path, pattern):
     from fnmatch import fnmatch
     return fnmatch(path, pattern)
@@ -232,3 +260,120 @@ def check_precondition_success(func):
                 raise
             return False, None
     return wrapper
+
+
+def run_batch_transfers(transfer, items, item_names, max_parallel_files=1, progress_callback=None):
+    """
+    Transfer each of the items with `transfer(item, progress_callback)`, with up to `max_parallel_files` at the same
+    time. Transfers failed for a transient reason, like a lost connection or throttling, are retried once after the
+    others have finished. Any other failure stops the batch.
+    :return: the results of the transfers, in the order of the items
+    """
+    from knack.log import get_logger
+    from knack.util import CLIError
+
+    logger = get_logger(__name__)
+    total = len(items)
+    batch_progress = None
+    if progress_callback:
+        # Tell progress reporter to reuse the same hook
+        progress_callback.reuse = True
+        if max_parallel_files > 1:
+            batch_progress = _BatchProgress(progress_callback, total)
+
+    def _transfer(index):
+        if batch_progress:
+            return transfer(items[index], batch_progress.get_callback(index))
+        if progress_callback:
+            # add file name and number to progress message
+            progress_callback.message = '{}/{}: "{}"'.format(index + 1, total, item_names[index])
+        return transfer(items[index], progress_callback)
+
+    results = [None] * total
+
+    def _run(indexes, retry=False):
+        # Any failure of a retry is reported with the others, rather than stopping the batch
+        failures = {}
+        if max_parallel_files > 1 and len(indexes) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max_parallel_files) as executor:
+                futures = [(index, executor.submit(_transfer, index)) for index in indexes]
+                for index, future in futures:
+                    try:
+                        results[index] = future.result()
+                    except Exception as ex:  # pylint: disable=broad-except
+                        if not retry and not _is_transient_failure(ex):
+                            for _, pending in futures:
+                                pending.cancel()
+                            raise
+                        failures[index] = ex
+        else:
+            for index in indexes:
+                try:
+                    results[index] = _transfer(index)
+                except Exception as ex:  # pylint: disable=broad-except
+                    if not retry and not _is_transient_failure(ex):
+                        raise
+                    failures[index] = ex
+        return failures
+
+    try:
+        failures = _run(list(range(total)))
+    except Exception:
+        if progress_callback:
+            progress_callback.hook.end()
+        raise
+    if failures:
+        logger.warning('%d of %d files failed to transfer. Retrying them.', len(failures), total)
+        failures = _run(sorted(failures), retry=True)
+
+    # end progress hook
+    if progress_callback:
+        progress_callback.hook.end()
+
+    if len(failures) == 1:
+        raise next(iter(failures.values()))
+    if failures:
+        for index in sorted(failures):
+            logger.warning('%s: %s', item_names[index], failures[index])
+        raise CLIError('{} of {} files failed to transfer.'.format(len(failures), total))
+    return results
+
+
+def _is_transient_failure(ex):
+    """Whether a transfer failed for a reason which may be gone if retried: a connection error, a time-out, throttling
+    or a server error. The storage SDK wraps the errors of the connection in an AzureException, so its cause is
+    checked as well."""
+    import socket
+    from azure.common import AzureHttpError
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout
+    while ex is not None:
+        if isinstance(ex, AzureHttpError):
+            return ex.status_code in (408, 429) or (ex.status_code >= 500 and ex.status_code not in (501, 505))
+        if isinstance(ex, (ConnectionError, TimeoutError, socket.timeout, RequestsConnectionError, Timeout)):
+            return True
+        ex = ex.__cause__ or ex.__context__
+    return False
+
+
+class _BatchProgress(object):  # pylint: disable=too-few-public-methods
+    """Report the progress of the files transferred at the same time as one."""
+
+    def __init__(self, progress_callback, total_files):
+        import threading
+        self._progress_callback = progress_callback
+        self._total_files = total_files
+        self._progress = {}
+        self._done = set()
+        self._lock = threading.Lock()
+
+    def get_callback(self, index):
+        def _update_progress(current, total):
+            with self._lock:
+                self._progress[index] = (current, total)
+                if total and current == total:
+                    self._done.add(index)
+                self._progress_callback.message = '{}/{} files'.format(len(self._done), self._total_files)
+                self._progress_callback(sum(c or 0 for c, _ in self._progress.values()),
+                                        sum(t or 0 for _, t in self._progress.values()))
+        return _update_progress
@@ -34,6 +34,9 @@ examples:
   - name: List the top three resources (Bash)
     text: >
         az rest --method get --url https://management.azure.com/subscriptions/{subscriptionId}/resources?api-version=2019-07-01 --url-parameters \\$top=3
+  - name: List all the resources of the subscription, following the nextLink of each page
+    text: >
+        az rest --method get --url /subscriptions/{subscriptionId}/resources?api-version=2019-07-01 --paginate
 """
 
 helps['version'] = """
@@ -45,3 +48,20 @@ helps['upgrade'] = """
 type: command
 short-summary: Upgrade Azure CLI and extensions
 """
+
+helps['batch-run'] = """
+type: command
+short-summary: Run many commands from a file in a single process.
+long-summary: >
+    Each non-empty line is a command, with or without the leading `az`. Text after `#` is a comment.
+    Commands share the loaded command modules and credentials, saving the start-up time of a new process per command.
+    A JSON object is written per line for each command as it finishes, with its line number, exit code, result
+    and error. The command fails if any of the commands failed.
+examples:
+  - name: Run the commands in a file one after another.
+    text: >
+        az batch-run --file commands.txt
+  - name: Run independent commands from stdin, up to 8 at the same time.
+    text: >
+        cat commands.txt | az batch-run --max-parallel 8
+"""
@@ -33,7 +33,13 @@ def load_arguments(self, _):
                         'the service. The token will be placed in the Authorization header. By default, '
                         'CLI can figure this out based on --url argument, unless you use ones not in the list '
                         'of "az cloud show --query endpoints"')
+        c.argument('paginate', action='store_true',
+                   help='Follow the nextLink of the response and output the items in the "value" of all the pages')
 
     with self.argument_context('upgrade') as c:
         c.argument('update_all', options_list=['--all'], arg_type=get_three_state_flag(), help='Enable updating extensions as well.', default='true')
         c.argument('yes', options_list=['--yes', '-y'], action='store_true', help='Do not prompt for checking release notes.')
+
+    with self.argument_context('batch-run') as c:
+        c.argument('command_file', options_list=['--file', '-f'], help='File with a command per line. Read from stdin if omitted or "-".')
+        c.argument('max_parallel', type=int, help='Maximum number of commands run at the same time. Only use a value greater than 1 if the commands are independent of each other.')
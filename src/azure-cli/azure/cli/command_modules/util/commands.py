@@ -14,3 +14,6 @@ def load_command_table(self, _):
 
     with self.command_group('') as g:
         g.custom_command('upgrade', 'upgrade_version', is_experimental=True)
+
+    with self.command_group('') as g:
+        g.custom_command('batch-run', 'batch_run', is_preview=True)
@@ -11,7 +11,15 @@ UPGRADE_MSG = 'Not able to upgrade automatically. Instructions can be found at h
 
 
 def rest_call(cmd, url, method=None, headers=None, uri_parameters=None,
-              body=None, skip_authorization_header=False, resource=None, output_file=None):
+              body=None, skip_authorization_header=False, resource=None, output_file=None, paginate=False):
+    if paginate:
+        from knack.util import CLIError
+        if output_file:
+            raise CLIError('usage error: --paginate can not be used with --output-file')
+        from azure.cli.core.util import send_raw_request_paged
+        return send_raw_request_paged(cmd.cli_ctx, method, url, headers, uri_parameters, body,
+                                      skip_authorization_header=skip_authorization_header, resource=resource)
+
     from azure.cli.core.util import send_raw_request
     r = send_raw_request(cmd.cli_ctx, method, url, headers, uri_parameters, body,
                          skip_authorization_header, resource, output_file)
@@ -146,3 +154,121 @@ def upgrade_version(cmd, update_all=None, yes=None):  # pylint: disable=too-many
                 raise CLIError(msg)
 
     logger.warning("Upgrade finished.")
+
+
+def batch_run(cmd, command_file=None, max_parallel=1):
+    import sys
+    import threading
+    from knack.util import CLIError
+
+    if command_file and command_file != '-':
+        with open(command_file, 'r') as f:
+            lines = f.readlines()
+    else:
+        lines = sys.stdin.readlines()
+
+    commands = []
+    for line_number, line in enumerate(lines, 1):
+        args = _split_batch_line(line)
+        if args:
+            commands.append((line_number, line.strip(), args))
+
+    # Loading the command table and the arguments updates shared state, like the command index, so it's serialized
+    # between commands. Parsing and running them is not.
+    load_lock = threading.Lock()
+    output_lock = threading.Lock()
+
+    def _run(item):
+        line_number, line, args = item
+        exit_code, result, error = _invoke_batch_command(cmd.cli_ctx, args, load_lock)
+        output = {'line': line_number, 'command': line, 'exit_code': exit_code, 'result': result}
+        if error:
+            output['error'] = error
+        with output_lock:
+            print(_format_batch_output(output), file=sys.stdout)
+            sys.stdout.flush()
+        return exit_code
+
+    if max_parallel > 1 and len(commands) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            exit_codes = list(executor.map(_run, commands))
+    else:
+        exit_codes = [_run(c) for c in commands]
+
+    failed = len([c for c in exit_codes if c])
+    if failed:
+        raise CLIError('{} of {} commands failed.'.format(failed, len(commands)))
+
+
+def _split_batch_line(line):
+    import shlex
+    args = shlex.split(line, comments=True)
+    if args and args[0] == 'az':
+        args = args[1:]
+    return args
+
+
+def _format_batch_output(output):
+    import json
+    from knack.output import _ComplexEncoder
+    return json.dumps(output, ensure_ascii=False, sort_keys=True, cls=_ComplexEncoder)
+
+
+def _invoke_batch_command(cli_ctx, args, load_lock):
+    """Run a command line with its own copy of the CLI context, like AzCliCommandInvoker does for each --ids job.
+
+    Imported command modules, SDKs and cached credentials are reused between commands.
+    :return: The exit code, result and error message of the command
+    """
+    import copy
+    import types
+    from knack.events import EVENT_INVOKER_PRE_CMD_TBL_CREATE, EVENT_INVOKER_POST_CMD_TBL_CREATE
+    from azure.cli.core.azlogging import AzCliLogging
+    from azure.cli.core.commands.events import EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE
+
+    cli_copy = copy.copy(cli_ctx)
+    cli_copy.data = copy.deepcopy(cli_ctx.data)
+    # Handlers registered while running a command, like the one applying --query, must not leak to other commands
+    cli_copy._event_handlers = copy.copy(cli_ctx._event_handlers)  # pylint: disable=protected-access
+    for event_name, handlers in cli_copy._event_handlers.items():  # pylint: disable=protected-access
+        cli_copy._event_handlers[event_name] = list(handlers)  # pylint: disable=protected-access
+    # The commands are logged as part of `batch-run` rather than to a command log file each
+    cli_copy.unregister_event(EVENT_INVOKER_PRE_CMD_TBL_TRUNCATE, AzCliLogging.init_command_file_logging)
+
+    lock_holder = []
+
+    def _on_pre_cmd_tbl_create(*_, **__):
+        load_lock.acquire()
+        lock_holder.append(True)
+
+    def _on_post_cmd_tbl_create(*_, **__):
+        if lock_holder:
+            lock_holder.pop()
+            load_lock.release()
+
+    cli_copy.register_event(EVENT_INVOKER_PRE_CMD_TBL_CREATE, _on_pre_cmd_tbl_create)
+    cli_copy.register_event(EVENT_INVOKER_POST_CMD_TBL_CREATE, _on_post_cmd_tbl_create)
+
+    result, error = None, None
+    try:
+        cli_copy.invocation = cli_copy.invocation_cls(cli_ctx=cli_copy,
+                                                      parser_cls=cli_copy.parser_cls,
+                                                      commands_loader_cls=cli_copy.commands_loader_cls,
+                                                      help_cls=cli_copy.help_cls)
+        cmd_result = cli_copy.invocation.execute(args)
+        exit_code, result = cmd_result.exit_code, cmd_result.result
+        if isinstance(result, types.GeneratorType):
+            # A result streamed to an output format like jsonl is collected, as each command is output as one line
+            result = list(result)
+        if cmd_result.error:
+            error = str(cmd_result.error)
+    except SystemExit as ex:
+        # Raised by the parser for invalid arguments and by --help
+        exit_code = ex.code if ex.code is not None else 0
+    except Exception as ex:  # pylint: disable=broad-except
+        exit_code = cli_copy.exception_handler(ex)
+        error = str(ex)
+    finally:
+        _on_post_cmd_tbl_create()
+    return exit_code, result, error
@@ -0,0 +1,73 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from azure.cli.core.mock import DummyCli
+from azure.cli.command_modules.util.custom import batch_run, _split_batch_line
+
+
+class BatchRunTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cmd = mock.MagicMock()
+        self.cmd.cli_ctx = DummyCli()
+        fd, self.command_file = tempfile.mkstemp()
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.command_file)
+
+    def _batch_run(self, commands, max_parallel=1):
+        with open(self.command_file, 'w') as f:
+            f.write(commands)
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            try:
+                batch_run(self.cmd, self.command_file, max_parallel=max_parallel)
+                error = None
+            except CLIError as ex:
+                error = ex
+        return [json.loads(line) for line in stdout.getvalue().splitlines()], error
+
+    def test_split_batch_line(self):
+        self.assertEqual(_split_batch_line('az group show -n "my group"\n'), ['group', 'show', '-n', 'my group'])
+        self.assertEqual(_split_batch_line('cloud list  # all clouds'), ['cloud', 'list'])
+        self.assertEqual(_split_batch_line('# comment'), [])
+        self.assertEqual(_split_batch_line('   \n'), [])
+
+    def test_batch_run(self):
+        outputs, error = self._batch_run('# clouds\n'
+                                         'az cloud show -n AzureCloud --query name\n'
+                                         '\n'
+                                         'cloud list --query "[0].name"\n')
+        self.assertIsNone(error)
+        self.assertEqual(outputs, [
+            {'line': 2, 'command': 'az cloud show -n AzureCloud --query name', 'exit_code': 0,
+             'result': 'AzureCloud'},
+            {'line': 4, 'command': 'cloud list --query "[0].name"', 'exit_code': 0, 'result': 'AzureCloud'}
+        ])
+
+    def test_batch_run_failure(self):
+        outputs, error = self._batch_run('cloud show -n NotACloud\n'
+                                         'cloud shwo\n'
+                                         'cloud show -n AzureCloud --query name\n', max_parallel=3)
+        self.assertEqual(str(error), '2 of 3 commands failed.')
+        outputs = sorted(outputs, key=lambda o: o['line'])
+        self.assertEqual(outputs[0]['exit_code'], 1)
+        self.assertIn('NotACloud', outputs[0]['error'])
+        self.assertEqual(outputs[1]['exit_code'], 2)
+        self.assertEqual(outputs[2]['exit_code'], 0)
+        self.assertEqual(outputs[2]['result'], 'AzureCloud')
+
+
+if __name__ == '__main__':
+    unittest.main()
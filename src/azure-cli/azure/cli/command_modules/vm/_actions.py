@@ -4,10 +4,13 @@
 # --------------------------------------------------------------------------------------------
 
 import json
+import threading
+import time
 
 from knack.util import CLIError
 from knack.log import get_logger
 
+from azure.cli.core._session import get_cache_session
 from azure.cli.core.commands.parameters import get_one_of_subscription_locations
 from azure.cli.core.commands.arm import resource_exists
 
@@ -32,56 +35,111 @@ def _get_thread_count():
     return 5  # don't increase too much till https://github.com/Azure/msrestazure-for-python/issues/6 is fixed
 
 
-def load_images_thru_services(cli_ctx, publisher, offer, sku, location):
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-    all_images = []
+# The publishers in the catalog and the versions of the skus are listed again after a day, as new image versions are
+# released often. The offers and skus of a publisher are listed again after a week.
+_IMAGE_CATALOG_MAX_AGE = 24 * 60 * 60
+_IMAGE_CATALOG_CRAWL_MAX_AGE = 7 * 24 * 60 * 60
+_image_catalog_lock = threading.Lock()
+
+
+def _get_image_catalog_key(cli_ctx, location):
+    return '{}/{}'.format(cli_ctx.cloud.name, location.lower().replace(' ', ''))
+
+
+def _get_cached_image_catalog(key):
+    cache = get_cache_session('vmImageCatalog.json')
+    if cache is None:
+        return {}
+    with _image_catalog_lock:
+        # the publisher entries are updated by the threads crawling them, so they are copied
+        return json.loads(json.dumps(cache.get(key, {})))
+
+
+def _cache_image_catalog(key, catalog):
+    cache = get_cache_session('vmImageCatalog.json')
+    if cache is None:
+        return
+    with _image_catalog_lock:
+        cache[key] = catalog
+
+
+def load_images_thru_services(cli_ctx, publisher, offer, sku, location, refresh=False):
+    """Crawl the publishers, offers, skus and versions of the images in a location. The nodes crawled are kept in a
+    local catalog of the location, so later searches are served from it. The versions of the skus are listed again
+    once a day, and the offers and skus of a publisher once a week.
+
+    :param refresh: Crawl the publishers searched again rather than using the catalog
+    """
+    from concurrent.futures import ThreadPoolExecutor
     client = _compute_client_factory(cli_ctx)
     if location is None:
         location = get_one_of_subscription_locations(cli_ctx)
 
-    def _load_images_from_publisher(publisher):
+    catalog_key = _get_image_catalog_key(cli_ctx, location)
+    catalog = _get_cached_image_catalog(catalog_key)
+    now = time.time()
+
+    def _list_offers(publisher, entry):
         from msrestazure.azure_exceptions import CloudError
+        if entry and not refresh and entry.get('crawled', 0) + _IMAGE_CATALOG_CRAWL_MAX_AGE > now:
+            if entry['checked'] + _IMAGE_CATALOG_MAX_AGE <= now:
+                # the offers and skus are kept, and the versions of the skus searched are listed again
+                entry = {'crawled': entry['crawled'], 'checked': now,
+                         'offers': {o: skus and {s: None for s in skus} for o, skus in entry['offers'].items()}}
+            return entry
         try:
-            offers = client.virtual_machine_images.list_offers(location, publisher)
+            offers = [o.name for o in client.virtual_machine_images.list_offers(location, publisher)]
         except CloudError as e:
             logger.warning(str(e))
-            return
-        if offer:
-            offers = [o for o in offers if _matched(offer, o.name)]
-        for o in offers:
-            try:
-                skus = client.virtual_machine_images.list_skus(location, publisher, o.name)
-            except CloudError as e:
-                logger.warning(str(e))
-                continue
-            if sku:
-                skus = [s for s in skus if _matched(sku, s.name)]
-            for s in skus:
+            return None
+        return {'crawled': now, 'checked': now, 'offers': {o: None for o in offers}}
+
+    def _load_images_from_publisher(publisher):
+        from msrestazure.azure_exceptions import CloudError
+        images = []
+        entry = _list_offers(publisher, catalog['publishers'][publisher])
+        if entry is None:
+            return images, None
+        offers = entry['offers']
+        for o in [o for o in offers if _matched(offer, o)]:
+            if offers[o] is None:
                 try:
-                    images = client.virtual_machine_images.list(location, publisher, o.name, s.name)
+                    offers[o] = {s.name: None for s in client.virtual_machine_images.list_skus(location, publisher, o)}
                 except CloudError as e:
                     logger.warning(str(e))
                     continue
-                for i in images:
-                    all_images.append({
-                        'publisher': publisher,
-                        'offer': o.name,
-                        'sku': s.name,
-                        'version': i.name})
-
-    publishers = client.virtual_machine_images.list_publishers(location)
-    if publisher:
-        publishers = [p for p in publishers if _matched(publisher, p.name)]
-
-    publisher_num = len(publishers)
-    if publisher_num > 1:
-        with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
-            tasks = [executor.submit(_load_images_from_publisher, p.name) for p in publishers]
-            for t in as_completed(tasks):
-                t.result()  # don't use the result but expose exceptions from the threads
-    elif publisher_num == 1:
-        _load_images_from_publisher(publishers[0].name)
+            skus = offers[o]
+            for s in [s for s in skus if _matched(sku, s)]:
+                if skus[s] is None:
+                    try:
+                        skus[s] = [i.name for i in client.virtual_machine_images.list(location, publisher, o, s)]
+                    except CloudError as e:
+                        logger.warning(str(e))
+                        continue
+                images.extend(_create_image_instance(publisher, o, s, v) for v in skus[s])
+        return images, entry
+
+    if not catalog or refresh or catalog['time'] + _IMAGE_CATALOG_MAX_AGE <= now:
+        publishers = catalog.get('publishers', {})
+        catalog = {'time': now, 'publishers': {p.name: publishers.get(p.name) for p in
+                                               client.virtual_machine_images.list_publishers(location)}}
+    publishers = [p for p in catalog['publishers'] if _matched(publisher, p)]
+
+    max_workers = cli_ctx.config.getint('vm', 'max_concurrent_image_requests', fallback=_get_thread_count())
+    if max_workers < 1:
+        raise CLIError("Configuration 'vm.max_concurrent_image_requests' should be a positive integer.")
+    if len(publishers) > 1 and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # results are kept in the order of the publishers, and exceptions from the threads are raised
+            results = list(executor.map(_load_images_from_publisher, publishers))
+    else:
+        results = [_load_images_from_publisher(p) for p in publishers]
 
+    all_images = []
+    for p, (images, entry) in zip(publishers, results):
+        all_images.extend(images)
+        catalog['publishers'][p] = entry
+    _cache_image_catalog(catalog_key, catalog)
     return all_images
 
 
@@ -197,6 +255,9 @@ def _matched(pattern, string, partial_match=True):
     if not pattern:
         return True  # empty pattern means wildcard-match
     pattern, string = pattern.lower(), string.lower()
+    if '*' in pattern or '?' in pattern:
+        from fnmatch import fnmatchcase
+        return fnmatchcase(string, pattern)
     return pattern in string if partial_match else pattern == string
 
 
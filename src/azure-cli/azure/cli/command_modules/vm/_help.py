@@ -1566,13 +1566,21 @@ type: command
 short-summary: List the VM/VMSS images available in the Azure Marketplace.
 parameters:
   - name: --all
-    short-summary: Retrieve image list from live Azure service rather using an offline image list
+    short-summary: Retrieve image list from Azure service rather using an offline image list
+    long-summary: >
+        The images retrieved are kept in a local catalog of the location, so later searches in the location only
+        request the images not retrieved yet. The versions of the skus searched are listed again once they are a day
+        old, so the images released since show up, and the offers and skus once they are a week old. Use --refresh to
+        list them all again.
+  - name: --refresh
+    short-summary: Retrieve the images searched from Azure service again rather than from the local catalog.
+    long-summary: Requires --all. The local catalog is brought up to date with the images retrieved.
   - name: --offer -f
-    short-summary: Image offer name, partial name is accepted
+    short-summary: Image offer name, partial name or wildcard pattern is accepted
   - name: --publisher -p
-    short-summary: Image publisher name, partial name is accepted
+    short-summary: Image publisher name, partial name or wildcard pattern is accepted
   - name: --sku -s
-    short-summary: Image sku name, partial name is accepted
+    short-summary: Image sku name, partial name or wildcard pattern is accepted
 examples:
   - name: List all available images.
     text: az vm image list --all
@@ -1580,6 +1588,10 @@ examples:
     text: az vm image list -f CentOS
   - name: List all CentOS images.
     text: az vm image list -f CentOS --all
+  - name: List the Ubuntu Server images of the 18.04 skus.
+    text: az vm image list -p Canonical -f UbuntuServer -s "18.04*" --all
+  - name: List the latest CentOS images, rather than the ones in the local catalog.
+    text: az vm image list -f CentOS --all --refresh
 """
 
 helps['vm image list-offers'] = """
@@ -1702,7 +1714,9 @@ examples:
 helps['vm list-skus'] = """
 type: command
 short-summary: Get details for compute-related resource SKUs.
-long-summary: This command incorporates subscription level restriction, offering the most accurate information.
+long-summary: >
+    This command incorporates subscription level restriction, offering the most accurate information.
+    The SKUs are cached for an hour.
 examples:
   - name: List all SKUs in the West US region.
     text: az vm list-skus -l westus
@@ -420,6 +420,7 @@ def load_arguments(self, _):
 
     with self.argument_context('vm image list') as c:
         c.argument('image_location', get_location_type(self.cli_ctx))
+        c.argument('refresh', action='store_true')
 
     with self.argument_context('vm image show') as c:
         c.argument('skus', options_list=['--sku', '-s'])
@@ -18,7 +18,7 @@ from azure.cli.core.commands.validators import (
     get_default_location_from_resource_group, validate_file_or_dict, validate_parameter_set, validate_tags)
 from azure.cli.core.util import (hash_string, DISALLOWED_USER_NAMES, get_default_admin_username)
 from azure.cli.command_modules.vm._vm_utils import (
-    check_existence, get_target_network_api, get_storage_blob_uri, list_sku_info)
+    check_existence, get_target_network_api, get_storage_blob_uri, list_sku_info, memoize_lookup)
 from azure.cli.command_modules.vm._template_builder import StorageProfile
 import azure.cli.core.keys as keys
 
@@ -280,9 +280,8 @@ def _parse_image_argument(cmd, namespace):
         pass
 
     # 5 - check if an existing managed disk image resource
-    compute_client = _compute_client_factory(cmd.cli_ctx)
     try:
-        compute_client.images.get(namespace.resource_group_name, namespace.image)
+        _get_managed_image(cmd.cli_ctx, namespace.resource_group_name, namespace.image)
         namespace.image = _get_resource_id(cmd.cli_ctx, namespace.image, namespace.resource_group_name,
                                            'images', 'Microsoft.Compute')
         return 'image_id'
@@ -298,6 +297,14 @@ def _parse_image_argument(cmd, namespace):
         raise CLIError(err)
 
 
+def _get_managed_image(cli_ctx, resource_group_name, image_name, subscription_id=None):
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    compute_client = _compute_client_factory(cli_ctx, subscription_id=subscription_id)
+    key = ('image', subscription_id or get_subscription_id(cli_ctx), resource_group_name, image_name)
+    return memoize_lookup(cli_ctx, tuple(k.lower() for k in key),
+                          lambda: compute_client.images.get(resource_group_name, image_name))
+
+
 def _get_image_plan_info_if_exists(cmd, namespace):
     from msrestazure.azure_exceptions import CloudError
     try:
@@ -341,8 +348,8 @@ def _validate_location(cmd, namespace, zone_info, size_info):
     if not namespace.location:
         get_default_location_from_resource_group(cmd, namespace)
         if zone_info:
-            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location)
-            temp = next((x for x in sku_infos if x.name.lower() == size_info.lower()), None)
+            sku_infos = list_sku_info(cmd.cli_ctx, namespace.location, name=size_info)
+            temp = next(iter(sku_infos), None)
             # For Stack (compute - 2017-03-30), Resource_sku doesn't implement location_info property
             if not hasattr(temp, 'location_info'):
                 return
@@ -461,7 +468,8 @@ def _validate_vm_create_storage_profile(cmd, namespace, for_scale_set=False):
         namespace.aux_subscriptions = [res['subscription']]
         compute_client = _compute_client_factory(cmd.cli_ctx, subscription_id=res['subscription'])
         if res['type'].lower() == 'images':
-            image_info = compute_client.images.get(res['resource_group'], res['name'])
+            image_info = _get_managed_image(cmd.cli_ctx, res['resource_group'], res['name'],
+                                            subscription_id=res['subscription'])
             namespace.os_type = image_info.storage_profile.os_disk.os_type.value
             image_data_disks = image_info.storage_profile.data_disks or []
             image_data_disks = [{'lun': disk.lun} for disk in image_data_disks]
@@ -1147,34 +1155,77 @@ def _resolve_role_id(cli_ctx, role, scope):
     return role_id
 
 
+def _run_validators(validators):
+    """Run validators concurrently, each once the validators it depends on have finished.
+
+    Validators making lookups, like existence checks, don't wait on each other this way. No validator is started
+    after one failed, and the error of the first failed validator in the given order is raised.
+    :param validators: A list of (name, validate, depends_on) where validate takes no arguments and depends_on
+        are the names of the validators to run before it
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    names = [name for name, _, _ in validators]
+    pending = list(validators)
+    futures = {}
+    done = set()
+    with ThreadPoolExecutor(max_workers=len(validators) or 1) as executor:
+        while pending or len(done) < len(futures):
+            failed = any(futures[name].exception() for name in done)
+            if not failed:
+                for validator in [v for v in pending if all(d in done for d in v[2])]:
+                    pending.remove(validator)
+                    name, validate, _ = validator
+                    futures[name] = executor.submit(validate)
+            running = [f for n, f in futures.items() if n not in done]
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            done.update(n for n, f in futures.items() if f in finished)
+    for name in names:
+        if name in futures and futures[name].exception():
+            raise futures[name].exception()
+    if pending:
+        raise CLIError('unresolved validator dependencies: {}'.format(', '.join(v[0] for v in pending)))
+
+
 def process_vm_create_namespace(cmd, namespace):
     validate_tags(namespace)
     _validate_location(cmd, namespace, namespace.zone, namespace.size)
     validate_asg_names_or_ids(cmd, namespace)
-    _validate_vm_create_storage_profile(cmd, namespace)
-    if namespace.storage_profile in [StorageProfile.SACustomImage,
-                                     StorageProfile.SAPirImage]:
-        _validate_vm_create_storage_account(cmd, namespace)
-
-    _validate_vm_create_availability_set(cmd, namespace)
-    _validate_vm_create_vmss(cmd, namespace)
-    _validate_vm_vmss_create_vnet(cmd, namespace)
-    _validate_vm_create_nsg(cmd, namespace)
-    _validate_vm_vmss_create_public_ip(cmd, namespace)
-    _validate_vm_create_nics(cmd, namespace)
-    _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
-    _validate_vm_vmss_create_auth(namespace)
 
-    _validate_proximity_placement_group(cmd, namespace)
+    def _validate_storage_account():
+        if namespace.storage_profile in [StorageProfile.SACustomImage,
+                                         StorageProfile.SAPirImage]:
+            _validate_vm_create_storage_account(cmd, namespace)
+
+    def _validate_boot_diagnostics_storage():
+        if namespace.boot_diagnostics_storage:
+            namespace.boot_diagnostics_storage = get_storage_blob_uri(cmd.cli_ctx,
+                                                                      namespace.boot_diagnostics_storage)
+
+    # validators looking up existing resources run concurrently
+    _run_validators([
+        ('storage_profile', lambda: _validate_vm_create_storage_profile(cmd, namespace), []),
+        ('storage_account', _validate_storage_account, ['storage_profile']),
+        ('availability_set', lambda: _validate_vm_create_availability_set(cmd, namespace), []),
+        ('vmss', lambda: _validate_vm_create_vmss(cmd, namespace), []),
+        ('vnet', lambda: _validate_vm_vmss_create_vnet(cmd, namespace), []),
+        ('nsg', lambda: _validate_vm_create_nsg(cmd, namespace), []),
+        ('public_ip', lambda: _validate_vm_vmss_create_public_ip(cmd, namespace), []),
+        ('nics', lambda: _validate_vm_create_nics(cmd, namespace), ['vnet', 'public_ip']),
+        ('accelerated_networking', lambda: _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace),
+         ['storage_profile']),
+        ('proximity_placement_group', lambda: _validate_proximity_placement_group(cmd, namespace), []),
+        ('msi', lambda: _validate_vm_vmss_msi(cmd, namespace), []),
+        ('boot_diagnostics_storage', _validate_boot_diagnostics_storage, [])
+    ])
+    _validate_vm_vmss_create_auth(namespace)
     _validate_vm_create_dedicated_host(cmd, namespace)
 
     if namespace.secrets:
         _validate_secrets(namespace.secrets, namespace.os_type)
     if namespace.license_type and namespace.os_type.lower() != 'windows':
         raise CLIError('usage error: --license-type is only applicable on Windows VM')
-    _validate_vm_vmss_msi(cmd, namespace)
-    if namespace.boot_diagnostics_storage:
-        namespace.boot_diagnostics_storage = get_storage_blob_uri(cmd.cli_ctx, namespace.boot_diagnostics_storage)
 
 # endregion
 
@@ -1412,18 +1463,22 @@ def process_vmss_create_namespace(cmd, namespace):
             namespace.vm_sku = 'Standard_D1_v2'
     _validate_location(cmd, namespace, namespace.zones, namespace.vm_sku)
     validate_asg_names_or_ids(cmd, namespace)
-    _validate_vm_create_storage_profile(cmd, namespace, for_scale_set=True)
-    _validate_vm_vmss_create_vnet(cmd, namespace, for_scale_set=True)
-
     _validate_vmss_single_placement_group(namespace)
-    _validate_vmss_create_load_balancer_or_app_gateway(cmd, namespace)
-    _validate_vmss_create_subnet(namespace)
-    _validate_vmss_create_public_ip(cmd, namespace)
-    _validate_vmss_create_nsg(cmd, namespace)
-    _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace)
+
+    # validators looking up existing resources run concurrently
+    _run_validators([
+        ('storage_profile', lambda: _validate_vm_create_storage_profile(cmd, namespace, for_scale_set=True), []),
+        ('vnet', lambda: _validate_vm_vmss_create_vnet(cmd, namespace, for_scale_set=True), []),
+        ('balancer', lambda: _validate_vmss_create_load_balancer_or_app_gateway(cmd, namespace), ['vnet']),
+        ('subnet', lambda: _validate_vmss_create_subnet(namespace), ['balancer']),
+        ('public_ip', lambda: _validate_vmss_create_public_ip(cmd, namespace), ['balancer']),
+        ('nsg', lambda: _validate_vmss_create_nsg(cmd, namespace), []),
+        ('accelerated_networking', lambda: _validate_vm_vmss_accelerated_networking(cmd.cli_ctx, namespace),
+         ['storage_profile']),
+        ('msi', lambda: _validate_vm_vmss_msi(cmd, namespace), []),
+        ('proximity_placement_group', lambda: _validate_proximity_placement_group(cmd, namespace), [])
+    ])
     _validate_vm_vmss_create_auth(namespace)
-    _validate_vm_vmss_msi(cmd, namespace)
-    _validate_proximity_placement_group(cmd, namespace)
     _validate_vmss_terminate_notification(cmd, namespace)
     _validate_vmss_create_automatic_repairs(cmd, namespace)
     _validate_vmss_create_host_group(cmd, namespace)
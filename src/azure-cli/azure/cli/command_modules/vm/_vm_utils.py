@@ -3,9 +3,12 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import gzip
 import json
 import os
 import re
+import threading
+import time
 try:
     from urllib.parse import urlparse
 except ImportError:
@@ -40,11 +43,51 @@ def read_content_if_is_file(string_or_file):
     return content
 
 
+class _LookupMemo(object):
+    """Results of the lookups made while validating a command, like provider and existence checks.
+
+    Validators run concurrently, so a lookup in flight is waited on rather than made again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lookups = {}
+
+    def __deepcopy__(self, memo):
+        # each copy of the CLI context, like the one of an --ids job, is another invocation
+        return _LookupMemo()
+
+    def get(self, key, lookup):
+        from concurrent.futures import Future
+        with self._lock:
+            future = self._lookups.get(key)
+            owner = future is None
+            if owner:
+                future = self._lookups[key] = Future()
+        if owner:
+            try:
+                future.set_result(lookup())
+            except Exception as ex:  # pylint: disable=broad-except
+                future.set_exception(ex)
+        return future.result()
+
+
+def memoize_lookup(cli_ctx, key, lookup):
+    """Make a lookup once per command invocation.
+
+    :param key: A hashable key of the looked up resource, with names in lower case
+    :param lookup: A callable making the lookup
+    """
+    memo = cli_ctx.data.setdefault('vm_lookup_memo', _LookupMemo())
+    return memo.get(key, lookup)
+
+
 def _resolve_api_version(cli_ctx, provider_namespace, resource_type, parent_path):
     from azure.cli.core.commands.client_factory import get_mgmt_service_client
     from azure.cli.core.profiles import ResourceType
     client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
-    provider = client.providers.get(provider_namespace)
+    provider = memoize_lookup(cli_ctx, ('provider', provider_namespace.lower()),
+                              lambda: client.providers.get(provider_namespace))
 
     # If available, we will use parent resource's api-version
     resource_type_str = (parent_path.split('/')[0] if parent_path else resource_type)
@@ -88,13 +131,17 @@ def check_existence(cli_ctx, value, resource_group, provider_namespace, resource
         parent_path = ''
         resource_name = id_parts['name']
         resource_type = id_parts.get('type', resource_type)
-    api_version = _resolve_api_version(cli_ctx, provider_namespace, resource_type, parent_path)
 
-    try:
-        resource_client.get(rg, ns, parent_path, resource_type, resource_name, api_version)
-        return True
-    except CloudError:
-        return False
+    def _exists():
+        api_version = _resolve_api_version(cli_ctx, provider_namespace, resource_type, parent_path)
+        try:
+            resource_client.get(rg, ns, parent_path, resource_type, resource_name, api_version)
+            return True
+        except CloudError:
+            return False
+
+    key = ('existence', id_parts.get('subscription', ''), rg, ns, parent_path, resource_type, resource_name)
+    return memoize_lookup(cli_ctx, tuple((k or '').lower() for k in key), _exists)
 
 
 def create_keyvault_data_plane_client(cli_ctx):
@@ -114,17 +161,114 @@ def get_key_vault_base_url(cli_ctx, vault_name):
     return 'https://{}{}'.format(vault_name, suffix)
 
 
-def list_sku_info(cli_ctx, location=None):
+_RESOURCE_SKU_CACHE_MAX_AGE = 60 * 60
+_resource_sku_cache_lock = threading.Lock()
+# Indexes of the SKUs read from the cache files, keyed by file name
+_resource_sku_indexes = {}
+
+
+class _ResourceSkuIndex(object):
+    """Index serialized resource SKUs by location, resource type and name, all lowercase."""
+
+    def __init__(self, skus, cached_time):
+        from collections import defaultdict
+        self.skus = skus
+        self.time = cached_time
+        self._by_location = defaultdict(list)
+        self._by_resource_type = defaultdict(list)
+        self._by_name = defaultdict(list)
+        for i, sku in enumerate(skus):
+            for location in sku.get('locations') or []:
+                self._by_location[location.lower()].append(i)
+            self._by_resource_type[(sku.get('resourceType') or '').lower()].append(i)
+            self._by_name[(sku.get('name') or '').lower()].append(i)
+
+    def find(self, location=None, resource_type=None, name=None):
+        matches = None
+        for index, key in [(self._by_location, location), (self._by_resource_type, resource_type),
+                           (self._by_name, name)]:
+            if key:
+                found = set(index.get(key.lower(), []))
+                matches = found if matches is None else matches & found
+        return [self.skus[i] for i in sorted(matches)] if matches is not None else list(self.skus)
+
+
+def _get_resource_sku_cache_file(subscription_id, location):
+    from azure.cli.core._session import get_cache_path
+    return get_cache_path('resourceSkus', subscription_id,
+                          '{}.json.gz'.format(location.lower().replace(' ', '') if location else 'all'))
+
+
+def _get_cached_resource_skus(cache_file):
+    """Get the index of the SKUs cached in a file, if they aren't expired. The file is read again when the index in
+    memory is expired, as another command may have refreshed it."""
+    import zlib
+    if not cache_file:
+        return None
+    now = time.time()
+    with _resource_sku_cache_lock:
+        index = _resource_sku_indexes.get(cache_file)
+        if index is None or index.time + _RESOURCE_SKU_CACHE_MAX_AGE <= now:
+            try:
+                with gzip.open(cache_file, 'rt') as f:
+                    cached = json.load(f)
+                index = _ResourceSkuIndex(cached['skus'], cached['time'])
+            except (OSError, IOError, EOFError, zlib.error, ValueError, KeyError) as ex:
+                # a missing or truncated file is listed again
+                logger.debug("Failed to read the resource SKUs cached in '%s': %s", cache_file, ex)
+                return None
+            _resource_sku_indexes[cache_file] = index
+    return index if index.time + _RESOURCE_SKU_CACHE_MAX_AGE > now else None
+
+
+def _cache_resource_skus(cache_file, index):
+    if not cache_file:
+        return
+    with _resource_sku_cache_lock:
+        _resource_sku_indexes[cache_file] = index
+        try:
+            os.makedirs(os.path.dirname(cache_file))
+        except OSError:
+            pass  # exists already
+        # written to a temp file first, so a concurrent command never reads a partial file
+        temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+        try:
+            with gzip.open(temp_file, 'wt') as f:
+                json.dump({'time': index.time, 'skus': index.skus}, f)
+            os.replace(temp_file, cache_file)
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to cache the resource SKUs in '%s': %s", cache_file, ex)
+
+
+def list_sku_info(cli_ctx, location=None, resource_type=None, name=None):
+    """List the resource SKUs, matching the location, resource type and name if given.
+
+    The SKUs are cached for an hour, compressed, in the config dir. The SKUs of a location are requested with a
+    server-side filter, unless all the SKUs are cached already.
+    """
+    from azure.cli.core.profiles import ResourceType, get_sdk, supported_api_version
     from ._client_factory import _compute_client_factory
 
-    def _match_location(loc, locations):
-        return next((x for x in locations if x.lower() == loc.lower()), None)
-
     client = _compute_client_factory(cli_ctx)
-    result = client.resource_skus.list()
-    if location:
-        result = [r for r in result if _match_location(location, r.locations)]
-    return result
+    subscription_id = client.config.subscription_id
+    index = None
+    for cached_location in ([location, None] if location else [None]):
+        index = _get_cached_resource_skus(_get_resource_sku_cache_file(subscription_id, cached_location))
+        if index is not None:
+            break
+    if index is None:
+        # only api-version 2019-04-01 and later support the location filter
+        filter_location = location if location and supported_api_version(
+            cli_ctx, ResourceType.MGMT_COMPUTE, min_api='2019-04-01', operation_group='resource_skus') else None
+        if filter_location:
+            skus = client.resource_skus.list(filter="location eq '{}'".format(filter_location))
+        else:
+            skus = client.resource_skus.list()
+        index = _ResourceSkuIndex([sku.serialize(keep_readonly=True) for sku in skus], time.time())
+        _cache_resource_skus(_get_resource_sku_cache_file(subscription_id, filter_location), index)
+    sku_model = get_sdk(cli_ctx, ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                        operation_group='resource_skus')
+    return [sku_model.deserialize(sku) for sku in index.find(location, resource_type, name)]
 
 
 def normalize_disk_info(image_data_disks=None,
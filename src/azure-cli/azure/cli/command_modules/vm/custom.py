@@ -48,6 +48,10 @@ _LINUX_DIAG_EXT = 'LinuxDiagnostic'
 _WINDOWS_DIAG_EXT = 'IaaSDiagnostics'
 _LINUX_OMS_AGENT_EXT = 'OmsAgentForLinux'
 _WINDOWS_OMS_AGENT_EXT = 'MicrosoftMonitoringAgent'
+
+# Above this number of NICs or public IPs, listing all of them is cheaper than getting them one by one
+_NETWORK_RESOURCES_LIST_THRESHOLD = 10
+
 extension_mappings = {
     _LINUX_ACCESS_EXT: {
         'version': '1.5',
@@ -1003,36 +1007,89 @@ def get_vm(cmd, resource_group_name, vm_name, expand=None):
 
 
 def get_vm_details(cmd, resource_group_name, vm_name):
-    from msrestazure.tools import parse_resource_id
-    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
+    from concurrent.futures import ThreadPoolExecutor
     result = get_instance_view(cmd, resource_group_name, vm_name)
+    with ThreadPoolExecutor(max_workers=_get_max_concurrent_requests(cmd.cli_ctx)) as executor:
+        nics, public_ips = _get_vm_network_resources(cmd, executor, [result])
+    return _set_vm_details(result, nics, public_ips)
+
+
+def _get_max_concurrent_requests(cli_ctx):
+    return max(1, cli_ctx.config.getint('core', 'max_concurrent_ids', fallback=10))
+
+
+def _get_vm_network_resources(cmd, executor, vms):
+    """Get the NICs of VMs and the public IPs of the NICs.
+
+    :return: The NICs and the public IPs, keyed by lowercase resource id
+    """
+    from azure.cli.command_modules.vm._vm_utils import get_target_network_api
     network_client = get_mgmt_service_client(
         cmd.cli_ctx, ResourceType.MGMT_NETWORK, api_version=get_target_network_api(cmd.cli_ctx))
-    public_ips = []
+    nic_ids = [nic_ref.id for vm in vms if vm.network_profile
+               for nic_ref in vm.network_profile.network_interfaces or []]
+    nics = _get_network_resources(executor, network_client.network_interfaces, nic_ids)
+    public_ip_ids = [ip_configuration.public_ip_address.id for nic in nics.values()
+                     for ip_configuration in nic.ip_configurations or [] if ip_configuration.public_ip_address]
+    public_ips = _get_network_resources(executor, network_client.public_ip_addresses, public_ip_ids)
+    return nics, public_ips
+
+
+def _get_network_resources(executor, operations, resource_ids):
+    """Get network resources by id. When there are many of them, they are listed in bulk and joined in memory,
+    like `list_vm_ip_addresses` does, instead of being fetched one by one. The resources are listed from their
+    resource group if they are all in the same one, otherwise from the whole subscription.
+
+    :return: The resources keyed by lowercase resource id
+    """
+    from msrestazure.tools import parse_resource_id
+    resource_ids = {i.lower(): i for i in resource_ids}
+    parsed_ids = {key: parse_resource_id(resource_id) for key, resource_id in resource_ids.items()}
+    resources = {}
+    if len(resource_ids) > _NETWORK_RESOURCES_LIST_THRESHOLD:
+        resource_groups = {(parts['subscription'].lower(), parts['resource_group'].lower())
+                           for parts in parsed_ids.values()}
+        if len(resource_groups) == 1:
+            listed = operations.list(parsed_ids[next(iter(parsed_ids))]['resource_group'])
+        else:
+            listed = operations.list_all()
+        resources = {r.id.lower(): r for r in listed if r.id.lower() in resource_ids}
+    # the rest, like those of another subscription, are fetched concurrently
+    futures = {}
+    for key, parts in parsed_ids.items():
+        if key not in resources:
+            futures[key] = executor.submit(operations.get, parts['resource_group'], parts['name'])
+    resources.update((key, future.result()) for key, future in futures.items())
+    return resources
+
+
+def _set_vm_details(result, nics, public_ips):
+    public_ips_info = []
     fqdns = []
     private_ips = []
     mac_addresses = []
     # pylint: disable=line-too-long,no-member
     for nic_ref in result.network_profile.network_interfaces:
-        nic_parts = parse_resource_id(nic_ref.id)
-        nic = network_client.network_interfaces.get(nic_parts['resource_group'], nic_parts['name'])
+        nic = nics.get(nic_ref.id.lower())
+        if nic is None:
+            continue
         if nic.mac_address:
             mac_addresses.append(nic.mac_address)
         for ip_configuration in nic.ip_configurations:
             if ip_configuration.private_ip_address:
                 private_ips.append(ip_configuration.private_ip_address)
             if ip_configuration.public_ip_address:
-                res = parse_resource_id(ip_configuration.public_ip_address.id)
-                public_ip_info = network_client.public_ip_addresses.get(res['resource_group'],
-                                                                        res['name'])
+                public_ip_info = public_ips.get(ip_configuration.public_ip_address.id.lower())
+                if public_ip_info is None:
+                    continue
                 if public_ip_info.ip_address:
-                    public_ips.append(public_ip_info.ip_address)
+                    public_ips_info.append(public_ip_info.ip_address)
                 if public_ip_info.dns_settings:
                     fqdns.append(public_ip_info.dns_settings.fqdn)
 
     setattr(result, 'power_state',
             ','.join([s.display_status for s in result.instance_view.statuses if s.code.startswith('PowerState/')]))
-    setattr(result, 'public_ips', ','.join(public_ips))
+    setattr(result, 'public_ips', ','.join(public_ips_info))
     setattr(result, 'fqdns', ','.join(fqdns))
     setattr(result, 'private_ips', ','.join(private_ips))
     setattr(result, 'mac_addresses', ','.join(mac_addresses))
@@ -1042,12 +1099,10 @@ def get_vm_details(cmd, resource_group_name, vm_name):
 
 def list_skus(cmd, location=None, size=None, zone=None, show_all=None, resource_type=None):
     from ._vm_utils import list_sku_info
-    result = list_sku_info(cmd.cli_ctx, location)
+    result = list_sku_info(cmd.cli_ctx, location, resource_type=resource_type)
     if not show_all:
         result = [x for x in result if not [y for y in (x.restrictions or [])
                                             if y.reason_code == 'NotAvailableForSubscription']]
-    if resource_type:
-        result = [x for x in result if x.resource_type.lower() == resource_type.lower()]
     if size:
         result = [x for x in result if x.resource_type == 'virtualMachines' and size.lower() in x.name.lower()]
     if zone:
@@ -1060,11 +1115,24 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
     vm_list = ccf.virtual_machines.list(resource_group_name=resource_group_name) \
         if resource_group_name else ccf.virtual_machines.list_all()
     if show_details:
-        return [get_vm_details(cmd, _parse_rg_name(v.id)[0], v.name) for v in vm_list]
+        return _list_vm_details(cmd, list(vm_list))
 
     return list(vm_list)
 
 
+def _list_vm_details(cmd, vms):
+    """Get the details of many VMs, like `get_vm_details` does for one of them, with the instance views fetched
+    concurrently and the NICs and public IPs looked up once for all VMs."""
+    from concurrent.futures import ThreadPoolExecutor
+    client = _compute_client_factory(cmd.cli_ctx)
+    with ThreadPoolExecutor(max_workers=_get_max_concurrent_requests(cmd.cli_ctx)) as executor:
+        instance_views = [executor.submit(client.virtual_machines.get, _parse_rg_name(v.id)[0], v.name,
+                                          expand='instanceView') for v in vms]
+        # the listed VMs have the network profile already, so NICs are looked up while instance views are fetched
+        nics, public_ips = _get_vm_network_resources(cmd, executor, vms)
+        return [_set_vm_details(f.result(), nics, public_ips) for f in instance_views]
+
+
 def list_vm_ip_addresses(cmd, resource_group_name=None, vm_name=None):
     # We start by getting NICs as they are the smack in the middle of all data that we
     # want to collect for a VM (as long as we don't need any info on the VM than what
@@ -1684,15 +1752,18 @@ def remove_vm_identity(cmd, resource_group_name, vm_name, identities=None):
 
 # region VirtualMachines Images
 def list_vm_images(cmd, image_location=None, publisher_name=None, offer=None, sku=None,
-                   all=False):  # pylint: disable=redefined-builtin
+                   all=False, refresh=False):  # pylint: disable=redefined-builtin
     load_thru_services = all
+    if refresh and not load_thru_services:
+        raise CLIError('usage error: --refresh can only be used with --all')
 
     if load_thru_services:
         if not publisher_name and not offer and not sku:
             logger.warning("You are retrieving all the images from server which could take more than a minute. "
                            "To shorten the wait, provide '--publisher', '--offer' or '--sku'. Partial name search "
                            "is supported.")
-        all_images = load_images_thru_services(cmd.cli_ctx, publisher_name, offer, sku, image_location)
+        all_images = load_images_thru_services(cmd.cli_ctx, publisher_name, offer, sku, image_location,
+                                               refresh=refresh)
     else:
         all_images = load_images_from_aliases_doc(cmd.cli_ctx, publisher_name, offer, sku)
         logger.warning(
@@ -309,6 +309,7 @@ class TestVMImageDefaults(unittest.TestCase):
     def test_vm_validator_retrieve_image_info_cross_subscription(self, factory_mock):
         ns = argparse.Namespace()
         cmd = mock.MagicMock()
+        cmd.cli_ctx.data = {}
 
         data_disk = mock.MagicMock()
         data_disk.storage_account_type = 'Standard_LRS'
@@ -16,7 +16,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _get_extension_instance_name,
                                                  get_boot_log)
 from azure.cli.command_modules.vm.custom import \
-    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
+    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view, list_vm, list_skus)
 
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.commands import AzCliCommand
@@ -237,6 +237,119 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client')
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory')
+    def test_list_vm_details(self, factory_mock, network_factory_mock):
+        cmd = _get_test_cmd()
+        vm_id = '/subscriptions/sub/resourceGroups/rg1/providers/Microsoft.Compute/virtualMachines/vm{}'
+        nic_id = '/subscriptions/sub/resourceGroups/rg1/providers/Microsoft.Network/networkInterfaces/nic{}'
+        # the public IPs are in two resource groups
+        ip_id = '/subscriptions/sub/resourceGroups/rg{}/providers/Microsoft.Network/publicIPAddresses/ip{}'
+
+        def _vm(i):
+            vm = mock.MagicMock(id=vm_id.format(i))
+            vm.name = 'vm{}'.format(i)
+            vm.network_profile.network_interfaces = [mock.MagicMock(id=nic_id.format(i))]
+            return vm
+
+        def _nic(i):
+            ip_configuration = mock.MagicMock(private_ip_address='10.0.0.{}'.format(i))
+            ip_configuration.public_ip_address.id = ip_id.format(i % 2 + 1, i)
+            return mock.MagicMock(id=nic_id.format(i).upper(), mac_address='mac{}'.format(i),
+                                  ip_configurations=[ip_configuration])
+
+        def _ip(i):
+            return mock.MagicMock(id=ip_id.format(i % 2 + 1, i), ip_address='1.1.1.{}'.format(i), dns_settings=None)
+
+        def _get_instance_view(resource_group_name, vm_name, expand=None):
+            self.assertEqual((resource_group_name, expand), ('rg1', 'instanceView'))
+            vm = _vm(vm_name[2:])
+            vm.instance_view.statuses = [InstanceViewStatus(code='PowerState/running', display_status='VM running')]
+            return vm
+
+        vm_client = factory_mock.return_value
+        vm_client.virtual_machines.list.return_value = [_vm(i) for i in range(12)]
+        vm_client.virtual_machines.get.side_effect = _get_instance_view
+        network_client = network_factory_mock.return_value
+        # nic11 and its public IP are missing from the lists
+        network_client.network_interfaces.list.return_value = [_nic(i) for i in range(11)] + [_nic(20)]
+        network_client.network_interfaces.get.return_value = _nic(11)
+        network_client.public_ip_addresses.list_all.return_value = [_ip(i) for i in range(11)]
+        network_client.public_ip_addresses.get.return_value = _ip(11)
+
+        with mock.patch.object(cmd.cli_ctx.config, 'getint', return_value=4):
+            result = list_vm(cmd, 'rg1', show_details=True)
+
+        self.assertEqual([vm.name for vm in result], ['vm{}'.format(i) for i in range(12)])
+        self.assertEqual([vm.private_ips for vm in result], ['10.0.0.{}'.format(i) for i in range(12)])
+        self.assertEqual([vm.public_ips for vm in result], ['1.1.1.{}'.format(i) for i in range(12)])
+        self.assertEqual(result[0].power_state, 'VM running')
+        self.assertEqual(result[0].mac_addresses, 'mac0')
+        network_client.network_interfaces.get.assert_called_once_with('rg1', 'nic11')
+        network_client.public_ip_addresses.get.assert_called_once_with('rg2', 'ip11')
+        # the NICs are all in the same resource group, so only that one is listed
+        network_client.network_interfaces.list.assert_called_once_with('rg1')
+        network_client.network_interfaces.list_all.assert_not_called()
+        network_client.public_ip_addresses.list_all.assert_called_once_with()
+
+    @mock.patch('azure.cli.command_modules.vm._client_factory._compute_client_factory')
+    def test_list_skus_from_cache(self, factory_mock):
+        import os
+        import shutil
+        import tempfile
+        from azure.cli.command_modules.vm import _vm_utils
+        ResourceSku = get_sdk(DummyCli(), ResourceType.MGMT_COMPUTE, 'ResourceSku', mod='models',
+                              operation_group='resource_skus')
+        cmd = _get_test_cmd()
+
+        def _sku(resource_type, name, location):
+            return ResourceSku.deserialize({'resourceType': resource_type, 'name': name, 'locations': [location],
+                                            'restrictions': []})
+
+        client = factory_mock.return_value
+        client.config.subscription_id = 'sub'
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        self.addCleanup(_vm_utils._resource_sku_indexes.clear)
+        with mock.patch('azure.cli.core._environment.get_config_dir', return_value=config_dir):
+            # the skus of a location are filtered by the server
+            client.resource_skus.list.return_value = [_sku('virtualMachines', 'Standard_DS1_v2', 'westus'),
+                                                      _sku('disks', 'Premium_LRS', 'westus')]
+            result = list_skus(cmd, location='WestUS', resource_type='virtualMachines')
+            self.assertEqual([x.name for x in result], ['Standard_DS1_v2'])
+            client.resource_skus.list.assert_called_once_with(filter="location eq 'WestUS'")
+            self.assertEqual([x.name for x in list_skus(cmd, location='westus', size='ds1')], ['Standard_DS1_v2'])
+            self.assertEqual(client.resource_skus.list.call_count, 1)
+
+            # all the skus serve any location, after they are read from the file again
+            client.resource_skus.list.reset_mock()
+            client.resource_skus.list.return_value = [_sku('virtualMachines', 'Standard_DS1_v2', 'westus'),
+                                                      _sku('virtualMachines', 'Standard_A1', 'eastus'),
+                                                      _sku('availabilitySets', 'Aligned', 'eastus')]
+            self.assertEqual(len(list_skus(cmd)), 3)
+            client.resource_skus.list.assert_called_once_with()
+            self.assertTrue(os.path.isfile(os.path.join(config_dir, 'resourceSkus', 'sub', 'all.json.gz')))
+            _vm_utils._resource_sku_indexes.clear()
+            result = list_skus(cmd, location='eastus', resource_type='availabilitySets')
+            self.assertEqual([(x.resource_type, x.name) for x in result], [('availabilitySets', 'Aligned')])
+            self.assertEqual(client.resource_skus.list.call_count, 1)
+
+            # an expired index in memory is read again from the file another command refreshed
+            all_file = os.path.join(config_dir, 'resourceSkus', 'sub', 'all.json.gz')
+            index = _vm_utils._resource_sku_indexes[all_file]
+            _vm_utils._resource_sku_indexes[all_file] = _vm_utils._ResourceSkuIndex(index.skus[:1], 0)
+            self.assertEqual(len(list_skus(cmd)), 3)
+            self.assertEqual(client.resource_skus.list.call_count, 1)
+
+            # a truncated file is listed again
+            with open(all_file, 'rb') as f:
+                content = f.read()
+            with open(all_file, 'wb') as f:
+                f.write(content[:len(content) // 2])
+            _vm_utils._resource_sku_indexes.clear()
+            self.assertEqual(len(list_skus(cmd)), 3)
+            self.assertEqual(client.resource_skus.list.call_count, 2)
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)
@@ -20,8 +20,9 @@ from azure.cli.command_modules.vm._validators import (validate_ssh_key,
                                                       _get_next_subnet_addr_suffix,
                                                       _validate_vm_vmss_msi,
                                                       _validate_vm_vmss_accelerated_networking,
-                                                      process_gallery_image_version_namespace)
-from azure.cli.command_modules.vm._vm_utils import normalize_disk_info, update_disk_sku_info
+                                                      process_gallery_image_version_namespace,
+                                                      _run_validators)
+from azure.cli.command_modules.vm._vm_utils import normalize_disk_info, update_disk_sku_info, memoize_lookup
 from azure.cli.core.mock import DummyCli
 from knack.util import CLIError
 
@@ -709,6 +710,58 @@ class TestActions(unittest.TestCase):
             np.target_regions = target_regions_list
             process_gallery_image_version_namespace(cmd, np)
 
+    def test_run_validators(self):
+        import threading
+        calls = []
+        started = threading.Event()
+
+        def _validate(name, wait_for=None):
+            def _run():
+                if wait_for:
+                    # only returns if the validators run concurrently
+                    self.assertTrue(wait_for.wait(5))
+                else:
+                    started.set()
+                calls.append(name)
+            return _run
+
+        _run_validators([
+            ('a', _validate('a', wait_for=started), []),
+            ('b', _validate('b'), []),
+            ('c', _validate('c'), ['a', 'b'])
+        ])
+        self.assertEqual(calls, ['b', 'a', 'c'])
+
+        def _fail(message):
+            def _run():
+                raise CLIError(message)
+            return _run
+
+        del calls[:]
+        with self.assertRaisesRegex(CLIError, 'first'):
+            _run_validators([
+                ('a', _fail('first'), []),
+                ('b', _fail('second'), []),
+                ('c', _validate('c'), ['a'])
+            ])
+        self.assertEqual(calls, [])
+
+    def test_memoize_lookup(self):
+        import copy
+        from concurrent.futures import ThreadPoolExecutor
+        cli_ctx = DummyCli()
+        lookup = mock.MagicMock(return_value='vnet1')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(lambda _: memoize_lookup(cli_ctx, ('vnet', 'rg1', 'vnet1'), lookup), range(8)))
+        self.assertEqual(results, ['vnet1'] * 8)
+        lookup.assert_called_once_with()
+
+        # another invocation looks up again
+        cli_copy = copy.copy(cli_ctx)
+        cli_copy.data = copy.deepcopy(cli_ctx.data)
+        self.assertEqual(memoize_lookup(cli_copy, ('vnet', 'rg1', 'vnet1'), lookup), 'vnet1')
+        self.assertEqual(lookup.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -70,6 +70,60 @@ class TestVMImage(unittest.TestCase):
         self.assertEqual(images[0], {'urnAlias': 'CentOS', 'publisher': 'OpenLogic',
                                      'offer': 'CentOS', 'sku': '7.5', 'version': 'latest'})
 
+    @mock.patch('azure.cli.command_modules.vm._actions._compute_client_factory', autospec=True)
+    def test_load_images_thru_services_from_local_catalog(self, client_factory_mock):
+        from collections import namedtuple
+        from azure.cli.command_modules.vm._actions import load_images_thru_services
+        node = namedtuple('Node', 'name')
+        client = client_factory_mock.return_value
+        images = client.virtual_machine_images
+        images.list_publishers.return_value = [node('Canonical'), node('OpenLogic')]
+        images.list_offers.return_value = [node('UbuntuServer'), node('Other')]
+        images.list_skus.return_value = [node('16.04-LTS'), node('18.04-LTS')]
+        images.list.side_effect = lambda location, publisher, offer, sku: [node(sku + '.1'), node(sku + '.2')]
+        catalog = {}
+        cli_ctx = DummyCli()
+
+        def _load(sku=None, now=1000, refresh=False):
+            with mock.patch('azure.cli.command_modules.vm._actions.get_cache_session', return_value=catalog), \
+                    mock.patch('time.time', return_value=now):
+                return load_images_thru_services(cli_ctx, 'canonical', 'ubuntu*', sku, 'westus', refresh=refresh)
+
+        expected = [{'publisher': 'Canonical', 'offer': 'UbuntuServer', 'sku': s, 'version': s + v}
+                    for s in ['16.04-LTS', '18.04-LTS'] for v in ['.1', '.2']]
+        self.assertEqual(_load(), expected)
+        images.list_offers.assert_called_once_with('westus', 'Canonical')
+        images.list_skus.assert_called_once_with('westus', 'Canonical', 'UbuntuServer')
+        self.assertEqual(images.list.call_count, 2)
+
+        # served from the catalog
+        images.reset_mock()
+        self.assertEqual(_load(), expected)
+        self.assertEqual(_load(sku='18.04*'), expected[2:])
+        self.assertFalse(images.list_publishers.called or images.list_offers.called or images.list.called)
+
+        # the catalog is bypassed with refresh, and new versions show up
+        images.list.side_effect = lambda location, publisher, offer, sku: [node(sku + '.1'), node(sku + '.3')]
+        expected = [{'publisher': 'Canonical', 'offer': 'UbuntuServer', 'sku': s, 'version': s + v}
+                    for s in ['16.04-LTS', '18.04-LTS'] for v in ['.1', '.3']]
+        self.assertEqual(_load(sku='18.04*', refresh=True), expected[2:])
+        images.list_publishers.assert_called_once_with('westus')
+        images.list.assert_called_once_with('westus', 'Canonical', 'UbuntuServer', '18.04-LTS')
+
+        # only the versions of the skus are listed again after a day
+        images.reset_mock()
+        self.assertEqual(_load(now=1000 + 25 * 60 * 60), expected)
+        images.list_publishers.assert_called_once_with('westus')
+        self.assertFalse(images.list_offers.called or images.list_skus.called)
+        self.assertEqual(images.list.call_count, 2)
+
+        # the publisher, with its offers and skus, is crawled again after a week
+        images.reset_mock()
+        self.assertEqual(_load(now=1000 + 8 * 24 * 60 * 60), expected)
+        images.list_offers.assert_called_once_with('westus', 'Canonical')
+        images.list_skus.assert_called_once_with('westus', 'Canonical', 'UbuntuServer')
+        self.assertEqual(images.list.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()